@@ -2,6 +2,12 @@ from flask import Flask
 from flask_cors import CORS
 from config import Config
 from extensions import jwt
+from database import init_pool
+from logging_setup import init_logging
+from json_provider import init_json
+from metrics import init_metrics
+from services.write_behind import init_write_behind
+from services.food_catalog import init_catalog
 from routes.user_routes import user_bp
 from routes.auth_routes import auth_bp
 from routes.food_routes import food_bp
@@ -9,12 +15,18 @@ from routes.food_routes import food_bp
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+    init_logging(app)
+    init_json(app)
     CORS(app)
     jwt.init_app(app)
+    init_pool(app)
+    init_write_behind(app)
+    init_catalog(app)
 
     app.register_blueprint(user_bp)
     app.register_blueprint(auth_bp)
     app.register_blueprint(food_bp)
+    init_metrics(app)
 
     return app
 
@@ -0,0 +1,63 @@
+"""Inserts/sec for /food/log-style single inserts vs. batched inserts.
+
+Writes into the Config database under a synthetic user id.
+
+    python benchmarks/bench_batch_log.py --rows 2000 --cleanup
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import get_db_connection
+from models.food_model import FoodModel
+
+BENCH_USER_ID = 900000002
+
+
+def entry(i):
+    return {
+        "name": f"bench food {i}", "calories": 200, "protein": 10, "carbs": 25, "fat": 7,
+        "meal_type": "lunch", "timestamp": datetime(2024, 1, 1, 12, 0, i % 60), "servings": 1,
+    }
+
+
+def run(rows, per_call):
+    start = time.perf_counter()
+    if per_call == 1:
+        for i in range(rows):
+            FoodModel.add_food_entry(BENCH_USER_ID, **entry(i))
+    else:
+        for offset in range(0, rows, per_call):
+            FoodModel.add_food_entries(BENCH_USER_ID, [entry(i) for i in range(offset, min(offset + per_call, rows))])
+    return rows / (time.perf_counter() - start)
+
+
+def cleanup():
+    db = get_db_connection()
+    cursor = db.cursor()
+    cursor.execute("DELETE FROM food_intake WHERE user_id = %s", (BENCH_USER_ID,))
+    cursor.execute("DELETE FROM daily_totals WHERE user_id = %s", (BENCH_USER_ID,))
+    db.commit()
+    cursor.close()
+    db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--cleanup", action="store_true")
+    args = parser.parse_args()
+
+    for per_call in (1, 10, 100):
+        print(f"{per_call:4d} entries/call: {run(args.rows, per_call):10.1f} inserts/s")
+
+    if args.cleanup:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
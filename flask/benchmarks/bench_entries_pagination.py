@@ -0,0 +1,81 @@
+"""Page fetch latency at increasing depth over a 100k-entry history.
+
+Seeds food_intake for a synthetic user id in the Config database, walks
+the keyset cursor to the end and reports latency per depth band, next to
+the old unpaginated SELECT *. Run migrate.py first.
+
+    python benchmarks/bench_entries_pagination.py --entries 100000 --cleanup
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import get_db_connection
+from models.food_model import FoodModel
+
+BENCH_USER_ID = 900000001
+
+
+def seed(user_id, count, chunk=5000):
+    db = get_db_connection()
+    cursor = db.cursor()
+    cursor.execute("DELETE FROM food_intake WHERE user_id = %s", (user_id,))
+    start = datetime(2015, 1, 1)
+    sql = """INSERT INTO food_intake (user_id, name, calories, protein, carbs, fat, meal_type, timestamp, servings, waterConsumed)
+             VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"""
+    for offset in range(0, count, chunk):
+        rows = [
+            (user_id, f"food {i}", 250, 10, 30, 8, "lunch", start + timedelta(minutes=90 * i), 1, 0)
+            for i in range(offset, min(offset + chunk, count))
+        ]
+        cursor.executemany(sql, rows)
+        db.commit()
+    cursor.close()
+    db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--cleanup", action="store_true")
+    args = parser.parse_args()
+
+    seed(BENCH_USER_ID, args.entries)
+
+    start = time.perf_counter()
+    FoodModel.get_entries_by_user(BENCH_USER_ID)
+    print(f"unpaginated full history: {(time.perf_counter() - start) * 1000:9.2f} ms")
+
+    timings = []
+    after = None
+    while True:
+        start = time.perf_counter()
+        entries, has_more = FoodModel.get_entries_page(BENCH_USER_ID, args.page_size, after)
+        timings.append(time.perf_counter() - start)
+        if not has_more:
+            break
+        after = (entries[-1]["timestamp"], entries[-1]["id"])
+
+    bands = 5
+    size = max(1, len(timings) // bands)
+    for b in range(bands):
+        chunk = timings[b * size:(b + 1) * size] or timings[-1:]
+        print(f"pages {b * size:6d}-{(b + 1) * size:6d}: median {statistics.median(chunk) * 1000:7.3f} ms")
+
+    if args.cleanup:
+        db = get_db_connection()
+        cursor = db.cursor()
+        cursor.execute("DELETE FROM food_intake WHERE user_id = %s", (BENCH_USER_ID,))
+        db.commit()
+        cursor.close()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Bytes and DB round trips saved by ETag revalidation on replayed sessions.
+
+Each simulated app session opens with GET /auth/profile and
+GET /food/entries; one in --write-every sessions logs a food entry first.
+The replay runs twice against the Config database with a throwaway user:
+once as a client that ignores ETags, once as a client that sends back
+If-None-Match. DB round trips are counted as pool checkouts, one per
+request that touched the database; repeat reads by the first client are
+answered from the response cache, so it saves checkouts but not bytes.
+Runs on either CACHE_BACKEND.
+
+    python benchmarks/bench_etag.py --sessions 200 --entries 300
+"""
+import argparse
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from database import get_pool
+
+SESSION_PATHS = ("/auth/profile", "/food/entries?limit=50")
+
+
+def replay(client, headers, sessions, write_every, use_etags):
+    etags = {}
+    sent = 0
+    not_modified = 0
+    checkouts = get_pool().stats()["checkouts"]
+    for session in range(sessions):
+        if write_every and session % write_every == 0:
+            client.post("/food/log", headers=headers, json={
+                "name": "Replay", "calories": 100, "protein": 5, "carbs": 10, "fat": 3,
+                "mealType": "snack", "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            })
+        for path in SESSION_PATHS:
+            request_headers = dict(headers)
+            if use_etags and path in etags:
+                request_headers["If-None-Match"] = etags[path]
+            response = client.get(path, headers=request_headers)
+            sent += len(response.data)
+            if response.status_code == 304:
+                not_modified += 1
+            if response.headers.get("ETag"):
+                etags[path] = response.headers["ETag"]
+    return sent, not_modified, get_pool().stats()["checkouts"] - checkouts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--entries", type=int, default=300, help="food log size of the test user")
+    parser.add_argument("--write-every", type=int, default=5, help="log an entry every N sessions (0 = never)")
+    args = parser.parse_args()
+
+    app = create_app()
+    client = app.test_client()
+    email = f"bench-{uuid.uuid4().hex[:12]}@example.com"
+    client.post("/receive-info", json={
+        "name": "Bench", "age": 30, "gender": "male", "weight": 80, "height": 180,
+        "activityLevel": "sedentary", "primaryGoal": "maintenance", "weightGoal": 80,
+        "email": email, "password": "bench-password",
+    })
+    token = client.post("/auth/login", json={"email": email, "password": "bench-password"}).get_json()["token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    start = datetime.now() - timedelta(days=90)
+    client.post("/food/log/batch", headers=headers, json={"entries": [
+        {"name": f"Seed {i}", "calories": 200, "protein": 10, "carbs": 20, "fat": 5, "mealType": "lunch",
+         "timestamp": (start + timedelta(hours=6 * i)).strftime("%Y-%m-%d %H:%M:%S")}
+        for i in range(args.entries)
+    ]})
+
+    requests = args.sessions * len(SESSION_PATHS)
+    plain = replay(client, headers, args.sessions, args.write_every, use_etags=False)
+    tagged = replay(client, headers, args.sessions, args.write_every, use_etags=True)
+
+    print(f"{args.sessions} sessions, {requests} reads, a write every {args.write_every} sessions")
+    for label, (sent, not_modified, checkouts) in (("no etags", plain), ("etags", tagged)):
+        print(f"{label:9s} {sent / 1024:10.1f} KiB sent  {not_modified:5d} x 304  {checkouts:5d} DB checkouts")
+    print(f"saved     {(1 - tagged[0] / plain[0]) * 100:9.1f}% bytes  "
+          f"{(1 - tagged[2] / plain[2]) * 100:.1f}% DB checkouts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""RSS while streaming /food/export, to show memory stays flat.
+
+By default rows are synthesized lazily in cursor-sized batches in place
+of FoodModel.iter_entries, so millions of rows can be pushed through
+the real CSV/NDJSON/gzip pipeline without a database. With --user-id the
+export runs over the Config database instead.
+
+    python benchmarks/bench_export.py --rows 3000000 --format csv --gzip
+    python benchmarks/bench_export.py --user-id 42 --format ndjson
+"""
+import argparse
+import os
+import resource
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+from json_provider import OrjsonProvider, orjson
+from models.food_model import FoodModel
+from services.food_service import FoodService
+
+START = datetime(2015, 1, 1, 7, 0, 0)
+MEALS = ("breakfast", "lunch", "dinner", "snack")
+
+
+def rss_mib():
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * resource.getpagesize() / 1024 / 1024
+
+
+def synthetic_entries(total):
+    def iter_entries(user_id, date_from=None, date_to=None, batch_size=1000):
+        for start in range(0, total, batch_size):
+            yield [
+                (i + 1, START + timedelta(minutes=7 * i), MEALS[i % 4], f"Food {i % 500}",
+                 Decimal("1.00"), Decimal("250.00"), Decimal("12.50"), Decimal("30.00"), Decimal("8.25"))
+                for i in range(start, min(start + batch_size, total))
+            ]
+    return iter_entries
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--format", choices=("csv", "ndjson"), default="csv")
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--user-id", type=int, help="export a real user from the Config database")
+    parser.add_argument("--samples", type=int, default=10)
+    args = parser.parse_args()
+
+    app = Flask("bench-export")
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+    if args.user_id is None:
+        FoodModel.iter_entries = staticmethod(synthetic_entries(args.rows))
+    # One chunk per 1000-row cursor batch (gzip may skip a few).
+    every = max(1, args.rows // 1000 // args.samples)
+
+    with app.app_context():
+        chunks, _ = FoodService.export_food_entries(
+            args.user_id or 0, {"format": args.format}, app.json.dumps, gzip=args.gzip)
+        print(f"{'chunks':>8s} {'MiB out':>9s} {'elapsed':>8s} {'rss MiB':>8s}")
+        print(f"{0:8d} {0:9.1f} {0:8.1f} {rss_mib():8.1f}")
+        start = time.perf_counter()
+        sent = 0
+        for count, chunk in enumerate(chunks, 1):
+            sent += len(chunk)
+            if count % every == 0:
+                print(f"{count:8d} {sent / 1024 / 1024:9.1f} {time.perf_counter() - start:8.1f} {rss_mib():8.1f}")
+        elapsed = time.perf_counter() - start
+
+    print(f"done in {elapsed:.1f}s, {sent / 1024 / 1024:.1f} MiB out")
+    print(f"peak rss {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
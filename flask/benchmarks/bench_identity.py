@@ -0,0 +1,54 @@
+"""users-table queries per protected request, legacy token vs. uid claim.
+
+Needs the MySQL database from Config; registers a throwaway user.
+
+    python benchmarks/bench_identity.py --requests 200
+"""
+import argparse
+import os
+import sys
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from models.user_model import UserModel
+
+
+def users_queries_per_request(client, token, n):
+    headers = {"Authorization": f"Bearer {token}"}
+    start = UserModel.queries
+    for _ in range(n):
+        client.get("/food/water", headers=headers)
+    return (UserModel.queries - start) / n
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    app = create_app()
+    client = app.test_client()
+    email = f"bench-{uuid.uuid4().hex[:12]}@example.com"
+    client.post("/receive-info", json={
+        "name": "Bench", "age": 30, "gender": "male", "weight": 80, "height": 180,
+        "activityLevel": "sedentary", "primaryGoal": "maintenance", "weightGoal": 80,
+        "email": email, "password": "bench-password",
+    })
+
+    with app.app_context():
+        legacy_token = create_access_token(identity=email)
+    claims_token = client.post("/auth/login", json={"email": email, "password": "bench-password"}).get_json()["token"]
+
+    # Without the process cache every legacy request would cost one query.
+    legacy = users_queries_per_request(client, legacy_token, args.requests)
+    claims = users_queries_per_request(client, claims_token, args.requests)
+    print(f"legacy token (cached lookup): {legacy:.3f} users queries/request")
+    print(f"uid claim:                    {claims:.3f} users queries/request")
+
+
+if __name__ == "__main__":
+    main()
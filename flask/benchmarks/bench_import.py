@@ -0,0 +1,62 @@
+"""CSV import throughput: row-at-a-time add_food_entry vs. chunked import.
+
+Generates a synthetic history and loads it into the Config database for
+the given user (entries are left in place; use a throwaway account).
+The per-row baseline is capped at --baseline-rows since it is slow.
+
+    python benchmarks/bench_import.py --user-id 42 --rows 200000
+    python benchmarks/bench_import.py --user-id 42 --chunk-sizes 500,2000,5000
+"""
+import argparse
+import io
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.food_model import FoodModel
+from services.import_service import ImportService
+
+START = datetime(2016, 1, 1, 7, 0, 0)
+MEALS = ("breakfast", "lunch", "dinner", "snack")
+
+
+def make_csv(rows):
+    out = io.StringIO()
+    out.write("name,calories,protein,carbs,fat,mealType,timestamp,servings\n")
+    for i in range(rows):
+        out.write(f"Food {i % 500},{150 + i % 300},{i % 40},{i % 90},{i % 25},{MEALS[i % 4]},"
+                  f"{(START + timedelta(minutes=9 * i)).isoformat(sep=' ')},1\n")
+    out.seek(0)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--baseline-rows", type=int, default=2000)
+    parser.add_argument("--chunk-sizes", default="2000")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    for i in range(args.baseline_rows):
+        FoodModel.add_food_entry(args.user_id, f"Food {i}", 150, 10, 20, 5, MEALS[i % 4],
+                                 START + timedelta(minutes=9 * i))
+    baseline = args.baseline_rows / (time.perf_counter() - start)
+    print(f"add_food_entry per row:   {baseline:10,.0f} rows/s  ({args.baseline_rows} rows)")
+
+    for chunk_size in (int(n) for n in args.chunk_sizes.split(",")):
+        data = make_csv(args.rows)
+        start = time.perf_counter()
+        summary = ImportService.import_csv(args.user_id, data, uuid.uuid4().hex, chunk_size)
+        rate = summary["imported"] / (time.perf_counter() - start)
+        print(f"import, chunk {chunk_size:6d}:   {rate:10,.0f} rows/s  ({summary['imported']} rows, "
+              f"{rate / baseline:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Serializing /food/entries pages: Flask's json vs. orjson vs. streaming.
+
+Rows are synthesized with the same types a dictionary cursor returns
+(datetime, Decimal, str, int). The buffered modes build the whole row
+list first, as fetchall() does; the streaming mode pulls 500-row batches
+from a generator, as iter_entries_page does. Peak memory is measured
+with tracemalloc and includes the rows.
+
+    python benchmarks/bench_json.py
+    python benchmarks/bench_json.py --sizes 1000,10000 --repeat 5
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from json_provider import OrjsonProvider, orjson
+from models.food_model import FoodModel
+import services.food_service as food_service
+from services.food_service import FoodService
+
+BATCH_SIZE = 500
+START = datetime(2024, 1, 1, 8, 0, 0)
+
+
+def make_row(i):
+    return {
+        "id": 1_000_000 - i,
+        "user_id": 42,
+        "name": f"Chicken breast {i % 97}",
+        "calories": Decimal("165.00"),
+        "protein": Decimal("31.00"),
+        "carbs": Decimal("0.00"),
+        "fat": Decimal("3.60"),
+        "meal_type": ("breakfast", "lunch", "dinner", "snack")[i % 4],
+        "timestamp": START - timedelta(minutes=17 * i),
+        "servings": Decimal("1.50"),
+        "waterConsumed": 0,
+    }
+
+
+def buffered(app, n):
+    with app.test_request_context():
+        rows = [make_row(i) for i in range(n + 1)]
+        page = {"entries": rows[:n], "next_cursor": FoodService.encode_cursor(rows[n - 1])}
+        return len(app.json.response(page).get_data())
+
+
+def streamed(app, n):
+    def fake_iter(user_id, limit, after=None, date_from=None, date_to=None, batch_size=BATCH_SIZE):
+        for start in range(0, limit + 1, batch_size):
+            yield [make_row(i) for i in range(start, min(start + batch_size, limit + 1))]
+
+    original = FoodModel.iter_entries_page
+    FoodModel.iter_entries_page = staticmethod(fake_iter)
+    try:
+        with app.test_request_context():
+            chunks = FoodService.stream_food_entries_page(42, {"limit": str(n)}, app.json.dumps)
+            return sum(len(chunk.encode()) for chunk in chunks)
+    finally:
+        FoodModel.iter_entries_page = original
+
+
+def measure(fn, app, n, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = fn(app, n)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn(app, n)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak, size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if orjson is None:
+        sys.exit("orjson is not installed")
+
+    default_app = Flask("bench-default")
+    default_app.json = DefaultJSONProvider(default_app)
+    fast_app = Flask("bench-orjson")
+    fast_app.json = OrjsonProvider(fast_app)
+    modes = (
+        ("flask json", buffered, default_app),
+        ("orjson", buffered, fast_app),
+        ("orjson stream", streamed, fast_app),
+    )
+    # Lift the route's page cap so the larger sizes aren't clamped.
+    food_service.MAX_STREAM_PAGE_SIZE = max(int(n) for n in args.sizes.split(","))
+
+    for n in (int(n) for n in args.sizes.split(",")):
+        print(f"{n} rows")
+        baseline = None
+        for label, fn, app in modes:
+            elapsed, peak, size = measure(fn, app, n, args.repeat)
+            baseline = baseline or elapsed
+            print(f"  {label:14s} {elapsed * 1000:9.1f} ms  {baseline / elapsed:5.1f}x  "
+                  f"peak {peak / 1024 / 1024:7.1f} MiB  body {size / 1024 / 1024:6.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
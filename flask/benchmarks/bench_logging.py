@@ -0,0 +1,70 @@
+"""Request latency with logging off, synchronous, queued and sampled.
+
+Uses /nutrition/preview so no database is needed. Log output goes to a
+temporary file to include real I/O cost.
+
+    python benchmarks/bench_logging.py --requests 5000
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from logging_setup import configure_logging, JsonFormatter, RequestIdFilter
+
+PAYLOAD = {"age": 30, "gender": "male", "weight": 80, "height": 180, "activityLevel": "sedentary",
+           "primaryGoal": "weight loss", "weightGoal": 70}
+
+
+def measure(client, n):
+    timings = []
+    for _ in range(n):
+        start = time.perf_counter()
+        client.post("/nutrition/preview", json=PAYLOAD)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return sum(timings) / n * 1e6, timings[int(0.99 * n)] * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    app = create_app()
+    client = app.test_client()
+    out = tempfile.TemporaryFile("w")
+
+    def reconfigure(level, sample_rate):
+        app.config.update(LOG_LEVEL=level, LOG_SAMPLE_RATE=sample_rate)
+        configure_logging(app.config, stream=out)
+
+    modes = {}
+    reconfigure("CRITICAL", 1.0)
+    modes["off"] = measure(client, args.requests)
+
+    # What the old print() calls amounted to: format and write inline.
+    reconfigure("INFO", 1.0)
+    sync = logging.StreamHandler(out)
+    sync.setFormatter(JsonFormatter())
+    sync.addFilter(RequestIdFilter())
+    logging.getLogger().handlers = [sync]
+    modes["synchronous"] = measure(client, args.requests)
+
+    reconfigure("INFO", 1.0)
+    modes["queued"] = measure(client, args.requests)
+
+    reconfigure("INFO", 0.1)
+    modes["queued, sampled 10%"] = measure(client, args.requests)
+
+    for name, (mean, p99) in modes.items():
+        print(f"{name:22s} mean {mean:8.1f} us   p99 {p99:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Login latency (p50/p99) under concurrent load, inline vs. pooled hashing.
+
+Registers a throwaway user in the Config database, then fires concurrent
+/auth/login requests through the test client while other threads hit a
+cheap endpoint, so the effect of KDF work on unrelated requests shows up.
+Each mode runs in a subprocess because the hashing pool is sized from
+the environment at import time.
+
+    python benchmarks/bench_login.py --threads 16 --logins 20
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+FLASK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, FLASK_DIR)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def run_mode(threads, logins):
+    from app import create_app
+
+    app = create_app()
+    client = app.test_client()
+    email = f"bench-{uuid.uuid4().hex[:12]}@example.com"
+    client.post("/receive-info", json={
+        "name": "Bench", "age": 30, "gender": "male", "weight": 80, "height": 180,
+        "activityLevel": "sedentary", "primaryGoal": "maintenance", "weightGoal": 80,
+        "email": email, "password": "bench-password",
+    })
+
+    login_times, other_times, statuses = [], [], []
+    lock = threading.Lock()
+
+    def login_worker():
+        for _ in range(logins):
+            start = time.perf_counter()
+            status = client.post("/auth/login", json={"email": email, "password": "bench-password"}).status_code
+            with lock:
+                login_times.append(time.perf_counter() - start)
+                statuses.append(status)
+
+    def other_worker(stop):
+        while not stop.is_set():
+            start = time.perf_counter()
+            client.post("/nutrition/preview", json={"age": 30, "weight": 80, "height": 180})
+            with lock:
+                other_times.append(time.perf_counter() - start)
+
+    stop = threading.Event()
+    others = [threading.Thread(target=other_worker, args=(stop,)) for _ in range(2)]
+    workers = [threading.Thread(target=login_worker) for _ in range(threads)]
+    for t in others + workers:
+        t.start()
+    for t in workers:
+        t.join()
+    stop.set()
+    for t in others:
+        t.join()
+
+    print(f"  login  p50 {percentile(login_times, 0.5) * 1000:8.1f} ms  p99 {percentile(login_times, 0.99) * 1000:8.1f} ms")
+    print(f"  other  p50 {percentile(other_times, 0.5) * 1000:8.1f} ms  p99 {percentile(other_times, 0.99) * 1000:8.1f} ms")
+    print(f"  status counts: { {s: statuses.count(s) for s in set(statuses)} }")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--logins", type=int, default=20, help="logins per thread")
+    parser.add_argument("--workers", type=int, default=4, help="hashing pool size for the pooled run")
+    parser.add_argument("--mode", choices=["inline", "pooled"])
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.threads, args.logins)
+        return
+
+    for mode, workers in (("inline", 0), ("pooled", args.workers)):
+        env = dict(os.environ, PASSWORD_HASH_WORKERS=str(workers), PASSWORD_HASH_MAX_PENDING=str(args.threads),
+                   AUTH_THROTTLE_PER_IP="1000000", AUTH_THROTTLE_PER_EMAIL="1000000")
+        print(f"{mode} (PASSWORD_HASH_WORKERS={workers})")
+        subprocess.run([sys.executable, __file__, "--mode", mode, "--threads", str(args.threads),
+                        "--logins", str(args.logins)], env=env, cwd=FLASK_DIR, check=True)
+
+
+if __name__ == "__main__":
+    main()
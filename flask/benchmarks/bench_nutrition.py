@@ -0,0 +1,208 @@
+"""Benchmark and golden-output regression check for the nutrition engine.
+
+Runs the NutritionService helpers and the pure part of calculate_nutrition
+(compute_plan, cold and cached) over a fixed grid of profiles.
+
+    python benchmarks/bench_nutrition.py                   # check golden + compare to baseline
+    python benchmarks/bench_nutrition.py --update-golden   # after an intended behavior change
+    python benchmarks/bench_nutrition.py --update-baseline # record relative timings
+
+Timings are stored and compared as multiples of a fixed pure-Python
+calibration loop timed in the same run, so a baseline recorded on one
+machine holds on another. Exits non-zero if any output differs from the
+golden snapshot, or if a relative timing regresses more than --tolerance
+against the stored baseline.
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.nutrition_service import NutritionService, _cached_plan
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+GOLDEN_PATH = os.path.join(HERE, "golden", "nutrition_grid.json")
+BASELINE_PATH = os.path.join(HERE, "baselines", "nutrition.json")
+
+AGES = [15, 25, 40, 55, 67, 80]
+GENDERS = ["male", "female"]
+WEIGHTS = [42.0, 75.0, 150.0]
+HEIGHTS = [1.6, 185.0]
+ACTIVITIES = ["sedentary", "lightly active", "moderately active", "very active"]
+GOALS = [("maintenance", 0.0), ("weight loss", -5.0), ("weight loss", -35.0), ("weight gain", 8.0)]
+
+
+def profile_grid():
+    grid = itertools.product(AGES, GENDERS, WEIGHTS, HEIGHTS, ACTIVITIES, GOALS)
+    for i, (age, gender, weight, height, activity, (goal, change)) in enumerate(grid):
+        yield {
+            "age": age,
+            "gender": gender,
+            "weight": weight,
+            "height": height,
+            "activityLevel": activity,
+            "primaryGoal": goal,
+            "weightGoal": weight + change,
+            "climate": "hot" if i % 2 else "temperate",
+        }
+
+
+SNAPSHOT_FIELDS = [
+    "age", "gender", "weight", "height", "activityLevel", "primaryGoal", "weightGoal", "climate",
+    "bmr", "safe_weekly_rate", "lower_bound", "upper_bound", "carb_p", "prot_p", "fat_p", "water_l",
+    "calorie_target", "carbs_g", "protein_g", "fat_g", "time_frame", "plan_water_l", "flags",
+]
+
+
+def snapshot(p):
+    age, gender, weight, height = p["age"], p["gender"], p["weight"], p["height"]
+    activity, goal, climate = p["activityLevel"], p["primaryGoal"], p["climate"]
+    change = abs(p["weightGoal"] - weight)
+    bmr = NutritionService._calculate_bmr(weight, height, age, gender)
+    tdee = bmr * NutritionService._activity_multiplier(activity)
+    macros = (0.40, 0.30, 0.30) if p["weightGoal"] < weight else (0.50, 0.25, 0.25)
+    plan = NutritionService.compute_plan(p)
+    return [
+        age, gender, weight, height, activity, goal, p["weightGoal"], climate,
+        bmr,
+        NutritionService._safe_weekly_rate(age, weight, change, goal, gender),
+        *NutritionService._dynamic_calorie_bounds(bmr, weight, age, tdee, gender),
+        *NutritionService._apply_macro_overrides(age, gender, *macros)[:3],
+        NutritionService._water_intake_liters(weight, activity, age, gender, climate),
+        plan["calorie_target"], plan["carbs_g"], plan["protein_g"], plan["fat_g"], plan["time_frame"],
+        plan["water_l"], " ".join(f["code"] for f in plan["flags"]),
+    ]
+
+
+def check_golden(update):
+    current = [snapshot(p) for p in profile_grid()]
+    if update:
+        with open(GOLDEN_PATH, "w") as f:
+            f.write('{"fields": ' + json.dumps(SNAPSHOT_FIELDS) + ',\n"rows": [\n')
+            f.write(",\n".join(json.dumps(row, separators=(",", ":")) for row in current))
+            f.write("\n]}\n")
+        print(f"golden: wrote {len(current)} profiles to {os.path.relpath(GOLDEN_PATH)}")
+        return True
+    with open(GOLDEN_PATH) as f:
+        golden = json.load(f)
+    if golden["fields"] != SNAPSHOT_FIELDS or len(golden["rows"]) != len(current):
+        print("golden: snapshot layout or grid changed; rerun with --update-golden")
+        return False
+    diffs = [(g, c) for g, c in zip(golden["rows"], current) if g != c]
+    for g, c in diffs[:5]:
+        changed = {f: (a, b) for f, a, b in zip(SNAPSHOT_FIELDS, g, c) if a != b}
+        print(f"golden mismatch for {dict(zip(SNAPSHOT_FIELDS[:8], g))}: {changed}")
+    print(f"golden: {len(current) - len(diffs)}/{len(current)} profiles match")
+    return not diffs
+
+
+def calibration_loop():
+    # Float arithmetic and dict access, about the mix the nutrition helpers
+    # do.
+    profile = {"weight": 75.0, "height": 180.0, "age": 40}
+    total = 0.0
+    for i in range(1000):
+        total += profile["weight"] * 10.0 + profile["height"] * 6.25 - profile["age"] * 5.0 + i
+    return total
+
+
+def run_benchmarks(repeat):
+    profiles = list(profile_grid())
+    keys = [NutritionService.plan_key(p) for p in profiles]
+    args = [(p["age"], p["gender"], p["weight"], p["height"], p["activityLevel"], p["primaryGoal"],
+             abs(p["weightGoal"] - p["weight"]), p["climate"]) for p in profiles]
+
+    def bmr():
+        for age, gender, weight, height, *_ in args:
+            NutritionService._calculate_bmr(weight, height, age, gender)
+
+    def weekly_rate():
+        for age, gender, weight, _, _, goal, change, _ in args:
+            NutritionService._safe_weekly_rate(age, weight, change, goal, gender)
+
+    def bounds():
+        for age, gender, weight, *_ in args:
+            NutritionService._dynamic_calorie_bounds(1600.0, weight, age, 2200.0, gender)
+
+    def macros():
+        for age, gender, *_ in args:
+            NutritionService._apply_macro_overrides(age, gender, 0.40, 0.30, 0.30)
+
+    def water():
+        for age, gender, weight, _, activity, _, _, climate in args:
+            NutritionService._water_intake_liters(weight, activity, age, gender, climate)
+
+    def plan_cold():
+        for key in keys:
+            NutritionService._compute_plan(*key)
+
+    def plan_cached():
+        for p in profiles:
+            NutritionService.compute_plan(p)
+
+    cases = {
+        "_calculate_bmr": bmr,
+        "_safe_weekly_rate": weekly_rate,
+        "_dynamic_calorie_bounds": bounds,
+        "_apply_macro_overrides": macros,
+        "_water_intake_liters": water,
+        "compute_plan (uncached)": plan_cold,
+        "compute_plan (cached)": plan_cached,
+    }
+    _cached_plan.cache_clear()
+    plan_cached()
+    # Each case's best time is divided by the best calibration loop time
+    # from runs interleaved with it, so clock changes hit both alike.
+    results = {}
+    for name, fn in cases.items():
+        best = unit = float("inf")
+        for _ in range(repeat):
+            unit = min(unit, timeit.timeit(calibration_loop, number=1))
+            best = min(best, timeit.timeit(fn, number=1))
+        results[name] = (best / len(profiles) * 1e6, best / unit / len(profiles))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--update-golden", action="store_true")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs. baseline")
+    args = parser.parse_args()
+
+    ok = check_golden(args.update_golden)
+
+    results = run_benchmarks(args.repeat)
+    relative = {name: ratio for name, (_, ratio) in results.items()}
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f).get("relative", {})
+
+    print(f"{'function':28s} {'us/call':>9s} {'relative':>9s} {'baseline':>9s} {'change':>8s}")
+    for name, (micros, _) in results.items():
+        base = baseline.get(name)
+        if base:
+            change = relative[name] / base - 1
+            marker = "  REGRESSION" if change > args.tolerance else ""
+            ok = ok and (args.update_baseline or change <= args.tolerance)
+            print(f"{name:28s} {micros:9.3f} {relative[name]:9.4f} {base:9.4f} {change:+8.1%}{marker}")
+        else:
+            print(f"{name:28s} {micros:9.3f} {relative[name]:9.4f} {'-':>9s}")
+
+    if args.update_baseline:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump({"relative": {k: round(v, 6) for k, v in relative.items()}}, f, indent=2)
+            f.write("\n")
+        print(f"baseline: wrote {os.path.relpath(BASELINE_PATH)}")
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
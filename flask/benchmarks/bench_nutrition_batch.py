@@ -0,0 +1,73 @@
+"""Throughput of the NumPy batch engine vs. the scalar compute_plan.
+
+Generates synthetic profiles, checks that both paths agree exactly on a
+sample and reports profiles/sec. No database needed.
+
+    python benchmarks/bench_nutrition_batch.py --profiles 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.nutrition_batch import calculate_batch, columns_from_rows, plan_for
+from services.nutrition_service import NutritionService
+
+GENDERS = ["male", "female"]
+ACTIVITY = ["sedentary", "lightly active", "moderately active", "very active"]
+GOALS = ["maintenance", "weight loss", "weight gain"]
+
+
+def synthetic_profiles(n, seed=7):
+    rng = random.Random(seed)
+    profiles = []
+    for _ in range(n):
+        weight = round(rng.uniform(38, 190), 1)
+        goal = rng.choice(GOALS)
+        change = 0 if goal == "maintenance" else rng.uniform(1, 40) * (-1 if goal == "weight loss" else 1)
+        profiles.append({
+            "age": rng.randint(12, 90),
+            "gender": rng.choice(GENDERS),
+            "weight": weight,
+            "height": round(rng.uniform(145, 205), 1),
+            "activityLevel": rng.choice(ACTIVITY),
+            "primaryGoal": goal,
+            "weightGoal": round(weight + change, 1),
+            "climate": rng.choice(["temperate", "hot"]),
+        })
+    return profiles
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", type=int, default=1000000)
+    parser.add_argument("--scalar-sample", type=int, default=50000)
+    args = parser.parse_args()
+
+    profiles = synthetic_profiles(args.profiles)
+
+    start = time.perf_counter()
+    columns = columns_from_rows(profiles)
+    parsed = time.perf_counter()
+    result = calculate_batch(columns)
+    done = time.perf_counter()
+
+    sample = profiles[:args.scalar_sample]
+    start_scalar = time.perf_counter()
+    scalar = [NutritionService.compute_plan(p) for p in sample]
+    scalar_rate = len(sample) / (time.perf_counter() - start_scalar)
+
+    mismatches = sum(1 for i, plan in enumerate(scalar) if plan != plan_for(result, i))
+
+    print(f"profiles:          {args.profiles}")
+    print(f"column build:      {parsed - start:8.2f} s")
+    print(f"batch compute:     {done - parsed:8.2f} s  ({args.profiles / (done - parsed):12.0f} profiles/s)")
+    print(f"scalar compute:    {scalar_rate:12.0f} profiles/s (sample of {len(sample)})")
+    print(f"mismatches:        {mismatches} / {len(sample)}")
+
+
+if __name__ == "__main__":
+    main()
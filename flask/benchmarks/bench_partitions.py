@@ -0,0 +1,162 @@
+"""Hot-path latency as archived food history grows.
+
+Seeds --users synthetic users with --months of recent history in
+food_intake (partitioned by migration 008), then repeatedly doubles every
+user's archived history in food_intake_archive by copying it further into
+the past. After each step it times the requests that run on every app
+open: the first /food/entries page, a day's summary (daily_totals plus
+meal totals) and a logged entry. With the archive at hundreds of
+millions of rows these should match the first step. Use a throwaway
+database with migrations 008 and 009 applied and scripts/manage_food_partitions.py
+run once, so the seeded months land in their own partitions; nothing is
+cleaned up.
+
+    python benchmarks/bench_partitions.py --users 1000 --steps 10
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import get_db_connection
+from models.food_model import FoodModel, ARCHIVE_TABLE
+
+FIRST_USER_ID = 910000000
+MEALS = ("breakfast", "lunch", "dinner", "snack")
+COLUMNS = "user_id, name, calories, protein, carbs, fat, meal_type, timestamp, servings, waterConsumed"
+
+
+def execute(sql, params=()):
+    db = get_db_connection()
+    cursor = db.cursor()
+    cursor.execute(sql, params)
+    db.commit()
+    rows = cursor.rowcount
+    cursor.close()
+    db.close()
+    return rows
+
+
+def seed(users, months, per_day, chunk=5000):
+    # Recent months go to food_intake; one more month, a year back, seeds
+    # the archive so each step can double it.
+    db = get_db_connection()
+    cursor = db.cursor()
+    now = datetime.now().replace(microsecond=0)
+    # The archive has no AUTO_INCREMENT; its ids only need to be distinct.
+    next_id = 0
+    for table, start, days in (
+        ("food_intake", now - timedelta(days=30 * months), 30 * months),
+        (ARCHIVE_TABLE, now - timedelta(days=30 * (months + 13)), 30),
+    ):
+        archive = table == ARCHIVE_TABLE
+        columns = f"id, {COLUMNS}" if archive else COLUMNS
+        sql = f"INSERT INTO {table} ({columns}) VALUES ({', '.join(['%s'] * len(columns.split(',')))})"
+        rows = []
+        for user in range(users):
+            for i in range(days * per_day):
+                row = (FIRST_USER_ID + user, f"food {i % 300}", 250, 10, 30, 8, MEALS[i % 4],
+                       start + timedelta(hours=24 / per_day * i), 1, 0)
+                if archive:
+                    next_id += 1
+                    row = (next_id, *row)
+                rows.append(row)
+                if len(rows) >= chunk:
+                    cursor.executemany(sql, rows)
+                    db.commit()
+                    rows = []
+        if rows:
+            cursor.executemany(sql, rows)
+            db.commit()
+    # Reads only look in the archive below the newest recorded run's bound.
+    cursor.execute(
+        """
+        INSERT INTO food_intake_archive_runs (partition_name, upper_bound, row_count) VALUES ('p_bench', %s, 0)
+        ON DUPLICATE KEY UPDATE upper_bound = GREATEST(upper_bound, VALUES(upper_bound))
+        """,
+        (now - timedelta(days=30 * (months + 12)),)
+    )
+    db.commit()
+    cursor.close()
+    db.close()
+
+
+def grow_archive(shift_days):
+    # Copies the bench users' archive shift_days further back; the new rows
+    # differ from the old ones in timestamp, which is enough for the key.
+    return execute(
+        f"""
+        INSERT INTO {ARCHIVE_TABLE} (id, {COLUMNS})
+        SELECT id, user_id, name, calories, protein, carbs, fat, meal_type,
+               timestamp - INTERVAL %s DAY, servings, waterConsumed
+        FROM {ARCHIVE_TABLE} WHERE user_id >= %s
+        """,
+        (shift_days, FIRST_USER_ID)
+    )
+
+
+def count(table):
+    db = get_db_connection()
+    cursor = db.cursor()
+    cursor.execute(f"SELECT COUNT(*) FROM {table}")
+    total, = cursor.fetchone()
+    cursor.close()
+    db.close()
+    return total
+
+
+def timed(samples, fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    samples.append(time.perf_counter() - start)
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))] * 1000
+
+
+def measure(users, queries, rng):
+    today = date.today()
+    results = {"entries page": [], "day summary": [], "log entry": []}
+    for _ in range(queries):
+        user_id = FIRST_USER_ID + rng.randrange(users)
+        timed(results["entries page"], FoodModel.get_entries_page, user_id, 50)
+        timed(results["day summary"], lambda: (FoodModel.get_daily_totals(user_id, today, today),
+                                               FoodModel.get_daily_meal_totals(user_id, today, today + timedelta(days=1))))
+        timed(results["log entry"], FoodModel.add_food_entry, user_id, "bench", 100, 5, 10, 2, "snack", datetime.now())
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--months", type=int, default=12, help="hot history per user")
+    parser.add_argument("--per-day", type=int, default=6, help="entries per user per day")
+    parser.add_argument("--steps", type=int, default=10, help="archive doublings")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--skip-seed", action="store_true")
+    args = parser.parse_args()
+    rng = random.Random(1)
+
+    if not args.skip_seed:
+        seed(args.users, args.months, args.per_day)
+    hot = count("food_intake")
+    print(f"{'archive rows':>14s} {'hot rows':>10s}  " +
+          "  ".join(f"{label + ' p50/p99 ms':>28s}" for label in ("entries page", "day summary", "log entry")))
+    shift = 30
+    for step in range(args.steps + 1):
+        if step:
+            grow_archive(shift)
+            shift *= 2
+        results = measure(args.users, args.queries, rng)
+        print(f"{count(ARCHIVE_TABLE):14,d} {hot:10,d}  " + "  ".join(
+            f"{percentile(samples, 50):19.2f}/{percentile(samples, 99):7.2f}" for samples in results.values()))
+
+
+if __name__ == "__main__":
+    main()
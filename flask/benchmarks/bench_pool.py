@@ -0,0 +1,90 @@
+"""Requests/sec with a fresh connection per query vs. the shared pool.
+
+Each simulated request runs QUERIES_PER_REQUEST statements, mirroring
+/food/log (users lookup + insert).
+
+    python benchmarks/bench_pool.py                 # against Config's MySQL
+    python benchmarks/bench_pool.py --sqlite /tmp/bench.db
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import ConnectionPool, _mysql_creator
+
+QUERIES_PER_REQUEST = 2
+
+
+def _run_queries(conn):
+    for _ in range(QUERIES_PER_REQUEST):
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+        cursor.fetchall()
+        cursor.close()
+
+
+def request_unpooled(creator):
+    for _ in range(QUERIES_PER_REQUEST):
+        conn = creator()
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+        cursor.fetchall()
+        cursor.close()
+        conn.close()
+
+
+def request_pooled(pool):
+    conn = pool.checkout()
+    try:
+        _run_queries(conn)
+    finally:
+        conn.close()
+
+
+def drive(fn, arg, threads, requests_per_thread):
+    def worker():
+        for _ in range(requests_per_thread):
+            fn(arg)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+    return threads * requests_per_thread / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sqlite", help="use a SQLite file as a stand-in for MySQL")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=250, help="requests per thread")
+    parser.add_argument("--pool-size", type=int, default=5)
+    parser.add_argument("--max-overflow", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.sqlite:
+        creator = lambda: sqlite3.connect(args.sqlite, check_same_thread=False)
+    else:
+        creator = _mysql_creator
+
+    before = drive(request_unpooled, creator, args.threads, args.requests)
+    pool = ConnectionPool(creator, size=args.pool_size, max_overflow=args.max_overflow)
+    after = drive(request_pooled, pool, args.threads, args.requests)
+    stats = pool.stats()
+    pool.dispose()
+
+    print(f"connect-per-query: {before:10.1f} req/s")
+    print(f"pooled:            {after:10.1f} req/s  ({after / before:.1f}x)")
+    print(f"pool stats:        {stats}")
+
+
+if __name__ == "__main__":
+    main()
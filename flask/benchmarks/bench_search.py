@@ -0,0 +1,124 @@
+"""Query latency, memory and write cost of the per-user food catalogs
+behind /food/search.
+
+Each user's distinct names are synthesized from a small vocabulary
+(brand, dish, qualifier, size) and bulk-loaded through FoodCatalog.load
+from rows shaped like FoodModel.get_catalog's (macro sums and an entry
+count). Memory is the tracemalloc delta of a second, traced load, per
+user. Queries are prefixes and mid-word substrings of the user's own
+names plus misses, timed one at a time. "record" is what a logged entry
+costs a cached catalog: one add to an existing or a new name.
+
+    python benchmarks/bench_search.py
+    python benchmarks/bench_search.py --users 1 --names 1000000 --queries 5000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.food_catalog import FoodCatalog
+
+BRANDS = ("acme", "harvest", "golden", "nordic", "valley", "summit", "oak", "river", "sunny", "prime",
+          "urban", "coastal", "maple", "alpine", "meadow", "country", "royal", "pure", "happy", "green")
+DISHES = ("chicken breast", "greek yogurt", "oatmeal", "banana", "brown rice", "salmon fillet",
+          "almond butter", "protein bar", "apple", "whole wheat bread", "cheddar cheese", "black beans",
+          "peanut butter", "tofu", "spinach salad", "beef burrito", "pasta", "granola", "avocado toast",
+          "scrambled eggs", "lentil soup", "turkey sandwich", "sweet potato", "blueberry muffin")
+QUALIFIERS = ("", "grilled", "baked", "raw", "organic", "low fat", "unsweetened", "smoked", "roasted",
+              "homemade", "frozen", "spicy", "plain", "vanilla", "chocolate", "honey")
+
+
+def synthetic_names(total, rng):
+    seen = set()
+    names = []
+    while len(names) < total:
+        parts = [rng.choice(BRANDS), rng.choice(QUALIFIERS), rng.choice(DISHES), f"{rng.randint(1, 999)}g"]
+        name = " ".join(part for part in parts if part).title()
+        if name.lower() not in seen:
+            seen.add(name.lower())
+            names.append(name)
+    return names
+
+
+def catalog_rows(names):
+    for i, name in enumerate(names):
+        count = 1 + i % 50
+        yield (name, 250.0 * count, 12.5 * count, 30.0 * count, 8.25 * count, count)
+
+
+def percentile(samples, pct):
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+def time_queries(catalogs, queries, limit):
+    samples = []
+    hits = 0
+    for catalog, query in queries:
+        start = time.perf_counter()
+        hits += bool(catalog.search(query, limit))
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples, hits
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--names", type=int, default=2000, help="distinct names per user")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    users = [synthetic_names(args.names, rng) for _ in range(args.users)]
+
+    def load(names):
+        catalog = FoodCatalog(version=1)
+        catalog.load(catalog_rows(names))
+        return catalog
+
+    start = time.perf_counter()
+    for names in users:
+        load(names)
+    load_time = time.perf_counter() - start
+    tracemalloc.start()
+    catalogs = [load(names) for names in users]
+    index_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    per_user = index_bytes / args.users
+    print(f"{args.users} users x {args.names} names loaded in {load_time / args.users * 1000:.1f} ms/user, "
+          f"{per_user / 1024:.0f} KiB/user ({per_user / args.names:.0f} B/name)")
+
+    picks = [rng.randrange(args.users) for _ in range(args.queries)]
+    sample = [(catalogs[u], rng.choice(users[u]).lower()) for u in picks]
+    workloads = (
+        ("prefix 2", [(c, name[:2]) for c, name in sample]),
+        ("prefix 5", [(c, name[:5]) for c, name in sample]),
+        ("prefix 12", [(c, name[:12]) for c, name in sample]),
+        ("substring", [(c, name[len(name) // 3:len(name) // 3 + 6]) for c, name in sample]),
+        ("miss", [(c, f"zq{name[:4]}x") for c, name in sample]),
+    )
+    print(f"{'query':10s} {'p50 us':>8s} {'p99 us':>8s} {'max us':>8s} {'hit %':>6s}")
+    for label, queries in workloads:
+        samples, hits = time_queries(catalogs, queries, args.limit)
+        print(f"{label:10s} {percentile(samples, 50) * 1e6:8.1f} {percentile(samples, 99) * 1e6:8.1f} "
+              f"{samples[-1] * 1e6:8.1f} {100 * hits / len(queries):6.1f}")
+
+    catalog, names = catalogs[0], users[0]
+    repeats = [rng.choice(names) for _ in range(1000)]
+    fresh = [f"{name} extra" for name in names[:1000]]
+    for label, batch in (("record existing", repeats), ("record new", fresh)):
+        start = time.perf_counter()
+        for name in batch:
+            catalog.add(name, 100, 5, 10, 2)
+        print(f"{label} {(time.perf_counter() - start) / len(batch) * 1e6:.1f} us/entry")
+
+
+if __name__ == "__main__":
+    main()
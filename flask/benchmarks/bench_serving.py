@@ -0,0 +1,167 @@
+"""Throughput and latency of serve.py under many concurrent connections.
+
+Starts serve.py on a local port once per --threads value and holds
+--connections keep-alive connections open, each posting /check-email
+(one users lookup per request, random emails so the user cache always
+misses) back to back for --duration seconds. Needs the Config database
+and gunicorn. --path /nutrition/preview needs no database and measures
+the server alone. More than one worker needs CACHE_BACKEND=redis (see
+serve.py).
+
+    python benchmarks/bench_serving.py --connections 200 --threads 8,16,32
+    python benchmarks/bench_serving.py --path /nutrition/preview --connections 100
+
+On one core, /nutrition/preview, 1 worker, 100 connections, 10 s:
+
+      4 threads    1362.5 req/s  p50=   68.2ms  p99=   99.9ms
+      8 threads    1383.2 req/s  p50=   64.0ms  p99=  156.7ms
+     16 threads    1165.3 req/s  p50=   75.9ms  p99=  229.0ms
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import uuid
+
+FLASK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def wait_for_port(port, proc, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with status {proc.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server did not listen on {port} within {timeout}s")
+
+
+PREVIEW = {"age": 30, "gender": "male", "weight": 80, "height": 180, "activityLevel": "sedentary",
+           "primaryGoal": "weight loss", "weightGoal": 70}
+
+
+def build_request(port, path):
+    if path == "/check-email":
+        body = json.dumps({"email": f"bench-{uuid.uuid4().hex[:12]}@example.com"}).encode()
+    else:
+        body = json.dumps(PREVIEW).encode()
+    head = (
+        f"POST {path} HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+    ).encode()
+    return head + body
+
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed")
+    length = 0
+    close = False
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "connection" and value.strip().lower() == "close":
+            close = True
+    await reader.readexactly(length)
+    return int(status_line.split()[1]), close
+
+
+async def connection_loop(port, path, deadline, latencies, errors):
+    reader = writer = None
+    while time.monotonic() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            start = time.perf_counter()
+            writer.write(build_request(port, path))
+            await writer.drain()
+            status, close = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors[status] = errors.get(status, 0) + 1
+            if close:
+                writer.close()
+                writer = None
+        except (OSError, ConnectionError, asyncio.IncompleteReadError):
+            errors["conn"] = errors.get("conn", 0) + 1
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.05)
+    if writer is not None:
+        writer.close()
+
+
+async def load(port, path, connections, duration):
+    latencies, errors = [], {}
+    deadline = time.monotonic() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*(connection_loop(port, path, deadline, latencies, errors) for _ in range(connections)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def run(threads, args):
+    env = dict(
+        os.environ,
+        SERVER_THREADS=str(threads),
+        SERVER_BIND=f"127.0.0.1:{args.port}",
+        SERVER_WORKERS=str(args.workers),
+        LOG_LEVEL="WARNING",
+        METRICS_ENABLED="false",
+    )
+    proc = subprocess.Popen([sys.executable, os.path.join(FLASK_DIR, "serve.py")], env=env, cwd=FLASK_DIR)
+    try:
+        wait_for_port(args.port, proc)
+        asyncio.run(load(args.port, args.path, min(args.connections, 10), 2.0))  # warm up pools
+        latencies, errors, elapsed = asyncio.run(load(args.port, args.path, args.connections, args.duration))
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+    if not latencies:
+        print(f"{threads:3d} threads  no responses  errors={errors}")
+        return
+    print(
+        f"{threads:3d} threads {len(latencies) / elapsed:9.1f} req/s  "
+        f"p50={percentile(latencies, 0.5) * 1000:7.1f}ms  "
+        f"p99={percentile(latencies, 0.99) * 1000:7.1f}ms  "
+        f"errors={errors or 0}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", default="8", help="comma-separated SERVER_THREADS values")
+    parser.add_argument("--connections", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds per run")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--port", type=int, default=5099)
+    parser.add_argument("--path", default="/check-email", choices=("/check-email", "/nutrition/preview"),
+                        help="/nutrition/preview needs no database and times the server alone")
+    args = parser.parse_args()
+
+    print(f"{args.path}: {args.connections} connections, {args.workers} workers, {args.duration:.0f}s per run")
+    for threads in args.threads.split(","):
+        run(int(threads), args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Signup latency: the old five-step /receive-info sequence vs. register_user.
+
+Both run against the Config database inside a request context, so they
+share one pooled connection per signup as the route would. Each signup
+uses a fresh throwaway email.
+
+    python benchmarks/bench_signup.py --signups 50
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from models.user_model import UserModel
+from services.nutrition_service import NutritionService
+from services.password_service import PasswordService
+from services.user_service import UserService
+
+PROFILE = {
+    "name": "Bench", "age": 30, "gender": "male", "weight": 80, "height": 180,
+    "activityLevel": "sedentary", "primaryGoal": "weight loss", "weightGoal": 72,
+    "password": "bench-password",
+}
+
+
+def legacy_signup(data):
+    # What /receive-info did before: pre-check, insert, re-read and
+    # re-verify through login, read again, then write the profile.
+    if UserService.check_email_exists(data["email"]):
+        return None
+    data["password_hash"] = PasswordService.hash_password(data["password"])
+    UserModel.create_user(data)
+    token = UserService.authenticate_user(data["email"], data["password"])["token"]
+    user = UserModel.get_by_email(data["email"])
+    NutritionService.calculate_nutrition(data, user["id"])
+    return token
+
+
+def transactional_signup(data):
+    return UserService.register_user(data)["token"]
+
+
+def run(app, fn, signups):
+    times = []
+    for _ in range(signups):
+        data = dict(PROFILE, email=f"bench-{uuid.uuid4().hex[:12]}@example.com")
+        with app.test_request_context():
+            start = time.perf_counter()
+            fn(data)
+            times.append(time.perf_counter() - start)
+    times.sort()
+    return statistics.median(times), times[min(len(times) - 1, int(0.99 * len(times)))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--signups", type=int, default=50)
+    args = parser.parse_args()
+
+    app = create_app()
+    for label, fn in (("legacy", legacy_signup), ("transactional", transactional_signup)):
+        p50, p99 = run(app, fn, args.signups)
+        print(f"{label:14s} p50 {p50 * 1000:8.1f} ms   p99 {p99 * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
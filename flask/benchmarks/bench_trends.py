@@ -0,0 +1,102 @@
+"""/food/trends compute time at 1, 3 and 10 years of daily history.
+
+daily_totals rows are synthesized (about 80% of days logged) in the
+shape FoodModel.get_daily_series returns and fed through the same code
+the endpoint uses, without a database:
+
+  cold         build the day array from every row (only the last
+               HISTORY_DAYS are kept), then compute
+  incremental  patch today's row into a cached array, then compute
+  cached       the per-version result lookup that serves repeat requests
+  python loop  the same 7/30-day averages and adherence as plain loops
+               over the rows, for comparison
+
+    python benchmarks/bench_trends.py
+    python benchmarks/bench_trends.py --years 1,3,10 --days 90 --repeat 50
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.trends_service import TrendsService, _new_state, _patch
+
+TARGETS = {"calorie_target": 2200, "protein_g": Decimal("150"), "carbs_g": Decimal("240"), "fat_g": Decimal("70")}
+
+
+def make_rows(years, seed=5):
+    rng = random.Random(seed)
+    today = date.today()
+    rows = []
+    for i in range(365 * years):
+        if rng.random() < 0.8:
+            rows.append((today - timedelta(days=i), float(rng.randint(1400, 3000)), float(rng.randint(60, 200)),
+                         float(rng.randint(100, 350)), float(rng.randint(30, 120)), rng.randint(1, 6)))
+    return rows
+
+
+def python_loop(rows, as_of, days):
+    # What a per-row implementation does: a dict by day, then window sums
+    # for every day of the series.
+    by_day = {row[0]: [float(v) for v in row[1:5]] for row in rows if row[5] > 0}
+    target = float(TARGETS["calorie_target"])
+    out = []
+    for offset in range(days):
+        day = as_of - timedelta(days=offset)
+        point = {}
+        for window in (7, 30):
+            logged = [by_day[d] for d in (day - timedelta(days=k) for k in range(window)) if d in by_day]
+            point[window] = [sum(v[i] for v in logged) / len(logged) if logged else None for i in range(4)]
+            point[f"adherence_{window}"] = (
+                sum(1 for v in logged if abs(v[0] - target) <= 0.1 * target) / len(logged) if logged else None)
+        out.append(point)
+    return out
+
+
+def best(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return min(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", default="1,3,10")
+    parser.add_argument("--days", type=int, default=30, help="series length returned")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    as_of = date.today()
+
+    print(f"{'years':>5s} {'rows':>6s} {'cold ms':>9s} {'incr ms':>9s} {'cached ms':>10s} {'loop ms':>9s}")
+    for years in (int(n) for n in args.years.split(",")):
+        rows = make_rows(years)
+
+        def cold():
+            state = _new_state(as_of)
+            _patch(state, rows)
+            return TrendsService.compute(state["values"], state["start"], as_of, args.days, TARGETS)
+
+        warm = _new_state(as_of)
+        _patch(warm, rows)
+        today = [rows[0]]
+
+        def incremental():
+            _patch(warm, today)
+            return TrendsService.compute(warm["values"], warm["start"], as_of, args.days, TARGETS)
+
+        results = {args.days: cold()}
+        print(f"{years:5d} {len(rows):6d} {best(cold, args.repeat):9.3f} {best(incremental, args.repeat):9.3f} "
+              f"{best(lambda: results.get(args.days), args.repeat):10.4f} "
+              f"{best(lambda: python_loop(rows, as_of, args.days), max(1, args.repeat // 4)):9.3f}")
+
+
+if __name__ == "__main__":
+    main()
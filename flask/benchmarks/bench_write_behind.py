@@ -0,0 +1,114 @@
+"""/food/log write path: synchronous insert+commit vs. the write-behind journal.
+
+--threads callers each log --rows entries for the given user. The
+synchronous mode times FoodModel.add_food_entry against the Config
+database. The queued mode times WriteBehindQueue.enqueue against a
+throwaway journal with a drainer running, then waits for the journal to
+empty, so its sustained rate covers the MySQL writes too. Entries are
+left in place; use a throwaway account. --journal-only skips MySQL
+entirely and reports enqueue latency alone.
+
+    python benchmarks/bench_write_behind.py --user-id 42 --threads 16 --rows 500
+    python benchmarks/bench_write_behind.py --journal-only --synchronous FULL
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.food_model import FoodModel
+from services.write_behind import WriteBehindQueue
+
+START = datetime(2017, 1, 1, 7, 0, 0)
+MEALS = ("breakfast", "lunch", "dinner", "snack")
+
+
+def make_entry(i):
+    return {
+        "name": f"Food {i % 500}",
+        "calories": 150 + i % 300,
+        "protein": i % 40,
+        "carbs": i % 90,
+        "fat": i % 25,
+        "meal_type": MEALS[i % 4],
+        "timestamp": (START + timedelta(minutes=9 * i)).isoformat(sep=" "),
+        "servings": 1,
+    }
+
+
+def run_threads(threads, rows, call):
+    latencies = [[] for _ in range(threads)]
+
+    def worker(n):
+        samples = latencies[n]
+        for i in range(rows):
+            entry = make_entry(n * rows + i)
+            start = time.perf_counter()
+            call(entry)
+            samples.append(time.perf_counter() - start)
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return sorted(sample for samples in latencies for sample in samples), elapsed
+
+
+def report(label, samples, elapsed, sustained=None):
+    def pct(p):
+        return samples[min(len(samples) - 1, int(len(samples) * p / 100))] * 1000
+
+    line = (f"{label:10s} p50 {pct(50):7.2f} ms  p99 {pct(99):7.2f} ms  "
+            f"accepted {len(samples) / elapsed:9,.0f}/s")
+    if sustained is not None:
+        line += f"  written {sustained:9,.0f}/s"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--user-id", type=int)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=500, help="entries per thread")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--synchronous", default="NORMAL", choices=("OFF", "NORMAL", "FULL"))
+    parser.add_argument("--journal-only", action="store_true", help="time enqueue only, no MySQL")
+    args = parser.parse_args()
+    if args.user_id is None and not args.journal_only:
+        parser.error("--user-id is required unless --journal-only")
+    user_id = args.user_id or 0
+    total = args.threads * args.rows
+
+    if not args.journal_only:
+        def insert(entry):
+            FoodModel.add_food_entry(user_id, entry["name"], entry["calories"], entry["protein"],
+                                     entry["carbs"], entry["fat"], entry["meal_type"], entry["timestamp"])
+        samples, elapsed = run_threads(args.threads, args.rows, insert)
+        report("sync", samples, elapsed, total / elapsed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = WriteBehindQueue(os.path.join(tmp, "journal.sqlite3"), synchronous=args.synchronous,
+                                 batch_size=args.batch_size)
+        if not args.journal_only:
+            queue.start()
+        start = time.perf_counter()
+        samples, elapsed = run_threads(args.threads, args.rows, lambda entry: queue.enqueue(user_id, entry))
+        sustained = None
+        if not args.journal_only:
+            while queue.pending():
+                time.sleep(0.01)
+            sustained = total / (time.perf_counter() - start)
+            queue.stop()
+        report("queued", samples, elapsed, sustained)
+
+
+if __name__ == "__main__":
+    main()
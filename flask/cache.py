@@ -0,0 +1,126 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+class LocalBackend:
+    # In-process stand-in for Redis, for one serving process. Scripts touch
+    # the epoch file instead; all counters reset when its mtime moves.
+    shared = False
+
+    def __init__(self, epoch_path=None):
+        self._data = {}
+        self._lock = threading.Lock()
+        self._epoch_path = epoch_path
+        self._epoch = self._read_epoch()
+
+    def _read_epoch(self):
+        if self._epoch_path is None:
+            return None
+        try:
+            return os.stat(self._epoch_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _check_epoch(self):
+        epoch = self._read_epoch()
+        if epoch != self._epoch:
+            self._epoch = epoch
+            self._data.clear()
+
+    def get(self, key):
+        with self._lock:
+            self._check_epoch()
+            return self._data.get(key)
+
+    def set_if_absent(self, key, value):
+        with self._lock:
+            self._check_epoch()
+            self._data.setdefault(key, value)
+
+    def incr(self, key):
+        with self._lock:
+            self._check_epoch()
+            self._data[key] = self._data.get(key, 0) + 1
+            return self._data[key]
+
+    def touch_epoch(self):
+        with open(self._epoch_path, "a"):
+            pass
+        os.utime(self._epoch_path)
+
+
+class RedisBackend:
+    shared = True
+
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis needs the redis package (pip install redis)")
+
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        value = self._client.get(key)
+        return int(value) if value is not None else None
+
+    def set_if_absent(self, key, value):
+        self._client.set(key, value, nx=True)
+
+    def incr(self, key):
+        return self._client.incr(key)
+
+
+def make_backend(name, redis_url=None, epoch_path=None):
+    if name == "redis":
+        return RedisBackend(redis_url)
+    if name == "local":
+        return LocalBackend(epoch_path)
+    raise ValueError(f"Unknown cache backend: {name}")
@@ -12,3 +12,62 @@ class Config:
     DB_PASSWORD = os.getenv("DB_PASSWORD", "")
     DB_NAME = os.getenv("DB_NAME", "stickr")
     DB_PORT = int(os.getenv("DB_PORT", 3307))
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_POOL_MAX_OVERFLOW = int(os.getenv("DB_POOL_MAX_OVERFLOW", 10))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 3600))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 4096))
+    USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", 300))
+    NUTRITION_PLAN_CACHE_SIZE = int(os.getenv("NUTRITION_PLAN_CACHE_SIZE", 10000))
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 4))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 16))
+    PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", 10))
+    AUTH_THROTTLE_WINDOW = int(os.getenv("AUTH_THROTTLE_WINDOW", 60))
+    AUTH_THROTTLE_PER_IP = int(os.getenv("AUTH_THROTTLE_PER_IP", 30))
+    AUTH_THROTTLE_PER_EMAIL = int(os.getenv("AUTH_THROTTLE_PER_EMAIL", 10))
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    LOG_JSON = os.getenv("LOG_JSON", "true").lower() == "true"
+    LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", 0.1))
+    LOG_SAMPLED_LOGGERS = os.getenv("LOG_SAMPLED_LOGGERS", "access,models").split(",")
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_SERVER_TIMING = os.getenv("METRICS_SERVER_TIMING", "false").lower() == "true"
+    METRICS_RESERVOIR_SIZE = int(os.getenv("METRICS_RESERVOIR_SIZE", 1024))
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "local")
+    CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+    SERVER_BIND = os.getenv("SERVER_BIND", "0.0.0.0:5000")
+    # The local cache backend only works in one process.
+    SERVER_WORKERS = int(os.getenv("SERVER_WORKERS",
+                                   (os.cpu_count() or 1) * 2 + 1 if CACHE_BACKEND == "redis" else 1))
+    SERVER_THREADS = int(os.getenv("SERVER_THREADS", 8))
+    SERVER_TIMEOUT = int(os.getenv("SERVER_TIMEOUT", 30))
+    SERVER_KEEPALIVE = int(os.getenv("SERVER_KEEPALIVE", 5))
+    SERVER_MAX_REQUESTS = int(os.getenv("SERVER_MAX_REQUESTS", 10000))
+    VERSION_EPOCH_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                      os.getenv("VERSION_EPOCH_FILE", "versions.epoch"))
+    RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", 2048))
+    RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", 300))
+    JSON_FAST = os.getenv("JSON_FAST", "true").lower() == "true"
+    # Roughly 0.3-0.5 KiB per distinct name per cached user.
+    CATALOG_CACHE_SIZE = int(os.getenv("CATALOG_CACHE_SIZE", 2000))
+    CATALOG_CACHE_TTL = int(os.getenv("CATALOG_CACHE_TTL", 3600))
+    CATALOG_WARM_USERS = int(os.getenv("CATALOG_WARM_USERS", 500))
+    WRITE_BEHIND_ENABLED = os.getenv("WRITE_BEHIND_ENABLED", "false").lower() == "true"
+    # Relative paths are taken from this directory, not the working directory.
+    WRITE_BEHIND_JOURNAL = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                        os.getenv("WRITE_BEHIND_JOURNAL", "food_log_queue.sqlite3"))
+    WRITE_BEHIND_SYNCHRONOUS = os.getenv("WRITE_BEHIND_SYNCHRONOUS", "NORMAL")
+    WRITE_BEHIND_BATCH_SIZE = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", 500))
+    WRITE_BEHIND_LINGER_MS = float(os.getenv("WRITE_BEHIND_LINGER_MS", 5))
+    WRITE_BEHIND_POLL_MS = float(os.getenv("WRITE_BEHIND_POLL_MS", 50))
+    WRITE_BEHIND_LEASE = float(os.getenv("WRITE_BEHIND_LEASE", 30))
+    WRITE_BEHIND_MAX_ATTEMPTS = int(os.getenv("WRITE_BEHIND_MAX_ATTEMPTS", 5))
+    WRITE_BEHIND_FLUSH_WAIT_MS = float(os.getenv("WRITE_BEHIND_FLUSH_WAIT_MS", 1000))
+    FOOD_PARTITION_MONTHS_AHEAD = int(os.getenv("FOOD_PARTITION_MONTHS_AHEAD", 3))
+    FOOD_ARCHIVE_AFTER_MONTHS = int(os.getenv("FOOD_ARCHIVE_AFTER_MONTHS", 12))
+    TRENDS_CACHE_SIZE = int(os.getenv("TRENDS_CACHE_SIZE", 10000))
+    TRENDS_CACHE_TTL = int(os.getenv("TRENDS_CACHE_TTL", 3600))
+    TRENDS_REFRESH_OVERLAP = int(os.getenv("TRENDS_REFRESH_OVERLAP", 300))
+    TRENDS_ADHERENCE_TOLERANCE = float(os.getenv("TRENDS_ADHERENCE_TOLERANCE", 0.1))
@@ -1,8 +1,19 @@
+import threading
+import time
+from queue import LifoQueue, Empty, Full
+
 import mysql.connector
+from flask import g, has_app_context
 from config import Config
+import metrics
 
-def get_db_connection():
-    db = mysql.connector.connect(
+
+class PoolTimeout(Exception):
+    pass
+
+
+def _mysql_creator():
+    return mysql.connector.connect(
         host=Config.DB_HOST,
         user=Config.DB_USER,
         password=Config.DB_PASSWORD,
@@ -11,4 +22,227 @@ def get_db_connection():
         charset="utf8mb4",
         collation="utf8mb4_unicode_ci"
     )
-    return db
+
+
+class PooledConnection:
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+        self._request_scoped = False
+        self.created_at = time.monotonic()
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, *args, **kwargs):
+        cursor = self._conn.cursor(*args, **kwargs)
+        return metrics.InstrumentedCursor(cursor) if metrics.enabled else cursor
+
+    def close(self):
+        # Request-scoped connections are released at teardown; ending the read
+        # transaction gives the next model call a fresh snapshot.
+        if self._request_scoped:
+            if getattr(self._conn, "in_transaction", False):
+                self._conn.rollback()
+            return
+        self._pool.release(self)
+
+
+class ConnectionPool:
+
+    def __init__(self, creator, size=5, max_overflow=10, recycle=3600, pre_ping=True, timeout=30.0):
+        self._creator = creator
+        self.size = size
+        self.max_overflow = max_overflow
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+        self.timeout = timeout
+        self._idle = LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+        # Signalled whenever a connection goes idle or a slot frees up.
+        self._available = threading.Condition(self._lock)
+        self._open = 0
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "created": 0,
+            "recycled": 0,
+            "invalidated": 0,
+        }
+
+    def _bump(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _create(self):
+        try:
+            conn = PooledConnection(self, self._creator())
+        except Exception:
+            self._free_slot()
+            raise
+        self._bump("created")
+        return conn
+
+    def _free_slot(self):
+        with self._lock:
+            self._open -= 1
+            self._available.notify()
+
+    def _discard(self, conn):
+        try:
+            conn._conn.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _is_alive(conn):
+        raw = conn._conn
+        try:
+            if hasattr(raw, "ping"):
+                raw.ping(reconnect=False)
+            else:
+                cursor = raw.cursor()
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+                cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def checkout(self):
+        conn = None
+        deadline = None
+        with self._lock:
+            while True:
+                try:
+                    conn = self._idle.get_nowait()
+                    break
+                except Empty:
+                    pass
+                if self._open < self.size + self.max_overflow:
+                    self._open += 1
+                    break
+                if deadline is None:
+                    self._stats["waits"] += 1
+                    deadline = time.monotonic() + self.timeout
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeout(f"No connection available within {self.timeout}s")
+                self._available.wait(remaining)
+        if conn is None:
+            conn = self._create()
+
+        if self.recycle and time.monotonic() - conn.created_at > self.recycle:
+            self._discard(conn)
+            self._bump("recycled")
+            conn = self._create()
+        elif self.pre_ping and not self._is_alive(conn):
+            self._discard(conn)
+            self._bump("invalidated")
+            conn = self._create()
+
+        conn._request_scoped = False
+        self._bump("checkouts")
+        return conn
+
+    def release(self, conn):
+        try:
+            # End any open (read) transaction so the next user gets a fresh snapshot.
+            conn._conn.rollback()
+        except Exception:
+            self._discard(conn)
+            self._free_slot()
+            return
+        with self._lock:
+            try:
+                self._idle.put_nowait(conn)
+                self._available.notify()
+                return
+            except Full:
+                pass
+        self._discard(conn)
+        self._free_slot()
+
+    def dispose(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except Empty:
+                break
+            self._discard(conn)
+            self._free_slot()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["open"] = self._open
+        stats["idle"] = self._idle.qsize()
+        stats["in_use"] = stats["open"] - stats["idle"]
+        stats["size"] = self.size
+        stats["max_overflow"] = self.max_overflow
+        return stats
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _pool_from_config(config, creator=_mysql_creator):
+    return ConnectionPool(
+        creator,
+        size=config["DB_POOL_SIZE"],
+        max_overflow=config["DB_POOL_MAX_OVERFLOW"],
+        recycle=config["DB_POOL_RECYCLE"],
+        pre_ping=config["DB_POOL_PRE_PING"],
+        timeout=config["DB_POOL_TIMEOUT"],
+    )
+
+
+def init_pool(app, creator=_mysql_creator):
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.dispose()
+        _pool = _pool_from_config(app.config, creator)
+    app.teardown_appcontext(_release_request_connection)
+    return _pool
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = _pool_from_config(vars(Config))
+    return _pool
+
+
+def _release_request_connection(exc=None):
+    conn = g.pop("_db_conn", None)
+    if conn is not None:
+        conn._request_scoped = False
+        conn.close()
+
+
+def get_db_connection():
+    # Inside a request every model call shares one checked-out connection;
+    # outside (CLI scripts, background threads) each call gets its own.
+    if has_app_context():
+        conn = g.get("_db_conn")
+        if conn is None:
+            start = time.perf_counter()
+            conn = get_pool().checkout()
+            metrics.add_timing("pool", time.perf_counter() - start)
+            conn._request_scoped = True
+            g._db_conn = conn
+        return conn
+    return get_pool().checkout()
+
+
+def get_dedicated_connection():
+    # A connection outside the pool, for session state such as LOCK TABLES
+    # that must never be handed on to another caller; close() closes it.
+    return _mysql_creator()
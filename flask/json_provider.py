@@ -0,0 +1,65 @@
+import decimal
+from datetime import date, datetime, timezone
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+_DAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+
+def _http_date(d):
+    # werkzeug's http_date goes through email.utils and dominates encoding
+    # time on entry lists; same output, built directly.
+    if not isinstance(d, datetime):
+        d = datetime(d.year, d.month, d.day)
+    elif d.tzinfo is not None:
+        d = d.astimezone(timezone.utc)
+    return (f"{_DAYS[d.weekday()]}, {d.day:02d} {_MONTHS[d.month - 1]} {d.year:04d} "
+            f"{d.hour:02d}:{d.minute:02d}:{d.second:02d} GMT")
+
+
+def _default(o):
+    # Matches Flask's default encoder so switching providers doesn't change
+    # what clients receive: RFC 822 dates and Decimals as strings.
+    if isinstance(o, date):
+        return _http_date(o)
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(DefaultJSONProvider):
+
+    def _options(self, indent=None, sort_keys=None):
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys if sort_keys is None else sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps_bytes(self, obj, indent=None, sort_keys=None):
+        return orjson.dumps(obj, default=_default, option=self._options(indent, sort_keys))
+
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj, kwargs.get("indent"), kwargs.get("sort_keys")).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.dumps_bytes(obj, indent) + b"\n", mimetype=self.mimetype)
+
+
+def init_json(app):
+    if app.config["JSON_FAST"] and orjson is not None:
+        app.json = OrjsonProvider(app)
@@ -0,0 +1,122 @@
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import time
+import uuid
+from flask import g, has_request_context, request
+
+_listener = None
+
+
+class RequestIdFilter(logging.Filter):
+    # Runs in the request thread, before the record is queued.
+    def filter(self, record):
+        record.request_id = g.get("request_id", "-") if has_request_context() else "-"
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    # Keeps a fraction of INFO/DEBUG records from hot-path loggers; warnings
+    # and errors always pass.
+    def __init__(self, prefixes, rate):
+        super().__init__()
+        self.prefixes = tuple(p.strip() for p in prefixes if p.strip())
+        self.rate = rate
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or not record.name.startswith(self.prefixes):
+            return True
+        return random.random() < self.rate
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    # Like the stock prepare(), on a copy, but leaves formatting to the
+    # listener thread.
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "request_id"}
+
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "msg": record.getMessage(),
+        }
+        entry.update({k: v for k, v in vars(record).items() if k not in self.RESERVED})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(_stop_listener)
+
+
+def configure_logging(config, stream=None):
+    global _listener
+    _stop_listener()
+
+    target = logging.StreamHandler(stream or sys.stdout)
+    if config["LOG_JSON"]:
+        target.setFormatter(JsonFormatter())
+    else:
+        target.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"))
+
+    # Formatting and I/O happen on the listener thread; request threads only
+    # pay for building the record and a queue put.
+    log_queue = queue.SimpleQueue()
+    handler = _QueueHandler(log_queue)
+    handler.addFilter(RequestIdFilter())
+    handler.addFilter(SamplingFilter(config["LOG_SAMPLED_LOGGERS"], config["LOG_SAMPLE_RATE"]))
+    _listener = logging.handlers.QueueListener(log_queue, target, respect_handler_level=True)
+    _listener.start()
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(config["LOG_LEVEL"])
+
+
+def init_logging(app):
+    configure_logging(app.config)
+    access_log = logging.getLogger("access")
+
+    @app.before_request
+    def assign_request_id():
+        g.request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def log_request(response):
+        response.headers["X-Request-ID"] = g.request_id
+        if access_log.isEnabledFor(logging.INFO):
+            access_log.info("request", extra={
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                "duration_ms": round((time.perf_counter() - g.request_started) * 1000, 2),
+            })
+        return response
@@ -0,0 +1,280 @@
+import hmac
+import re
+import threading
+import time
+from collections import deque
+from flask import Response, g, has_request_context, request
+from flask.json.provider import JSONProvider
+
+QUANTILES = (0.5, 0.95, 0.99)
+# UNION reads start with "(", and an UPDATE names its table right away.
+_QUERY_RE = re.compile(r"^[\s(]*(\w+)(?:(?<=UPDATE)|.*?\b(?:FROM|INTO|UPDATE|TABLE))\s+`?(\w+)",
+                       re.IGNORECASE | re.DOTALL)
+
+enabled = False
+_reservoir_size = 1024
+
+
+class Summary:
+    # count/sum over the process lifetime plus a window of recent samples
+    # for quantiles.
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=_reservoir_size)
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        self.samples.append(value)
+
+    def quantiles(self):
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {q: 0.0 for q in QUANTILES}
+        return {q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in QUANTILES}
+
+
+class Registry:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._summaries = {}
+        self._help = {}
+
+    def observe(self, name, labels, value):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                summary = self._summaries[key] = Summary()
+            summary.observe(value)
+
+    def describe(self, name, text):
+        self._help[name] = text
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._summaries.items())
+            snapshots = [(name, labels, s.count, s.total, s.quantiles()) for (name, labels), s in items]
+        lines = []
+        seen = set()
+        for name, labels, count, total, quantiles in snapshots:
+            if name not in seen:
+                seen.add(name)
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} summary")
+            for q, value in quantiles.items():
+                lines.append(f"{name}{_labels(labels + (('quantile', str(q)),))} {value:.6f}")
+            lines.append(f"{name}_sum{_labels(labels)} {total:.6f}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+        return lines
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+registry = Registry()
+registry.describe("http_request_duration_seconds", "Time spent handling a request, per endpoint.")
+registry.describe("http_request_phase_seconds", "Per-request time spent in db, pool checkout, jwt and json phases.")
+registry.describe("db_query_duration_seconds", "Statement execute and fetch time, per statement kind and table.")
+registry.describe("db_query_rows", "Rows returned or affected, per statement kind and table.")
+
+
+def query_label(sql):
+    match = _QUERY_RE.match(sql)
+    if not match:
+        return sql.split(None, 1)[0].upper() if sql.strip() else "EMPTY"
+    return f"{match.group(1).upper()} {match.group(2)}"
+
+
+def add_timing(phase, seconds):
+    if has_request_context():
+        timings = g.setdefault("_timings", {})
+        timings[phase] = timings.get(phase, 0.0) + seconds
+
+
+def observe_query(label, seconds, rows):
+    registry.observe("db_query_duration_seconds", {"query": label}, seconds)
+    registry.observe("db_query_rows", {"query": label}, rows)
+    add_timing("db", seconds)
+
+
+class InstrumentedCursor:
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._label = None
+        self._elapsed = 0.0
+        self._rows = 0
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def _timed(self, fn, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._elapsed += time.perf_counter() - start
+
+    def _flush(self):
+        if self._label is not None:
+            rows = self._rows or max(getattr(self._cursor, "rowcount", 0) or 0, 0)
+            observe_query(self._label, self._elapsed, rows)
+        self._label, self._elapsed, self._rows = None, 0.0, 0
+
+    def execute(self, operation, *args, **kwargs):
+        self._flush()
+        self._label = query_label(operation)
+        return self._timed(self._cursor.execute, operation, *args, **kwargs)
+
+    def executemany(self, operation, *args, **kwargs):
+        self._flush()
+        self._label = query_label(operation)
+        return self._timed(self._cursor.executemany, operation, *args, **kwargs)
+
+    def fetchone(self):
+        row = self._timed(self._cursor.fetchone)
+        if row is not None:
+            self._rows += 1
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._timed(self._cursor.fetchmany, *args, **kwargs)
+        self._rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(self._cursor.fetchall)
+        self._rows += len(rows)
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def close(self):
+        self._flush()
+        return self._cursor.close()
+
+
+class TimedJSONProvider(JSONProvider):
+    # Wraps whichever JSON provider the app uses so serialization shows up
+    # as its own phase.
+
+    def __init__(self, app, inner):
+        super().__init__(app)
+        self.inner = inner
+
+    def dumps(self, obj, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self.inner.dumps(obj, **kwargs)
+        finally:
+            add_timing("json", time.perf_counter() - start)
+
+    def loads(self, s, **kwargs):
+        return self.inner.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self.inner.response(*args, **kwargs)
+        finally:
+            add_timing("json", time.perf_counter() - start)
+
+
+def _gauges():
+    from database import get_pool
+    from services.nutrition_service import NutritionService
+    from services.user_service import _user_cache
+    from services import write_behind
+
+    lines = []
+    for key, value in get_pool().stats().items():
+        lines.append(f"# TYPE db_pool_{key} gauge")
+        lines.append(f"db_pool_{key} {value}")
+    for prefix, stats in (("nutrition_plan_cache", NutritionService.plan_cache_info()),
+                          ("user_cache", _user_cache.stats())):
+        for key, value in stats.items():
+            lines.append(f"# TYPE {prefix}_{key} gauge")
+            lines.append(f"{prefix}_{key} {value}")
+    if write_behind.queue is not None:
+        for key, dead in (("queued", False), ("dead", True)):
+            lines.append(f"# TYPE write_behind_{key} gauge")
+            lines.append(f"write_behind_{key} {write_behind.queue.pending(dead=dead)}")
+    return lines
+
+
+def init_metrics(app):
+    global enabled, _reservoir_size
+    if not app.config["METRICS_ENABLED"]:
+        return
+    enabled = True
+    _reservoir_size = app.config["METRICS_RESERVOIR_SIZE"]
+    server_timing = app.config["METRICS_SERVER_TIMING"]
+    app.json = TimedJSONProvider(app, app.json)
+
+    from extensions import jwt
+    from flask_jwt_extended.config import config as jwt_config
+
+    # flask-jwt-extended asks for the key right before verifying the
+    # signature and calls the verification hook right after.
+    @jwt.decode_key_loader
+    def start_jwt_timer(header, payload):
+        g._jwt_started = time.perf_counter()
+        return jwt_config.decode_key
+
+    @jwt.token_verification_loader
+    def stop_jwt_timer(header, payload):
+        started = g.pop("_jwt_started", None)
+        if started is not None:
+            add_timing("jwt", time.perf_counter() - started)
+        return True
+
+    @app.before_request
+    def start_timer():
+        g._metrics_started = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        started = g.pop("_metrics_started", None)
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        labels = {"endpoint": endpoint, "method": request.method, "status": str(response.status_code)}
+        registry.observe("http_request_duration_seconds", labels, elapsed)
+        timings = g.get("_timings", {})
+        for phase, seconds in timings.items():
+            registry.observe("http_request_phase_seconds", {"endpoint": endpoint, "phase": phase}, seconds)
+        if server_timing:
+            parts = [f"{phase};dur={seconds * 1000:.2f}" for phase, seconds in timings.items()]
+            parts.append(f"total;dur={elapsed * 1000:.2f}")
+            response.headers["Server-Timing"] = ", ".join(parts)
+        return response
+
+    # The app listens on every interface, so /metrics is only served to
+    # scrapers presenting METRICS_TOKEN, and not at all without one.
+    token = app.config["METRICS_TOKEN"]
+    if not token:
+        return
+    expected = f"Bearer {token}".encode()
+
+    def metrics_endpoint():
+        if not hmac.compare_digest(request.headers.get("Authorization", "").encode(), expected):
+            return Response("Unauthorized\n", status=401, mimetype="text/plain",
+                            headers={"WWW-Authenticate": "Bearer"})
+        body = "\n".join(registry.render() + _gauges()) + "\n"
+        return Response(body, mimetype="text/plain; version=0.0.4")
+
+    app.add_url_rule("/metrics", "metrics", metrics_endpoint)
@@ -0,0 +1,42 @@
+import os
+import sys
+
+from database import get_db_connection
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+
+def _statements(sql):
+    lines = [line for line in sql.splitlines() if not line.strip().startswith("--")]
+    return [stmt.strip() for stmt in "\n".join(lines).split(";") if stmt.strip()]
+
+
+def migrate(dry_run=False):
+    db = get_db_connection()
+    cursor = db.cursor()
+    cursor.execute(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        " name VARCHAR(255) PRIMARY KEY,"
+        " applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+    )
+    cursor.execute("SELECT name FROM schema_migrations")
+    applied = {row[0] for row in cursor.fetchall()}
+
+    for name in sorted(os.listdir(MIGRATIONS_DIR)):
+        if not name.endswith(".sql") or name in applied:
+            continue
+        print(f"Applying {name}")
+        if dry_run:
+            continue
+        with open(os.path.join(MIGRATIONS_DIR, name)) as f:
+            for stmt in _statements(f.read()):
+                cursor.execute(stmt)
+        cursor.execute("INSERT INTO schema_migrations (name) VALUES (%s)", (name,))
+        db.commit()
+
+    cursor.close()
+    db.close()
+
+
+if __name__ == "__main__":
+    migrate(dry_run="--dry-run" in sys.argv)
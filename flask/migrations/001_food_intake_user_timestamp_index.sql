@@ -0,0 +1,2 @@
+-- Keyset pagination of /food/entries walks (user_id, timestamp, id) in reverse.
+CREATE INDEX idx_food_intake_user_ts_id ON food_intake (user_id, timestamp, id);
@@ -0,0 +1,13 @@
+-- Per-day rollup of food_intake, maintained by FoodModel in the same
+-- transaction as each write. Rebuild with scripts/rebuild_daily_totals.py.
+CREATE TABLE IF NOT EXISTS daily_totals (
+    user_id INT NOT NULL,
+    day DATE NOT NULL,
+    calories DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    protein DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    carbs DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    fat DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    entries INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, day)
+);
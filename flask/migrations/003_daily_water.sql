@@ -0,0 +1,16 @@
+-- Water intake gets its own per-day row instead of riding on whichever
+-- food_intake row happened to be latest.
+CREATE TABLE IF NOT EXISTS daily_water (
+    user_id INT NOT NULL,
+    day DATE NOT NULL,
+    water_l DECIMAL(6, 2) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, day)
+);
+
+INSERT INTO daily_water (user_id, day, water_l)
+SELECT user_id, DATE(timestamp), MAX(waterConsumed)
+FROM food_intake
+WHERE waterConsumed > 0
+GROUP BY user_id, DATE(timestamp)
+ON DUPLICATE KEY UPDATE water_l = VALUES(water_l);
@@ -0,0 +1,15 @@
+-- Checkpoints for CSV imports. rows_done is advanced in the same
+-- transaction as each chunk's inserts, so a rerun with the same import_key
+-- skips exactly the rows already loaded.
+CREATE TABLE IF NOT EXISTS food_imports (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    import_key VARCHAR(64) NOT NULL,
+    rows_done INT NOT NULL DEFAULT 0,
+    rows_imported INT NOT NULL DEFAULT 0,
+    rows_failed INT NOT NULL DEFAULT 0,
+    completed_at DATETIME NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_food_imports_user_key (user_id, import_key)
+);
@@ -0,0 +1,5 @@
+-- Registration relies on this index to reject a taken email inside its
+-- transaction instead of looking it up first. The column collation is
+-- case-insensitive, so addresses differing only in case also collide.
+-- Resolve any existing duplicates before applying.
+ALTER TABLE users ADD UNIQUE KEY uq_users_email (email);
@@ -0,0 +1,18 @@
+-- nutrition_profiles becomes append-only history; the profile in effect is
+-- the one active_nutrition_profiles points at, so reading it is two
+-- primary-key lookups regardless of how many rows a user accumulates.
+ALTER TABLE nutrition_profiles
+    ADD COLUMN weight_kg DECIMAL(6, 2) NULL,
+    ADD COLUMN created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    ADD INDEX idx_nutrition_profiles_user_id (user_id, id);
+
+CREATE TABLE IF NOT EXISTS active_nutrition_profiles (
+    user_id INT NOT NULL PRIMARY KEY,
+    profile_id INT NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+-- Until now the newest row was the intended one.
+INSERT INTO active_nutrition_profiles (user_id, profile_id)
+SELECT user_id, MAX(id) FROM nutrition_profiles GROUP BY user_id
+ON DUPLICATE KEY UPDATE profile_id = VALUES(profile_id);
@@ -0,0 +1,23 @@
+-- Change feed for /food/sync. Every food_intake or daily_water write
+-- appends a row here under the user's next revision (user_revisions), in
+-- the same transaction, so clients can ask for "everything after N".
+CREATE TABLE IF NOT EXISTS user_revisions (
+    user_id INT NOT NULL PRIMARY KEY,
+    revision BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS food_changes (
+    user_id INT NOT NULL,
+    revision BIGINT NOT NULL,
+    kind VARCHAR(8) NOT NULL,
+    op VARCHAR(8) NOT NULL,
+    entry_id INT NULL,
+    day DATE NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, revision)
+);
+
+-- Lets a client retry a queued write without logging it twice.
+ALTER TABLE food_intake
+    ADD COLUMN client_ref VARCHAR(64) NULL,
+    ADD UNIQUE KEY uq_food_intake_client_ref (user_id, client_ref);
@@ -0,0 +1,40 @@
+-- Cold storage for months moved out of food_intake by
+-- scripts/manage_food_partitions.py. Same columns as food_intake, clustered
+-- by (user_id, timestamp, id) for per-user history reads and compressed.
+-- FoodModel reads it together with food_intake; it is never written to
+-- by requests.
+CREATE TABLE IF NOT EXISTS food_intake_archive LIKE food_intake;
+
+ALTER TABLE food_intake_archive
+    MODIFY id INT NOT NULL,
+    DROP PRIMARY KEY,
+    DROP INDEX idx_food_intake_user_ts_id,
+    DROP INDEX uq_food_intake_client_ref,
+    ADD PRIMARY KEY (user_id, timestamp, id),
+    ADD KEY idx_food_intake_archive_user_id (user_id, id),
+    ROW_FORMAT=COMPRESSED KEY_BLOCK_SIZE=8;
+
+CREATE TABLE IF NOT EXISTS food_intake_archive_runs (
+    partition_name VARCHAR(16) NOT NULL PRIMARY KEY,
+    upper_bound DATETIME NOT NULL,
+    row_count BIGINT NOT NULL DEFAULT 0,
+    archived_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Monthly range partitions on timestamp. MySQL needs the partitioning
+-- column in every unique key, so the primary key becomes (id, timestamp)
+-- and the client_ref key gains timestamp; a retried write carries the same
+-- timestamp, so it still collides. Partitioned tables cannot have foreign
+-- keys; drop any on food_intake before applying this.
+ALTER TABLE food_intake
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (id, timestamp),
+    DROP INDEX uq_food_intake_client_ref,
+    ADD UNIQUE KEY uq_food_intake_client_ref (user_id, client_ref, timestamp);
+
+-- Starts as a single catch-all; scripts/manage_food_partitions.py splits it
+-- into months (a one-off copy of the table) and keeps months ahead of the
+-- clock from then on.
+ALTER TABLE food_intake PARTITION BY RANGE COLUMNS (timestamp) (
+    PARTITION p_future VALUES LESS THAN (MAXVALUE)
+);
@@ -0,0 +1,8 @@
+-- scripts/manage_food_partitions.py swaps a month's partition into this
+-- table with EXCHANGE PARTITION, merges it into food_intake_archive and
+-- empties it again. EXCHANGE needs an unpartitioned table with exactly
+-- food_intake's columns and indexes; apply any later change to
+-- food_intake here too. FoodModel reads it along with the other two.
+CREATE TABLE IF NOT EXISTS food_intake_archive_staging LIKE food_intake;
+
+ALTER TABLE food_intake_archive_staging REMOVE PARTITIONING;
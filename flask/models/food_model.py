@@ -1,92 +1,895 @@
-from database import get_db_connection
+import logging
+from datetime import datetime
+import mysql.connector
+from mysql.connector import errorcode
+from database import get_db_connection, get_dedicated_connection
+import versions
+
+logger = logging.getLogger(__name__)
+
+ENTRY_COLUMNS = "id, user_id, name, calories, protein, carbs, fat, meal_type, timestamp, servings, waterConsumed, client_ref"
+TOTALS_COLUMNS = "day, calories, protein, carbs, fat, entries"
+EXPORT_COLUMNS = ("id", "timestamp", "meal_type", "name", "servings", "calories", "protein", "carbs", "fat")
+# Months moved out of the partitioned food_intake by
+# scripts/manage_food_partitions.py. Read-only; see _history.
+ARCHIVE_TABLE = "food_intake_archive"
+# Unpartitioned twin of food_intake that a month's partition is exchanged
+# into before its rows are merged into ARCHIVE_TABLE. Empty between runs.
+STAGING_TABLE = "food_intake_archive_staging"
+HISTORY_TABLES = ("food_intake", STAGING_TABLE, ARCHIVE_TABLE)
+
+
+class EntryArchived(Exception):
+    pass
+
+
+class ImportConflict(Exception):
+    pass
+
+
+def _apply_rollup(cursor, where, params, factor="COALESCE(servings, 1)", factor_params=(), entries=1):
+    # Adds the selected food_intake rows, scaled by `factor`, into their
+    # daily_totals bucket. Runs on the caller's cursor so it commits (or
+    # rolls back) together with the write it accompanies.
+    cursor.execute(
+        f"""
+        INSERT INTO daily_totals (user_id, day, calories, protein, carbs, fat, entries)
+        SELECT * FROM (
+            SELECT user_id, DATE(timestamp) AS day,
+                   COALESCE(calories, 0) * {factor} AS calories,
+                   COALESCE(protein, 0) * {factor} AS protein,
+                   COALESCE(carbs, 0) * {factor} AS carbs,
+                   COALESCE(fat, 0) * {factor} AS fat,
+                   CASE WHEN meal_type = 'water' THEN 0 ELSE %s END AS entries
+            FROM food_intake WHERE {where}
+        ) AS d
+        ON DUPLICATE KEY UPDATE
+            calories = daily_totals.calories + d.calories,
+            protein = daily_totals.protein + d.protein,
+            carbs = daily_totals.carbs + d.carbs,
+            fat = daily_totals.fat + d.fat,
+            entries = daily_totals.entries + d.entries
+        """,
+        (*factor_params * 4, entries, *params)
+    )
+
+
+def _next_revisions(cursor, user_id, count):
+    # Reserves `count` revisions and returns the first. The row stays locked
+    # until commit, so changes become visible in revision order.
+    cursor.execute(
+        """
+        INSERT INTO user_revisions (user_id, revision) VALUES (%s, LAST_INSERT_ID(%s))
+        ON DUPLICATE KEY UPDATE revision = LAST_INSERT_ID(revision + %s)
+        """,
+        (user_id, count, count)
+    )
+    return cursor.lastrowid - count + 1
+
+
+def _record_entry_changes(cursor, user_id, op, entry_ids):
+    first = _next_revisions(cursor, user_id, len(entry_ids))
+    cursor.executemany(
+        "INSERT INTO food_changes (user_id, revision, kind, op, entry_id) VALUES (%s, %s, 'entry', %s, %s)",
+        [(user_id, first + i, op, entry_id) for i, entry_id in enumerate(entry_ids)]
+    )
+
+
+def _record_water_change(cursor, user_id):
+    cursor.execute(
+        "INSERT INTO food_changes (user_id, revision, kind, op, day) VALUES (%s, %s, 'water', 'upsert', CURDATE())",
+        (user_id, _next_revisions(cursor, user_id, 1))
+    )
+
+
+# STAGING_TABLE minus the rows a merge has already copied into the archive,
+# so a month being archived is returned once while it sits in both.
+_STAGED = (
+    f"(SELECT * FROM {STAGING_TABLE} s WHERE NOT EXISTS (SELECT 1 FROM {ARCHIVE_TABLE} a "
+    f"WHERE a.user_id = s.user_id AND a.timestamp = s.timestamp AND a.id = s.id)) AS staged"
+)
+
+
+def _history(select, params, archived=True):
+    # Runs `select` over food_intake and, if `archived`, staging and the
+    # archive; each branch uses its table's (user_id, timestamp, id) index.
+    tables = ("food_intake", _STAGED, ARCHIVE_TABLE) if archived else ("food_intake",)
+    sql = " UNION ALL ".join(f"({select.format(table=table)})" for table in tables)
+    return sql, tuple(params) * len(tables)
+
+
+def _probe(db, sql, params):
+    cursor = db.cursor()
+    cursor.execute(sql, params)
+    value, = cursor.fetchall()[0]
+    cursor.close()
+    return bool(value)
+
+
+def _reaches_archive(db, since):
+    # Whether staged or archived rows can be at or after `since` (None: any):
+    # all are older than the newest archive run's upper_bound.
+    return _probe(
+        db,
+        "SELECT COALESCE(MAX(upper_bound) > %s, MAX(upper_bound) IS NOT NULL) FROM food_intake_archive_runs",
+        (since,)
+    )
+
+
+def _is_archived(cursor, user_id, entry_id):
+    cursor.execute(
+        f"""
+        SELECT 1 FROM {ARCHIVE_TABLE} WHERE user_id = %s AND id = %s
+        UNION ALL
+        SELECT 1 FROM {STAGING_TABLE} WHERE user_id = %s AND id = %s
+        LIMIT 1
+        """,
+        (user_id, entry_id) * 2
+    )
+    return cursor.fetchone() is not None
+
+
+def _close_streaming(db, cursor):
+    # A stream abandoned mid-way (client disconnect) leaves an unread result
+    # set; closing then fails, and so does the rollback on release, which
+    # makes the pool discard the connection rather than reuse it.
+    try:
+        cursor.close()
+    except Exception:
+        logger.warning("streaming cursor closed with unread rows")
+    db.close()
+
 
 class FoodModel:
 
     @staticmethod
     def add_food_entry(user_id, name, calories, protein, carbs, fat, meal_type, timestamp, servings=1, waterConsumed = 0):
+        entry = {
+            "name": name,
+            "calories": calories,
+            "protein": protein,
+            "carbs": carbs,
+            "fat": fat,
+            "meal_type": meal_type,
+            "timestamp": timestamp,
+            "servings": servings,
+            "waterConsumed": waterConsumed,
+        }
         try:
             db = get_db_connection()
             cursor = db.cursor()
-            sql = """
-                INSERT INTO food_intake (user_id, name, calories, protein, carbs, fat, meal_type, timestamp, servings, waterConsumed)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            entry_id, = FoodModel._insert_entries(cursor, user_id, [entry])
+            db.commit()
+            versions.bump(user_id)
+            logger.info("food entry logged", extra={"user_id": user_id, "entry_id": entry_id})
+        except Exception:
+            logger.exception("failed to insert food entry", extra={"user_id": user_id})
+            db.rollback()
+            raise
+        finally:
+            cursor.close()
+            db.close()
+        return entry_id
+
+    # Cursor-level writes. Each keeps daily_totals and the change feed in
+    # step with food_intake; callers own the transaction.
+
+    @staticmethod
+    def _insert_entries(cursor, user_id, entries):
+        rows = [
+            (user_id, e["name"], e["calories"], e["protein"], e["carbs"], e["fat"],
+             e["meal_type"], e["timestamp"], e.get("servings", 1), e.get("waterConsumed", 0), e.get("client_ref"))
+            for e in entries
+        ]
+        cursor.executemany(
+            """
+            INSERT INTO food_intake (user_id, name, calories, protein, carbs, fat, meal_type, timestamp, servings, waterConsumed, client_ref)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """,
+            rows
+        )
+        # executemany sends one multi-row INSERT; InnoDB hands a simple
+        # insert a consecutive id block starting at lastrowid.
+        first_id = cursor.lastrowid
+        last_id = first_id + len(rows) - 1
+        ids = list(range(first_id, last_id + 1))
+        _apply_rollup(cursor, "user_id = %s AND id BETWEEN %s AND %s", (user_id, first_id, last_id))
+        _record_entry_changes(cursor, user_id, "upsert", ids)
+        return ids
+
+    @staticmethod
+    def _insert_client_entry(cursor, user_id, entry):
+        # A queued client write carries a client_ref; a retry of one that
+        # already landed hits uq_food_intake_client_ref and gets the
+        # original id back. Returns (id, created).
+        try:
+            entry_id, = FoodModel._insert_entries(cursor, user_id, [entry])
+            return entry_id, True
+        except mysql.connector.IntegrityError as e:
+            if e.errno != errorcode.ER_DUP_ENTRY:
+                raise
+        cursor.execute(
+            "SELECT id FROM food_intake WHERE user_id = %s AND client_ref = %s ORDER BY id LIMIT 1",
+            (user_id, entry["client_ref"])
+        )
+        return cursor.fetchone()[0], False
+
+    @staticmethod
+    def _delete_entry(cursor, user_id, entry_id):
+        _apply_rollup(cursor, "id = %s AND user_id = %s", (entry_id, user_id),
+                      factor="-COALESCE(servings, 1)", entries=-1)
+        cursor.execute("DELETE FROM food_intake WHERE id = %s AND user_id = %s", (entry_id, user_id))
+        if cursor.rowcount <= 0:
+            return False
+        _record_entry_changes(cursor, user_id, "delete", [entry_id])
+        return True
+
+    @staticmethod
+    def _update_servings(cursor, user_id, entry_id, servings):
+        _apply_rollup(cursor, "id = %s AND user_id = %s", (entry_id, user_id),
+                      factor="(%s - COALESCE(servings, 1))", factor_params=(servings,), entries=0)
+        cursor.execute(
+            "UPDATE food_intake SET servings = %s WHERE id = %s AND user_id = %s",
+            (servings, entry_id, user_id)
+        )
+        if cursor.rowcount <= 0:
+            return False
+        _record_entry_changes(cursor, user_id, "upsert", [entry_id])
+        return True
+
+    @staticmethod
+    def _set_water(cursor, user_id, water):
+        cursor.execute(
             """
-            values = (user_id, name, calories, protein, carbs, fat, meal_type, timestamp, servings, waterConsumed)
-            print(f"Executing SQL: {sql} with values {values}")
-            cursor.execute(sql, values)
+            INSERT INTO daily_water (user_id, day, water_l) VALUES (%s, CURDATE(), %s)
+            ON DUPLICATE KEY UPDATE water_l = VALUES(water_l)
+            """,
+            (user_id, water)
+        )
+        _record_water_change(cursor, user_id)
+
+    @staticmethod
+    def _add_water(cursor, user_id, delta):
+        cursor.execute(
+            """
+            INSERT INTO daily_water (user_id, day, water_l) VALUES (%s, CURDATE(), GREATEST(%s, 0))
+            ON DUPLICATE KEY UPDATE water_l = GREATEST(water_l + %s, 0)
+            """,
+            (user_id, delta, delta)
+        )
+        _record_water_change(cursor, user_id)
+
+    @staticmethod
+    def apply_mutations(user_id, mutations):
+        # Replays a client's queued writes in one transaction. `mutations`
+        # are (op, args) pairs already validated by the service; returns one
+        # result dict per mutation.
+        handlers = {
+            "log": FoodModel._insert_client_entry,
+            "delete": FoodModel._delete_entry,
+            "servings": FoodModel._update_servings,
+            "water": FoodModel._set_water,
+            "water_delta": FoodModel._add_water,
+        }
+        results = []
+        try:
+            db = get_db_connection()
+            cursor = db.cursor()
+            for op, args in mutations:
+                outcome = handlers[op](cursor, user_id, *args)
+                if op == "log":
+                    entry_id, created = outcome
+                    results.append({"success": True, "id": entry_id, "duplicate": not created})
+                elif op in ("delete", "servings"):
+                    if outcome:
+                        results.append({"success": True})
+                    elif _is_archived(cursor, user_id, args[0]):
+                        results.append({"success": False, "error": "Entry is archived and read-only"})
+                    else:
+                        results.append({"success": False, "error": "Entry not found"})
+                else:
+                    results.append({"success": True})
             db.commit()
-        except Exception as e:
-            print(f"Error inserting food entry: {e}")
+            versions.bump(user_id)
+        except Exception:
+            logger.exception("failed to apply queued mutations", extra={"user_id": user_id, "count": len(mutations)})
             db.rollback()
             raise
         finally:
             cursor.close()
             db.close()
-    
+        return results
+
+    @staticmethod
+    def get_changes(user_id, since, limit):
+        # Reads the current revision and the change rows after `since` in one
+        # snapshot; at most limit + 1 rows so the caller can tell has_more.
+        db = get_db_connection()
+        cursor = db.cursor(dictionary=True)
+        cursor.execute("SELECT revision FROM user_revisions WHERE user_id = %s", (user_id,))
+        row = cursor.fetchone()
+        current = row["revision"] if row else 0
+        cursor.execute(
+            """
+            SELECT revision, kind, op, entry_id, day FROM food_changes
+            WHERE user_id = %s AND revision > %s
+            ORDER BY revision
+            LIMIT %s
+            """,
+            (user_id, since, limit + 1)
+        )
+        changes = cursor.fetchall()
+        cursor.close()
+        db.close()
+        return current, changes
+
+    @staticmethod
+    def get_entries_by_ids(user_id, ids):
+        if not ids:
+            return []
+        db = get_db_connection()
+        cursor = db.cursor(dictionary=True)
+        cursor.execute(*_history(
+            f"SELECT {ENTRY_COLUMNS} FROM {{table}} WHERE user_id = %s AND id IN ({', '.join(['%s'] * len(ids))})",
+            (user_id, *ids)
+        ))
+        rows = cursor.fetchall()
+        cursor.close()
+        db.close()
+        return rows
+
+    @staticmethod
+    def add_food_entries(user_id, entries):
+        try:
+            db = get_db_connection()
+            cursor = db.cursor()
+            ids = FoodModel._insert_entries(cursor, user_id, entries)
+            db.commit()
+            versions.bump(user_id)
+            logger.info("food entries logged", extra={"user_id": user_id, "count": len(entries)})
+        except Exception:
+            logger.exception("failed to insert food entries", extra={"user_id": user_id, "count": len(entries)})
+            db.rollback()
+            raise
+        finally:
+            cursor.close()
+            db.close()
+        return ids
+
+    @staticmethod
+    def add_queued_entries(groups):
+        # {user_id: [entry, ...]} in one transaction, a multi-row INSERT per
+        # user. If a retry hits client_ref duplicates, rows go in one by one.
+        try:
+            db = get_db_connection()
+            cursor = db.cursor()
+            for user_id, entries in groups.items():
+                try:
+                    FoodModel._insert_entries(cursor, user_id, entries)
+                except mysql.connector.IntegrityError as e:
+                    if e.errno != errorcode.ER_DUP_ENTRY:
+                        raise
+                    for entry in entries:
+                        FoodModel._insert_client_entry(cursor, user_id, entry)
+            db.commit()
+            for user_id in groups:
+                versions.bump(user_id)
+            logger.info("queued food entries written", extra={
+                "users": len(groups), "count": sum(len(entries) for entries in groups.values())})
+        except Exception:
+            logger.exception("failed to write queued food entries", extra={"users": len(groups)})
+            db.rollback()
+            raise
+        finally:
+            cursor.close()
+            db.close()
+
+    @staticmethod
+    def get_or_create_import(user_id, import_key):
+        db = get_db_connection()
+        cursor = db.cursor(dictionary=True)
+        cursor.execute(
+            "INSERT IGNORE INTO food_imports (user_id, import_key) VALUES (%s, %s)",
+            (user_id, import_key)
+        )
+        cursor.execute(
+            """
+            SELECT id, rows_done, rows_imported, rows_failed, completed_at
+            FROM food_imports WHERE user_id = %s AND import_key = %s
+            """,
+            (user_id, import_key)
+        )
+        checkpoint = cursor.fetchone()
+        db.commit()
+        cursor.close()
+        db.close()
+        return checkpoint
+
+    @staticmethod
+    def import_chunk(user_id, import_id, entries, start, rows_done, imported, failed, completed=False):
+        # Entries and checkpoint commit together. The locked checkpoint must
+        # still be at `start`, so two runs of one import can't both insert.
+        try:
+            db = get_db_connection()
+            cursor = db.cursor()
+            cursor.execute("SELECT rows_done FROM food_imports WHERE id = %s FOR UPDATE", (import_id,))
+            row = cursor.fetchone()
+            if row is None or row[0] != start:
+                raise ImportConflict()
+            if entries:
+                FoodModel._insert_entries(cursor, user_id, entries)
+            cursor.execute(
+                f"""
+                UPDATE food_imports
+                SET rows_done = %s, rows_imported = %s, rows_failed = %s
+                    {", completed_at = NOW()" if completed else ""}
+                WHERE id = %s
+                """,
+                (rows_done, imported, failed, import_id)
+            )
+            db.commit()
+            if entries:
+                versions.bump(user_id)
+        except ImportConflict:
+            db.rollback()
+            raise
+        except Exception:
+            logger.exception("failed to import food chunk", extra={"user_id": user_id, "import_id": import_id})
+            db.rollback()
+            raise
+        finally:
+            cursor.close()
+            db.close()
+
     @staticmethod
     def get_entries_by_user(user_id):
         db = get_db_connection()
         cursor = db.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM food_intake WHERE user_id = %s ORDER BY timestamp DESC", (user_id,))
+        sql, params = _history(f"SELECT {ENTRY_COLUMNS} FROM {{table}} WHERE user_id = %s", (user_id,),
+                               _reaches_archive(db, None))
+        cursor.execute(sql + " ORDER BY timestamp DESC", params)
         entries = cursor.fetchall()
         cursor.close()
         db.close()
         return entries
 
     @staticmethod
-    def delete_entry(entry_id, user_id):
+    def _entries_page_query(db, user_id, limit, after, date_from, date_to):
+        # Keyset pagination on (timestamp, id). Staging and the archive are
+        # read only if the live rows in range don't fill the page down to the
+        # archive horizon, which an index-only probe checks first.
+        where = " WHERE user_id = %s"
+        params = [user_id]
+        if date_from is not None:
+            where += " AND timestamp >= %s"
+            params.append(date_from)
+        if date_to is not None:
+            where += " AND timestamp < %s"
+            params.append(date_to)
+        if after is not None:
+            after_ts, after_id = after
+            where += " AND (timestamp < %s OR (timestamp = %s AND id < %s))"
+            params.extend([after_ts, after_ts, after_id])
+        order = " ORDER BY timestamp DESC, id DESC"
+        archived = _probe(
+            db,
+            f"""
+            SELECT horizon IS NOT NULL AND (%s IS NULL OR %s < horizon) AND (last_ts IS NULL OR last_ts < horizon)
+            FROM (SELECT (SELECT MAX(upper_bound) FROM food_intake_archive_runs) AS horizon,
+                         (SELECT timestamp FROM food_intake{where}{order} LIMIT 1 OFFSET %s) AS last_ts) AS probe
+            """,
+            (date_from, date_from, *params, limit)
+        )
+        sql, params = _history(f"SELECT {ENTRY_COLUMNS} FROM {{table}}{where}{order} LIMIT %s",
+                               (*params, limit + 1), archived)
+        if not archived:
+            return sql, params
+        return sql + order + " LIMIT %s", (*params, limit + 1)
+
+    @staticmethod
+    def get_entries_page(user_id, limit, after=None, date_from=None, date_to=None):
+        db = get_db_connection()
+        cursor = db.cursor(dictionary=True)
+        sql, params = FoodModel._entries_page_query(db, user_id, limit, after, date_from, date_to)
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        cursor.close()
+        db.close()
+
+        has_more = len(rows) > limit
+        return rows[:limit], has_more
+
+    @staticmethod
+    def iter_entries_page(user_id, limit, after=None, date_from=None, date_to=None, batch_size=500):
+        # Same page as get_entries_page, handed out batch_size rows at a time
+        # off an unbuffered cursor. The one extra row fetched to detect
+        # has_more arrives as the last element of the final batch.
+        db = get_db_connection()
+        cursor = db.cursor(dictionary=True)
+        try:
+            sql, params = FoodModel._entries_page_query(db, user_id, limit, after, date_from, date_to)
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            _close_streaming(db, cursor)
+
+    @staticmethod
+    def iter_entries(user_id, date_from=None, date_to=None, batch_size=1000):
+        # Oldest first, as tuples in EXPORT_COLUMNS order. The cursor is
+        # unbuffered, so only one batch is held client-side at a time; the
+        # merge with archived months is sorted server-side.
+        sql = f"SELECT {', '.join(EXPORT_COLUMNS)} FROM {{table}} WHERE user_id = %s"
+        params = [user_id]
+        if date_from is not None:
+            sql += " AND timestamp >= %s"
+            params.append(date_from)
+        if date_to is not None:
+            sql += " AND timestamp < %s"
+            params.append(date_to)
         db = get_db_connection()
         cursor = db.cursor()
-        cursor.execute("DELETE FROM food_intake WHERE id = %s AND user_id = %s", (entry_id, user_id))
-        db.commit()
+        try:
+            sql, params = _history(sql, params, _reaches_archive(db, date_from))
+            cursor.execute(sql + " ORDER BY timestamp, id", params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            _close_streaming(db, cursor)
+
+    @staticmethod
+    def get_catalog(user_id):
+        # Per distinct name (case-insensitive collation): macro sums and entry
+        # count, so averages keep running as entries are added. Live months only.
+        db = get_db_connection()
+        cursor = db.cursor()
+        cursor.execute(
+            """
+            SELECT MIN(name), SUM(calories), SUM(protein), SUM(carbs), SUM(fat), COUNT(*)
+            FROM food_intake
+            WHERE user_id = %s AND meal_type <> 'water' AND name IS NOT NULL AND name <> ''
+            GROUP BY name
+            """,
+            (user_id,)
+        )
+        rows = cursor.fetchall()
         cursor.close()
         db.close()
+        return rows
 
     @staticmethod
-    def update_servings(entry_id, user_id, servings):
+    def get_recent_user_ids(limit, days=7):
         db = get_db_connection()
         cursor = db.cursor()
         cursor.execute(
-            "UPDATE food_intake SET servings = %s WHERE id = %s AND user_id = %s",
-            (servings, entry_id, user_id)
+            """
+            SELECT user_id FROM daily_totals
+            WHERE day >= CURDATE() - INTERVAL %s DAY
+            GROUP BY user_id ORDER BY MAX(updated_at) DESC LIMIT %s
+            """,
+            (days, limit)
+        )
+        rows = cursor.fetchall()
+        cursor.close()
+        db.close()
+        return [row[0] for row in rows]
+
+    @staticmethod
+    def get_daily_meal_totals(user_id, start, end):
+        db = get_db_connection()
+        cursor = db.cursor(dictionary=True)
+        entries, params = _history(
+            "SELECT id, timestamp, meal_type, calories, protein, carbs, fat, servings FROM {table} "
+            "WHERE user_id = %s AND timestamp >= %s AND timestamp < %s AND meal_type <> 'water'",
+            (user_id, start, end), _reaches_archive(db, start)
+        )
+        cursor.execute(
+            f"""
+            SELECT DATE(timestamp) AS day, meal_type,
+                   COALESCE(SUM(calories * COALESCE(servings, 1)), 0) AS calories,
+                   COALESCE(SUM(protein * COALESCE(servings, 1)), 0) AS protein,
+                   COALESCE(SUM(carbs * COALESCE(servings, 1)), 0) AS carbs,
+                   COALESCE(SUM(fat * COALESCE(servings, 1)), 0) AS fat,
+                   COUNT(*) AS entries
+            FROM ({entries}) AS e
+            GROUP BY day, meal_type
+            ORDER BY day
+            """,
+            params
+        )
+        rows = cursor.fetchall()
+        cursor.close()
+        db.close()
+        return rows
+
+    @staticmethod
+    def get_daily_totals(user_id, start, end):
+        db = get_db_connection()
+        cursor = db.cursor(dictionary=True)
+        if start == end:
+            cursor.execute(
+                f"SELECT {TOTALS_COLUMNS} FROM daily_totals WHERE user_id = %s AND day = %s",
+                (user_id, start)
+            )
+        else:
+            cursor.execute(
+                f"SELECT {TOTALS_COLUMNS} FROM daily_totals WHERE user_id = %s AND day BETWEEN %s AND %s ORDER BY day",
+                (user_id, start, end)
+            )
+        rows = cursor.fetchall()
+        cursor.close()
+        db.close()
+        return rows
+
+    @staticmethod
+    def get_daily_series(user_id, first_day, last_day, updated_since=None):
+        # Rows between the days (only those updated since `updated_since`, if
+        # given) as floats, plus the database clock for the next call.
+        db = get_db_connection()
+        cursor = db.cursor()
+        cursor.execute("SELECT NOW()")
+        now, = cursor.fetchone()
+        sql = """SELECT day, CAST(calories AS DOUBLE), CAST(protein AS DOUBLE), CAST(carbs AS DOUBLE),
+                        CAST(fat AS DOUBLE), entries
+                 FROM daily_totals WHERE user_id = %s AND day BETWEEN %s AND %s"""
+        params = [user_id, first_day, last_day]
+        if updated_since is not None:
+            sql += " AND updated_at >= %s"
+            params.append(updated_since)
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        cursor.close()
+        db.close()
+        return rows, now
+
+    @staticmethod
+    def rebuild_daily_totals(user_ids):
+        placeholders = ", ".join(["%s"] * len(user_ids))
+        entries, params = _history(
+            "SELECT id, user_id, timestamp, meal_type, calories, protein, carbs, fat, servings FROM {table} "
+            f"WHERE user_id IN ({placeholders})",
+            user_ids
+        )
+        db = get_db_connection()
+        cursor = db.cursor()
+        # Zeroed rather than deleted, so a day that lost all its entries
+        # still shows up as updated to incremental readers (trends).
+        cursor.execute(
+            f"""UPDATE daily_totals SET calories = 0, protein = 0, carbs = 0, fat = 0, entries = 0
+                WHERE user_id IN ({placeholders})""",
+            tuple(user_ids)
+        )
+        cursor.execute(
+            f"""
+            INSERT INTO daily_totals (user_id, day, calories, protein, carbs, fat, entries)
+            SELECT user_id, DATE(timestamp),
+                   COALESCE(SUM(calories * COALESCE(servings, 1)), 0),
+                   COALESCE(SUM(protein * COALESCE(servings, 1)), 0),
+                   COALESCE(SUM(carbs * COALESCE(servings, 1)), 0),
+                   COALESCE(SUM(fat * COALESCE(servings, 1)), 0),
+                   SUM(CASE WHEN meal_type = 'water' THEN 0 ELSE 1 END)
+            FROM ({entries}) AS e
+            GROUP BY user_id, DATE(timestamp)
+            ON DUPLICATE KEY UPDATE calories = VALUES(calories), protein = VALUES(protein),
+                carbs = VALUES(carbs), fat = VALUES(fat), entries = VALUES(entries)
+            """,
+            params
         )
         db.commit()
         cursor.close()
         db.close()
+        # Run from scripts/rebuild_daily_totals.py, outside the server.
+        versions.publish(user_ids)
+
+    # Partition maintenance for scripts/manage_food_partitions.py. Partition
+    # names come from information_schema or are generated by the script,
+    # never from user input.
 
     @staticmethod
-    def update_or_add_water(user_id, water):
+    def get_partitions():
+        # [(name, upper_bound)] oldest first; upper_bound is None for the
+        # MAXVALUE catch-all. Empty if food_intake is not partitioned.
         db = get_db_connection()
         cursor = db.cursor()
+        cursor.execute(
+            """
+            SELECT PARTITION_NAME, PARTITION_DESCRIPTION FROM information_schema.PARTITIONS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'food_intake' AND PARTITION_NAME IS NOT NULL
+            ORDER BY PARTITION_ORDINAL_POSITION
+            """
+        )
+        rows = cursor.fetchall()
+        cursor.close()
+        db.close()
+        return [
+            (name, None if bound == "MAXVALUE" else datetime.fromisoformat(bound.strip("'")))
+            for name, bound in rows
+        ]
 
-        # Check if user has any entry
-        cursor.execute("SELECT id FROM food_intake WHERE user_id = %s ORDER BY timestamp DESC LIMIT 1", (user_id,))
-        row = cursor.fetchone()
+    @staticmethod
+    def get_oldest_timestamp():
+        db = get_db_connection()
+        cursor = db.cursor()
+        cursor.execute("SELECT MIN(timestamp) FROM food_intake")
+        oldest, = cursor.fetchone()
+        cursor.close()
+        db.close()
+        return oldest
+
+    @staticmethod
+    def split_future_partition(months):
+        # months: [(name, upper_bound date)] in order, all above the last
+        # bounded partition. Rows already in p_future are redistributed.
+        partitions = ", ".join(
+            f"PARTITION {name} VALUES LESS THAN ('{bound.isoformat()}')" for name, bound in months
+        )
+        db = get_db_connection()
+        cursor = db.cursor()
+        cursor.execute(
+            f"ALTER TABLE food_intake REORGANIZE PARTITION p_future INTO "
+            f"({partitions}, PARTITION p_future VALUES LESS THAN (MAXVALUE))"
+        )
+        cursor.close()
+        db.close()
 
-        if row:  # update latest entry
+    @staticmethod
+    def _merge_staging(db, cursor, users_per_chunk):
+        # Copies staging into the archive in user batches, verifies, then
+        # empties staging. Returns the number of rows staged.
+        last_user = -1
+        while True:
             cursor.execute(
-                "UPDATE food_intake SET waterConsumed = %s WHERE id = %s",
-                (water, row[0])
+                f"SELECT DISTINCT user_id FROM {STAGING_TABLE} WHERE user_id > %s ORDER BY user_id LIMIT %s",
+                (last_user, users_per_chunk)
             )
-        else:  # no entries → insert a new one with only water
+            user_ids = [row[0] for row in cursor.fetchall()]
+            if not user_ids:
+                break
+            # Both tables were created LIKE food_intake; their columns stay in step.
             cursor.execute(
-                "INSERT INTO food_intake (user_id, meal_type, waterConsumed, servings, timestamp) VALUES (%s, %s, %s, %s, NOW())",
-                (user_id, "water", water, int(water / 0.25))
+                f"INSERT IGNORE INTO {ARCHIVE_TABLE} SELECT * FROM {STAGING_TABLE} WHERE user_id BETWEEN %s AND %s",
+                (user_ids[0], user_ids[-1])
             )
+            db.commit()
+            last_user = user_ids[-1]
+        cursor.execute(f"SELECT COUNT(*) FROM {STAGING_TABLE}")
+        staged, = cursor.fetchone()
+        cursor.execute(
+            f"""
+            SELECT COUNT(*) FROM {STAGING_TABLE} s
+            JOIN {ARCHIVE_TABLE} a ON a.user_id = s.user_id AND a.timestamp = s.timestamp AND a.id = s.id
+            """
+        )
+        merged, = cursor.fetchone()
+        if merged != staged:
+            raise RuntimeError(f"{staged - merged} of {staged} staged rows are missing from {ARCHIVE_TABLE}; "
+                               f"{STAGING_TABLE} left in place")
+        cursor.execute(f"TRUNCATE TABLE {STAGING_TABLE}")
+        return staged
+
+    @staticmethod
+    def archive_partition(name, upper_bound, users_per_chunk=500):
+        # The run is recorded first so the archive horizon covers the month,
+        # then EXCHANGE PARTITION moves its rows to staging atomically. The
+        # emptied partition is dropped unless a backdated write landed in it.
+        # Returns (rows archived, whether the partition was dropped).
+        db = get_db_connection()
+        cursor = db.cursor()
+        record_run = """
+            INSERT INTO food_intake_archive_runs (partition_name, upper_bound, row_count) VALUES (%s, %s, %s)
+            ON DUPLICATE KEY UPDATE row_count = row_count + VALUES(row_count), archived_at = CURRENT_TIMESTAMP
+        """
+        try:
+            archived = FoodModel._merge_staging(db, cursor, users_per_chunk)
+            cursor.execute(record_run, (name, upper_bound, 0))
+            db.commit()
+            cursor.execute(f"ALTER TABLE food_intake EXCHANGE PARTITION {name} WITH TABLE {STAGING_TABLE}")
+            archived += FoodModel._merge_staging(db, cursor, users_per_chunk)
+            cursor.execute(record_run, (name, upper_bound, archived))
+            db.commit()
+        finally:
+            cursor.close()
+            db.close()
+
+        # Table locks belong to the session; keep them off pooled connections.
+        late = None
+        lock_db = get_dedicated_connection()
+        try:
+            lock_cursor = lock_db.cursor()
+            lock_cursor.execute("LOCK TABLES food_intake WRITE")
+            try:
+                lock_cursor.execute(f"SELECT COUNT(*) FROM food_intake PARTITION ({name})")
+                late, = lock_cursor.fetchone()
+                if not late:
+                    lock_cursor.execute(f"ALTER TABLE food_intake DROP PARTITION {name}")
+            finally:
+                lock_cursor.execute("UNLOCK TABLES")
+                lock_cursor.close()
+        finally:
+            lock_db.close()
+        logger.info("food_intake partition archived",
+                    extra={"partition": name, "rows": archived, "dropped": not late, "late_rows": late})
+        return archived, not late
 
+    @staticmethod
+    def delete_entry(entry_id, user_id):
+        # False if the user has no such entry; raises EntryArchived if it
+        # has been moved out of food_intake.
+        db = get_db_connection()
+        cursor = db.cursor()
+        try:
+            found = FoodModel._delete_entry(cursor, user_id, entry_id)
+            db.commit()
+            if not found and _is_archived(cursor, user_id, entry_id):
+                raise EntryArchived(entry_id)
+        finally:
+            cursor.close()
+            db.close()
+        if found:
+            versions.bump(user_id)
+        return found
+
+    @staticmethod
+    def update_servings(entry_id, user_id, servings):
+        db = get_db_connection()
+        cursor = db.cursor()
+        try:
+            found = FoodModel._update_servings(cursor, user_id, entry_id, servings)
+            db.commit()
+            if not found and _is_archived(cursor, user_id, entry_id):
+                raise EntryArchived(entry_id)
+        finally:
+            cursor.close()
+            db.close()
+        if found:
+            versions.bump(user_id)
+        return found
+
+    @staticmethod
+    def update_or_add_water(user_id, water):
+        db = get_db_connection()
+        cursor = db.cursor()
+        FoodModel._set_water(cursor, user_id, water)
         db.commit()
+        versions.bump(user_id)
+        cursor.close()
+        db.close()
+
+    @staticmethod
+    def add_water(user_id, delta):
+        db = get_db_connection()
+        cursor = db.cursor()
+        FoodModel._add_water(cursor, user_id, delta)
+        db.commit()
+        versions.bump(user_id)
         cursor.close()
         db.close()
 
     @staticmethod
     def get_latest_water(user_id):
         db = get_db_connection()
-        cursor = db.cursor(dictionary=True)
+        cursor = db.cursor()
+        cursor.execute("SELECT water_l FROM daily_water WHERE user_id = %s AND day = CURDATE()", (user_id,))
+        row = cursor.fetchone()
+        cursor.close()
+        db.close()
+        return float(row[0]) if row else 0
+
+    @staticmethod
+    def get_daily_water(user_id, start, end):
+        db = get_db_connection()
+        cursor = db.cursor()
         cursor.execute(
-            "SELECT waterConsumed FROM food_intake WHERE user_id = %s AND meal_type = 'water' ORDER BY timestamp DESC LIMIT 1",
-            (user_id,)
+            "SELECT day, water_l FROM daily_water WHERE user_id = %s AND day BETWEEN %s AND %s",
+            (user_id, start, end)
         )
-        row = cursor.fetchone()
+        rows = cursor.fetchall()
         cursor.close()
         db.close()
-        return row["waterConsumed"] if row else 0
+        return {day: float(water_l) for day, water_l in rows}
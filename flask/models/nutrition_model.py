@@ -1,44 +1,92 @@
+import logging
 from database import get_db_connection
+import versions
+
+logger = logging.getLogger(__name__)
+
+PROFILE_COLUMNS = ("calorie_target", "carbs_g", "protein_g", "fat_g", "time_frame", "water_l")
+PROFILE_INSERT = """INSERT INTO nutrition_profiles
+                    (user_id, calorie_target, carbs_g, protein_g, fat_g, time_frame, water_l, weight_kg)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"""
+ACTIVATE_PROFILE = """INSERT INTO active_nutrition_profiles (user_id, profile_id) VALUES (%s, %s)
+                      ON DUPLICATE KEY UPDATE profile_id = VALUES(profile_id)"""
 
 class NutritionModel:
-    
+    # nutrition_profiles is append-only history; active_nutrition_profiles
+    # points each user at the row currently in effect.
+
+    @staticmethod
+    def insert_plan(cursor, user_id, plan, weight_kg=None):
+        # For callers that write the profile inside their own transaction.
+        cursor.execute(PROFILE_INSERT, (user_id, *(plan[column] for column in PROFILE_COLUMNS), weight_kg))
+        profile_id = cursor.lastrowid
+        cursor.execute(ACTIVATE_PROFILE, (user_id, profile_id))
+        return profile_id
+
     @staticmethod
-    def create_profile(user_id, calorie_target, carbs_g, protein_g, fat_g, time_frame, water_l):
+    def create_profile(user_id, calorie_target, carbs_g, protein_g, fat_g, time_frame, water_l, weight_kg=None):
+        plan = {
+            "calorie_target": calorie_target,
+            "carbs_g": carbs_g,
+            "protein_g": protein_g,
+            "fat_g": fat_g,
+            "time_frame": time_frame,
+            "water_l": water_l,
+        }
         try:
             db = get_db_connection()
             cursor = db.cursor()
-            sql = """INSERT INTO nutrition_profiles 
-                     (user_id, calorie_target, carbs_g, protein_g, fat_g, time_frame, water_l)
-                     VALUES (%s, %s, %s, %s, %s, %s, %s)"""
-            values = (user_id, calorie_target, carbs_g, protein_g, fat_g, time_frame, water_l)
-            print(f"Executing SQL: {sql} with values {values}")
-            cursor.execute(sql, values)
+            profile_id = NutritionModel.insert_plan(cursor, user_id, plan, weight_kg)
             db.commit()
-            print("Insert committed.")  
-        except Exception as e:
-            print(f"Error inserting nutrition profile: {e}")
+            versions.bump(user_id)
+            logger.info("nutrition profile created", extra={"user_id": user_id, "profile_id": profile_id})
+        except Exception:
+            logger.exception("failed to insert nutrition profile", extra={"user_id": user_id})
             db.rollback()
             raise
         finally:
             cursor.close()
             db.close()
+        return profile_id
 
     @staticmethod
     def get_by_user_id(user_id):
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT * FROM nutrition_profiles WHERE user_id = %s", (user_id,))
+        # Two primary-key lookups however much history the user has.
+        db = get_db_connection()
+        cursor = db.cursor(dictionary=True)
+        cursor.execute(
+            f"""
+            SELECT {', '.join('p.' + column for column in PROFILE_COLUMNS)}
+            FROM active_nutrition_profiles a
+            JOIN nutrition_profiles p ON p.id = a.profile_id
+            WHERE a.user_id = %s
+            """,
+            (user_id,)
+        )
         result = cursor.fetchone()
         cursor.close()
+        db.close()
+        return result
 
-        if not result:
-            return None
-
-        return {
-            "calorie_target": result["calorie_target"],
-            "carbs_g": result["carbs_g"],
-            "protein_g": result["protein_g"],
-            "fat_g": result["fat_g"],
-            "time_frame": result["time_frame"],
-            "water_l": result["water_l"]
-        }
+    @staticmethod
+    def get_history(user_id, limit):
+        db = get_db_connection()
+        cursor = db.cursor(dictionary=True)
+        cursor.execute(
+            f"""
+            SELECT p.id, {', '.join('p.' + column for column in PROFILE_COLUMNS)}, p.weight_kg, p.created_at,
+                   p.id = a.profile_id AS active
+            FROM nutrition_profiles p
+            LEFT JOIN active_nutrition_profiles a ON a.user_id = p.user_id
+            WHERE p.user_id = %s
+            ORDER BY p.id DESC
+            LIMIT %s
+            """,
+            (user_id, limit)
+        )
+        rows = cursor.fetchall()
+        cursor.close()
+        db.close()
+        for row in rows:
+            row["active"] = bool(row["active"])
+        return rows
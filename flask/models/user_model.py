@@ -1,10 +1,25 @@
-from database import get_db_connection
 import json
+import mysql.connector
+from mysql.connector import errorcode
+from database import get_db_connection
+from models.nutrition_model import NutritionModel
+import versions
+
+USER_INSERT = """INSERT INTO users
+                 (email, password_hash, name, age, gender, height_cm, weight_kg, activity_level, goal, weight_goal, diet, allergies, health_conditions)
+                 VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"""
+
+class EmailTaken(Exception):
+    pass
 
 class UserModel:
+    # Number of users-table lookups served by this process; see
+    # benchmarks/bench_identity.py.
+    queries = 0
 
     @staticmethod
     def get_by_email(email):
+        UserModel.queries += 1
         db = get_db_connection()
         cursor = db.cursor(dictionary=True)
         cursor.execute("SELECT * FROM users WHERE email = %s", (email,))
@@ -14,16 +29,11 @@ class UserModel:
         return user
 
     @staticmethod
-    def create_user(data):
-        db = get_db_connection()
-        cursor = db.cursor()
-        sql = """INSERT INTO users 
-                 (email, password_hash, name, age, gender, height_cm, weight_kg, activity_level, goal, weight_goal, diet, allergies, health_conditions) 
-                 VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"""
+    def _user_values(data):
         health_conditions = data.get("healthConditions")
         if isinstance(health_conditions, list):
             health_conditions = json.dumps(health_conditions)
-        values = (
+        return (
             data.get("email"),
             data.get("password_hash"),
             data.get("name"),
@@ -38,8 +48,83 @@ class UserModel:
             data.get("allergies"),
             health_conditions
         )
-        cursor.execute(sql, values)
+
+    @staticmethod
+    def create_user(data):
+        db = get_db_connection()
+        cursor = db.cursor()
+        cursor.execute(USER_INSERT, UserModel._user_values(data))
         db.commit()
         cursor.close()
         db.close()
         return True
+
+    @staticmethod
+    def create_user_with_profile(data, plan):
+        # User row and nutrition profile commit together. A taken email is
+        # reported by the unique index (uq_users_email) rather than a
+        # separate lookup, which also closes the check-then-insert race.
+        db = get_db_connection()
+        cursor = db.cursor()
+        try:
+            cursor.execute(USER_INSERT, UserModel._user_values(data))
+            user_id = cursor.lastrowid
+            NutritionModel.insert_plan(cursor, user_id, plan, data.get("weight"))
+            db.commit()
+        except mysql.connector.IntegrityError as e:
+            db.rollback()
+            if e.errno == errorcode.ER_DUP_ENTRY:
+                raise EmailTaken(data.get("email")) from e
+            raise
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            cursor.close()
+            db.close()
+        return user_id
+
+    @staticmethod
+    def get_plan_inputs(user_id):
+        db = get_db_connection()
+        cursor = db.cursor(dictionary=True)
+        cursor.execute(
+            """
+            SELECT age, gender, weight_kg, height_cm, activity_level, goal, weight_goal
+            FROM users WHERE id = %s
+            """,
+            (user_id,)
+        )
+        row = cursor.fetchone()
+        cursor.close()
+        db.close()
+        return row
+
+    @staticmethod
+    def update_with_profile(user_id, columns, plan, weight_kg):
+        # `columns` maps users columns to new values; the caller whitelists
+        # the names. The new profile becomes active in the same transaction.
+        assignments = ", ".join(f"{column} = %s" for column in columns)
+        db = get_db_connection()
+        cursor = db.cursor()
+        try:
+            cursor.execute(f"UPDATE users SET {assignments} WHERE id = %s", (*columns.values(), user_id))
+            profile_id = NutritionModel.insert_plan(cursor, user_id, plan, weight_kg)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            cursor.close()
+            db.close()
+        versions.bump(user_id)
+        return profile_id
+
+    @staticmethod
+    def update_password_hash(user_id, password_hash):
+        db = get_db_connection()
+        cursor = db.cursor()
+        cursor.execute("UPDATE users SET password_hash = %s WHERE id = %s", (password_hash, user_id))
+        db.commit()
+        cursor.close()
+        db.close()
@@ -1,16 +1,44 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from services.user_service import UserService
+from services.password_service import HashingBusy
 from extensions import jwt
+from config import Config
+from throttle import Throttle
+import versions
 
 auth_bp = Blueprint("auth", __name__, url_prefix="/auth")
 
+ip_throttle = Throttle(Config.AUTH_THROTTLE_PER_IP, Config.AUTH_THROTTLE_WINDOW)
+email_throttle = Throttle(Config.AUTH_THROTTLE_PER_EMAIL, Config.AUTH_THROTTLE_WINDOW)
+
+def throttled_response(*keys):
+    # Checked before any password hashing so floods can't burn KDF time.
+    for throttle, key in keys:
+        wait = throttle.allow(key)
+        if wait:
+            response = jsonify({"success": False, "error": "Too many attempts, try again later"})
+            response.headers["Retry-After"] = str(int(wait) + 1)
+            return response, 429
+    return None
+
+def busy_response():
+    response = jsonify({"success": False, "error": "Server busy, try again shortly"})
+    response.headers["Retry-After"] = "1"
+    return response, 503
+
 @auth_bp.route("/login", methods=["POST"])
 def login():
     data = request.get_json()
     email = data.get("email")
     password = data.get("password")
-    auth_result = UserService.authenticate_user(email, password)
+    throttled = throttled_response((ip_throttle, request.remote_addr), (email_throttle, (email or "").lower()))
+    if throttled:
+        return throttled
+    try:
+        auth_result = UserService.authenticate_user(email, password)
+    except HashingBusy:
+        return busy_response()
     if not auth_result:
         return jsonify({"success": False, "error": "Incorrect email or password"}), 401
     return jsonify({
@@ -26,16 +54,20 @@ def profile():
     from services.user_service import UserService
     from services.nutrition_service import NutritionService
 
-    current_user_email = get_jwt_identity()
-    user = UserService.get_user_by_email(current_user_email)
+    user = UserService.get_current_user()
     if not user:
         return jsonify({"error": "User not found"}), 404
 
+    tag = versions.etag(user["id"], "profile")
+    unchanged = versions.not_modified(tag) or versions.cached(user["id"], tag)
+    if unchanged:
+        return unchanged
+
     nutrition_profile = NutritionService.get_by_user_id(user["id"])
     if not nutrition_profile:
         return jsonify({"error": "Nutrition profile not found"}), 404
 
-    return jsonify({
+    response = jsonify({
         "user": {
             "id": user["id"],
             "email": user["email"],
@@ -49,7 +81,8 @@ def profile():
             "time_frame": nutrition_profile["time_frame"],
             "water_l": nutrition_profile["water_l"]
         }
-    }), 200
+    })
+    return versions.tagged(response, tag, user["id"]), 200
 
 @auth_bp.route("/verify-token", methods=["GET"])
 @jwt_required()
@@ -1,7 +1,13 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from flask_jwt_extended import jwt_required
 from services.user_service import UserService
 from services.food_service import FoodService
+from services.import_service import ImportService
+from services.trends_service import TrendsService
+from models.food_model import EntryArchived, ImportConflict
+import io
+from datetime import date
+import versions
 
 food_bp = Blueprint("food", __name__, url_prefix="/food")
 
@@ -9,46 +15,209 @@ food_bp = Blueprint("food", __name__, url_prefix="/food")
 @jwt_required()
 def log_food():
     data = request.get_json()
-    current_user_email = get_jwt_identity()
-    user = UserService.get_user_by_email(current_user_email)
+    user = UserService.get_current_user()
 
     if not user:
         return jsonify({"error": "User not found"}), 404
 
     try:
-        FoodService.log_food(user["id"], data)
-        return jsonify({"success": True, "message": "Food logged successfully"}), 201
+        client_ref = FoodService.log_food(user["id"], data)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+    if client_ref is not None:
+        return jsonify({"success": True, "queued": True, "clientRef": client_ref,
+                        "message": "Food log accepted"}), 202
+    return jsonify({"success": True, "message": "Food logged successfully"}), 201
+
+
+@food_bp.route("/log/batch", methods=["POST"])
+@jwt_required()
+def log_food_batch():
+    data = request.get_json()
+    items = data.get("entries") if isinstance(data, dict) else data
+    user = UserService.get_current_user()
+
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+
+    try:
+        results = FoodService.log_food_batch(user["id"], items)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+    logged = sum(1 for r in results if r["success"])
+    status = 201 if logged == len(results) else 207 if logged else 400
+    return jsonify({"success": logged > 0, "logged": logged, "results": results}), status
+
+
+@food_bp.route("/import", methods=["POST"])
+@jwt_required()
+def import_entries():
+    user = UserService.get_current_user()
+
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+
+    # Either a multipart "file" field or a raw text/csv body. Re-sending
+    # the same file with the returned import_id resumes a failed import.
+    upload = request.files.get("file")
+    stream = upload.stream if upload else request.stream
+    import_key = request.args.get("import_id") or ImportService.new_import_key()
+    lines = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+
+    try:
+        summary = ImportService.import_csv(user["id"], lines, import_key)
+    except (ValueError, UnicodeDecodeError) as e:
+        return jsonify({"success": False, "import_id": import_key, "error": str(e)}), 400
+    except ImportConflict:
+        return jsonify({"success": False, "import_id": import_key,
+                        "error": "This import is already running in another request"}), 409
+    except Exception as e:
+        return jsonify({"success": False, "import_id": import_key, "error": str(e)}), 500
+
+    status = 201 if not summary["failed"] else 207 if summary["imported"] else 400
+    return jsonify({"success": summary["imported"] > 0, **summary}), status
+
 
 @food_bp.route("/entries", methods=["GET"])
 @jwt_required()
 def get_entries():
-    current_user_email = get_jwt_identity()
-    user = UserService.get_user_by_email(current_user_email)
+    user = UserService.get_current_user()
+
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+
+    tag = versions.etag(user["id"], "entries", request.query_string.decode())
+    unchanged = versions.not_modified(tag) or versions.cached(user["id"], tag)
+    if unchanged:
+        return unchanged
+
+    try:
+        if request.args.get("stream", "").lower() in ("1", "true"):
+            chunks = FoodService.stream_food_entries_page(user["id"], request.args, current_app.json.dumps)
+            response = Response(stream_with_context(chunks), mimetype="application/json")
+        else:
+            response = jsonify(FoodService.get_food_entries_page(user["id"], request.args))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return versions.tagged(response, tag, user["id"]), 200
+
+
+@food_bp.route("/export", methods=["GET"])
+@jwt_required()
+def export_entries():
+    user = UserService.get_current_user()
+
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+
+    gzip = "gzip" in request.accept_encodings
+    try:
+        chunks, mimetype = FoodService.export_food_entries(user["id"], request.args, current_app.json.dumps, gzip)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    extension = "csv" if mimetype == "text/csv" else "ndjson"
+    response = Response(stream_with_context(chunks), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f"attachment; filename=food-history.{extension}"
+    response.headers["Vary"] = "Accept-Encoding"
+    if gzip:
+        response.headers["Content-Encoding"] = "gzip"
+    return response
+
+
+@food_bp.route("/sync", methods=["GET", "POST"])
+@jwt_required()
+def sync():
+    user = UserService.get_current_user()
+
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+
+    data = request.get_json(silent=True) if request.method == "POST" else None
+    data = data if isinstance(data, dict) else {}
+    since = data.get("since", request.args.get("since"))
+    try:
+        changes = FoodService.sync(user["id"], since, data.get("mutations"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+    return jsonify(changes), 200
+
+
+@food_bp.route("/search", methods=["GET"])
+@jwt_required()
+def search_foods():
+    user = UserService.get_current_user()
+
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+
+    try:
+        return jsonify(FoodService.search_foods(user["id"], request.args)), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@food_bp.route("/summary", methods=["GET"])
+@jwt_required()
+def get_summary():
+    user = UserService.get_current_user()
+
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+
+    try:
+        summary = FoodService.get_daily_summary(user["id"], request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(summary), 200
+
+
+@food_bp.route("/trends", methods=["GET"])
+@jwt_required()
+def get_trends():
+    user = UserService.get_current_user()
 
     if not user:
         return jsonify({"error": "User not found"}), 404
 
-    entries = FoodService.get_user_food_entries(user["id"])
-    return jsonify(entries), 200
+    # Rolling windows end today, so the tag turns over at midnight too.
+    tag = versions.etag(user["id"], "trends", f"{date.today()}|{request.query_string.decode()}")
+    unchanged = versions.not_modified(tag)
+    if unchanged:
+        return unchanged
+
+    try:
+        response = jsonify(TrendsService.get_trends(user["id"], request.args))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return versions.tagged(response, tag), 200
 
 
 @food_bp.route("/delete/<int:entry_id>", methods=["DELETE"])
 @jwt_required()
 def delete_entry(entry_id):
-    current_user_email = get_jwt_identity()
-    user = UserService.get_user_by_email(current_user_email)
+    user = UserService.get_current_user()
 
     if not user:
         return jsonify({"error": "User not found"}), 404
 
     try:
-        FoodService.delete_food_entry(user["id"], entry_id)
-        return jsonify({"success": True, "message": "Food entry deleted"}), 200
+        deleted = FoodService.delete_food_entry(user["id"], entry_id)
+    except EntryArchived:
+        return jsonify({"success": False, "error": "Archived entries are read-only"}), 409
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
+    if not deleted:
+        return jsonify({"success": False, "error": "Food entry not found"}), 404
+    return jsonify({"success": True, "message": "Food entry deleted"}), 200
 
 
 @food_bp.route("/update/<int:entry_id>", methods=["PATCH"])
@@ -60,56 +229,52 @@ def update_entry(entry_id):
     if servings is None:
         return jsonify({"error": "Servings value required"}), 400
 
-    current_user_email = get_jwt_identity()
-    user = UserService.get_user_by_email(current_user_email)
+    user = UserService.get_current_user()
 
     if not user:
         return jsonify({"error": "User not found"}), 404
 
     try:
-        FoodService.update_food_servings(user["id"], entry_id, servings)
-        return jsonify({"success": True, "message": "Servings updated"}), 200
+        updated = FoodService.update_food_servings(user["id"], entry_id, servings)
+    except EntryArchived:
+        return jsonify({"success": False, "error": "Archived entries are read-only"}), 409
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
+    if not updated:
+        return jsonify({"success": False, "error": "Food entry not found"}), 404
+    return jsonify({"success": True, "message": "Servings updated"}), 200
 
 @food_bp.route("/water", methods=["GET"])
 @jwt_required()
 def get_water():
-    current_user_email = get_jwt_identity()
-    user = UserService.get_user_by_email(current_user_email)
+    user = UserService.get_current_user()
 
     if not user:
         return jsonify({"error": "User not found"}), 404
 
-    entries = FoodService.get_user_food_entries(user["id"])
-    if not entries:
-        return jsonify({"waterConsumed": 0}), 200
-
-    # Get latest waterConsumed
-    latest_entry = entries[0]
-    water = latest_entry.get("waterConsumed", 0)
-    
-    print("Water get is: ", water)
+    water = FoodService.get_latest_water(user["id"])
     return jsonify({"waterConsumed": water}), 200
 
 @food_bp.route("/water", methods=["PATCH"])
 @jwt_required()
 def update_water():
-    data = request.get_json()
-    water = data.get("waterConsumed") * 0.25
+    data = request.get_json() or {}
+    glasses = data.get("waterConsumed")
+    delta = data.get("delta")
 
-    print("Water: ", water)
-    if water is None:
+    if glasses is None and delta is None:
         return jsonify({"error": "waterConsumed value required"}), 400
 
-    current_user_email = get_jwt_identity()
-    user = UserService.get_user_by_email(current_user_email)
+    user = UserService.get_current_user()
 
     if not user:
         return jsonify({"error": "User not found"}), 404
 
     try:
-        FoodService.update_water_consumed(user["id"], water)
+        if glasses is not None:
+            FoodService.update_water_consumed(user["id"], glasses * 0.25)
+        else:
+            FoodService.add_water(user["id"], delta * 0.25)
         return jsonify({"success": True, "message": "Water updated"}), 200
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
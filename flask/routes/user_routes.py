@@ -1,9 +1,11 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from services.user_service import UserService
 from services.nutrition_service import NutritionService
 from services.food_service import FoodService
-from models.user_model import UserModel
+from models.user_model import EmailTaken
+from services.password_service import HashingBusy
+from routes.auth_routes import ip_throttle, throttled_response, busy_response
 
 user_bp = Blueprint("user", __name__)
 
@@ -27,33 +29,76 @@ def receive_info():
     if missing:
         return jsonify({"error": f"Missing required fields: {', '.join(missing)}"}), 400
 
-    if UserService.check_email_exists(data["email"]):
+    throttled = throttled_response((ip_throttle, request.remote_addr))
+    if throttled:
+        return throttled
+
+    try:
+        result = UserService.register_user(data)
+    except EmailTaken:
         return jsonify({"exists": True, "message": "Email already exists"}), 200
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    except HashingBusy:
+        return busy_response()
+    return jsonify({"exists": False, "message": "User created successfully", "token": result["token"]}), 201
+
+@user_bp.route("/nutrition/preview", methods=["POST"])
+def preview_nutrition():
+    data = request.get_json() or {}
+    try:
+        plan = NutritionService.compute_plan(data)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(plan), 200
+
+@user_bp.route("/nutrition/recompute", methods=["POST"])
+@jwt_required()
+def recompute_nutrition():
+    user = UserService.get_current_user()
+    if not user:
+        return jsonify({"error": "User not found"}), 404
 
-    UserService.register_user(data)
-    access_token = UserService.authenticate_user(data["email"], data["password"])["token"]
-    user = UserModel.get_by_email(data["email"])
-    nutrition_profile = NutritionService.calculate_nutrition(data, user["id"])
-    return jsonify({"exists": False, "message": "User created successfully", "token": access_token}), 201
+    data = request.get_json() or {}
+    try:
+        plan = NutritionService.recompute_for_user(user["id"], data)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    if plan is None:
+        return jsonify({"error": "User not found"}), 404
+    UserService.invalidate_user(user["email"])
+    return jsonify(plan), 200
+
+@user_bp.route("/nutrition/history", methods=["GET"])
+@jwt_required()
+def nutrition_history():
+    user = UserService.get_current_user()
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+
+    try:
+        history = NutritionService.get_history(user["id"], request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"profiles": history}), 200
 
 @user_bp.route("/log", methods=["POST"])
 @jwt_required()
 def log_food():
-    print("LOGGING FOOD")
-    current_user_email = get_jwt_identity()
-    user = UserService.get_user_by_email(current_user_email)
+    user = UserService.get_current_user()
     if not user:
         return jsonify({"error": "User not found"}), 404
 
     data = request.get_json()
 
-    required_fields = ["name", "calories", "protein", "carbs", "fat", "mealType", "timestamp"]
-    missing = [field for field in required_fields if field not in data]
-    if missing:
-        return jsonify({"error": f"Missing fields: {', '.join(missing)}"}), 400
-
     try:
-        FoodService.log_food(user["id"], data)
-        return jsonify({"success": True, "message": "Food entry logged"}), 201
+        client_ref = FoodService.log_food(user["id"], data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+    if client_ref is not None:
+        return jsonify({"success": True, "queued": True, "clientRef": client_ref,
+                        "message": "Food entry accepted"}), 202
+    return jsonify({"success": True, "message": "Food entry logged"}), 201
\ No newline at end of file
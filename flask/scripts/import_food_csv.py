@@ -0,0 +1,56 @@
+"""Load a CSV of food log entries into a user's history.
+
+Columns as in the /food/log body: name, calories, protein, carbs, fat,
+mealType, timestamp and optionally servings (a /food/export file works
+too). The import key defaults to the file's SHA-256, so rerunning after
+an interruption picks up at the last committed chunk.
+
+    python scripts/import_food_csv.py --user-id 42 history.csv
+    python scripts/import_food_csv.py --user-id 42 --chunk-size 5000 history.csv
+"""
+import argparse
+import hashlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.import_service import ImportService, DEFAULT_CHUNK_SIZE
+import versions
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path")
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--import-id", help="defaults to the file's SHA-256")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    import_key = args.import_id or file_digest(args.path)
+    start = time.perf_counter()
+    with open(args.path, encoding="utf-8-sig", newline="") as f:
+        summary = ImportService.import_csv(args.user_id, f, import_key, args.chunk_size)
+    elapsed = time.perf_counter() - start
+    versions.publish([args.user_id])
+
+    for error in summary["errors"]:
+        print(f"line {error['line']}: {error['error']}")
+    loaded = summary["rows"] - summary["resumed_from"]
+    print(f"Import {import_key}: {summary['imported']} imported, {summary['failed']} failed, "
+          f"{summary['rows']} rows total (resumed at row {summary['resumed_from']})")
+    if loaded:
+        print(f"{loaded} rows in {elapsed:.1f}s ({loaded / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
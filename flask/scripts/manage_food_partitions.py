@@ -0,0 +1,83 @@
+"""Keep food_intake's monthly partitions ahead of the clock and archive old ones.
+
+Splits p_future so every month up to --months-ahead from now has its own
+partition, then moves each month that ended more than --archive-after
+months ago into food_intake_archive and drops its partition. Requires
+migrations 008 and 009. Safe to rerun, including after a failure part way;
+schedule it daily.
+
+    python scripts/manage_food_partitions.py
+    python scripts/manage_food_partitions.py --archive-after 6 --dry-run
+"""
+import argparse
+import os
+import re
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from models.food_model import FoodModel
+
+MONTH_PARTITION = re.compile(r"^p\d{6}$")
+
+
+def add_months(day, months):
+    years, month = divmod(day.month - 1 + months, 12)
+    return date(day.year + years, month + 1, 1)
+
+
+def missing_months(partitions, today, months_ahead):
+    # Partitions are named for the month they hold and bounded by the first
+    # of the next one. The first bounded partition also takes anything older.
+    bounds = [bound for _, bound in partitions if bound is not None]
+    if bounds:
+        month = bounds[-1].date()
+    else:
+        oldest = FoodModel.get_oldest_timestamp()
+        month = add_months(oldest or today, 0)
+    end = add_months(today, months_ahead + 1)
+    months = []
+    while month < end:
+        months.append((f"p{month:%Y%m}", add_months(month, 1)))
+        month = add_months(month, 1)
+    return months
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--months-ahead", type=int, default=Config.FOOD_PARTITION_MONTHS_AHEAD)
+    parser.add_argument("--archive-after", type=int, default=Config.FOOD_ARCHIVE_AFTER_MONTHS,
+                        help="archive months that ended this many months ago")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    if args.archive_after < 1:
+        parser.error("--archive-after must be at least 1")
+
+    partitions = FoodModel.get_partitions()
+    if not partitions:
+        sys.exit("food_intake is not partitioned; apply migration 008 first")
+    today = date.today()
+
+    months = missing_months(partitions, today, args.months_ahead)
+    if months:
+        print(f"Adding partitions {months[0][0]}..{months[-1][0]}")
+        if not args.dry_run:
+            FoodModel.split_future_partition(months)
+            partitions = FoodModel.get_partitions()
+
+    cutoff = add_months(today, -args.archive_after)
+    for name, bound in partitions:
+        if bound is None or not MONTH_PARTITION.match(name) or bound.date() > cutoff:
+            continue
+        print(f"Archiving {name}")
+        if not args.dry_run:
+            rows, dropped = FoodModel.archive_partition(name, bound)
+            print(f"Archived {rows} rows from {name}")
+            if not dropped:
+                print(f"Kept {name}: entries were logged into it while archiving; the next run moves them")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Recompute daily_totals from food_intake history, archived months
+included.
+
+    python scripts/rebuild_daily_totals.py              # every user
+    python scripts/rebuild_daily_totals.py --user-id 42
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import get_db_connection
+from models.food_model import FoodModel, HISTORY_TABLES
+
+
+def user_id_batches(batch_size):
+    # Users with any history, live or archived, plus any with rollups left
+    # over from entries since deleted.
+    tables = HISTORY_TABLES + ("daily_totals",)
+    union = " UNION ".join(f"SELECT DISTINCT user_id FROM {table} WHERE user_id > %s" for table in tables)
+    db = get_db_connection()
+    cursor = db.cursor()
+    last_id = 0
+    while True:
+        cursor.execute(
+            f"SELECT user_id FROM ({union}) AS u ORDER BY user_id LIMIT %s",
+            (*[last_id] * len(tables), batch_size)
+        )
+        ids = [row[0] for row in cursor.fetchall()]
+        if not ids:
+            break
+        yield ids
+        last_id = ids[-1]
+    cursor.close()
+    db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--user-id", type=int)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    batches = [[args.user_id]] if args.user_id else user_id_batches(args.batch_size)
+    total = 0
+    for ids in batches:
+        FoodModel.rebuild_daily_totals(ids)
+        total += len(ids)
+        print(f"Rebuilt daily totals for {total} users")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Recompute nutrition_profiles for every user with the batch engine.
+
+Streams users in id order, computes a chunk at a time with
+services.nutrition_batch, bulk-inserts the new profiles and makes them
+the active ones.
+
+    python scripts/recompute_nutrition.py --chunk-size 5000
+    python scripts/recompute_nutrition.py --dry-run
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import get_db_connection
+from models.nutrition_model import PROFILE_INSERT
+import versions
+from services.nutrition_batch import calculate_batch, columns_from_rows
+
+USER_COLUMNS = "id, age, gender, weight_kg, height_cm, activity_level, goal, weight_goal"
+
+
+def stream_users(chunk_size):
+    db = get_db_connection()
+    cursor = db.cursor(dictionary=True)
+    last_id = 0
+    while True:
+        cursor.execute(
+            f"SELECT {USER_COLUMNS} FROM users WHERE id > %s ORDER BY id LIMIT %s",
+            (last_id, chunk_size)
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        yield rows
+        last_id = rows[-1]["id"]
+    cursor.close()
+    db.close()
+
+
+def to_payload(row):
+    return {
+        "age": row["age"],
+        "gender": row["gender"],
+        "weight": row["weight_kg"],
+        "height": row["height_cm"],
+        "activityLevel": row["activity_level"],
+        "primaryGoal": row["goal"],
+        "weightGoal": row["weight_goal"],
+    }
+
+
+def write_profiles(rows, result):
+    valid = result["valid"]
+    values = [
+        (rows[i]["id"], int(result["calorie_target"][i]), int(result["carbs_g"][i]), int(result["protein_g"][i]),
+         int(result["fat_g"][i]), int(result["time_frame"][i]), float(result["water_l"][i]), rows[i]["weight_kg"])
+        for i in range(len(rows)) if valid[i]
+    ]
+    if not values:
+        return 0
+    user_ids = [value[0] for value in values]
+    db = get_db_connection()
+    cursor = db.cursor()
+    cursor.executemany(PROFILE_INSERT, values)
+    # Point each user at the profile just written.
+    cursor.execute(
+        f"""INSERT INTO active_nutrition_profiles (user_id, profile_id)
+            SELECT user_id, MAX(id) FROM nutrition_profiles
+            WHERE user_id IN ({', '.join(['%s'] * len(user_ids))})
+            GROUP BY user_id
+            ON DUPLICATE KEY UPDATE profile_id = VALUES(profile_id)""",
+        user_ids
+    )
+    db.commit()
+    cursor.close()
+    db.close()
+    versions.publish(user_ids)
+    return len(values)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    seen = written = 0
+    for rows in stream_users(args.chunk_size):
+        result = calculate_batch(columns_from_rows(to_payload(row) for row in rows))
+        seen += len(rows)
+        if not args.dry_run:
+            written += write_profiles(rows, result)
+        elapsed = time.perf_counter() - start
+        print(f"{seen} users processed, {written} profiles written ({seen / elapsed:.0f} users/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Production launcher: the app under gunicorn gthread workers.
+
+    python serve.py
+
+`python app.py` remains the development server.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import Config
+from gunicorn.app.base import BaseApplication
+
+
+def gunicorn_options():
+    return {
+        "bind": Config.SERVER_BIND,
+        "workers": Config.SERVER_WORKERS,
+        "worker_class": "gthread",
+        "threads": Config.SERVER_THREADS,
+        "timeout": Config.SERVER_TIMEOUT,
+        "graceful_timeout": Config.SERVER_TIMEOUT,
+        "keepalive": Config.SERVER_KEEPALIVE,
+        "max_requests": Config.SERVER_MAX_REQUESTS,
+        "max_requests_jitter": Config.SERVER_MAX_REQUESTS // 10,
+    }
+
+
+class Server(BaseApplication):
+
+    def __init__(self):
+        self.options = gunicorn_options()
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        # Each worker builds its own app (and connection pool) after fork.
+        from app import create_app
+
+        return create_app()
+
+
+def main():
+    if Config.SERVER_WORKERS > 1 and Config.CACHE_BACKEND != "redis":
+        # Per-user versions invalidate ETags and the trends cache; each
+        # worker would keep its own and miss the others' writes.
+        sys.exit(f"CACHE_BACKEND=redis is required with SERVER_WORKERS={Config.SERVER_WORKERS}; "
+                 "set SERVER_WORKERS=1 to run on the local backend")
+    Server().run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import logging
+import threading
+from array import array
+from bisect import bisect_left, insort
+from heapq import nlargest
+from cache import TTLCache
+from config import Config
+from models.food_model import FoodModel
+import versions
+
+logger = logging.getLogger(__name__)
+
+PREFIX_SCAN = 256
+TRIGRAM_SCAN = 4096
+TRIGRAM_MATCHES = 4
+MAX_NAME_LENGTH = 255
+
+
+def normalize(name):
+    return " ".join(name.lower().split())[:MAX_NAME_LENGTH]
+
+
+def trigrams(key):
+    return {key[i:i + 3] for i in range(len(key) - 2)}
+
+
+class FoodCatalog:
+    # One user's distinct food names with running macro sums and counts.
+    # Prefixes bisect a sorted key list; substrings walk the rarest trigram's
+    # postings. Entries are append-only, so ids index the parallel arrays.
+
+    def __init__(self, version=None):
+        self.version = version
+        self._lock = threading.Lock()
+        self._ids = {}
+        self._sorted = []
+        self._trigrams = {}
+        self._keys = []
+        self.names = []
+        self.sums = array("d")
+        self.counts = array("I")
+
+    def __len__(self):
+        return len(self.names)
+
+    def _add(self, name, sums, count, keep_sorted):
+        if not isinstance(name, str):
+            return
+        key = normalize(name)
+        if not key:
+            return
+        entry_id = self._ids.get(key)
+        if entry_id is None:
+            entry_id = self._ids[key] = len(self.names)
+            self._keys.append(key)
+            self.names.append(name.strip())
+            self.sums.extend((0.0, 0.0, 0.0, 0.0))
+            self.counts.append(0)
+            if keep_sorted:
+                insort(self._sorted, key)
+            else:
+                self._sorted.append(key)
+            for gram in trigrams(key):
+                postings = self._trigrams.get(gram)
+                if postings is None:
+                    postings = self._trigrams[gram] = array("I")
+                postings.append(entry_id)
+        for i, value in enumerate(sums):
+            self.sums[4 * entry_id + i] += float(value or 0)
+        self.counts[entry_id] += count
+
+    def add(self, name, calories, protein, carbs, fat, count=1):
+        # Macros are totals over `count` entries.
+        with self._lock:
+            self._add(name, (calories, protein, carbs, fat), count, keep_sorted=True)
+
+    def load(self, rows):
+        # Bulk path for FoodModel.get_catalog rows (name, macro sums,
+        # count): append unsorted, then sort once.
+        with self._lock:
+            for name, calories, protein, carbs, fat, count in rows:
+                self._add(name, (calories, protein, carbs, fat), count, keep_sorted=False)
+            self._sorted.sort()
+
+    def _entry(self, entry_id):
+        count = self.counts[entry_id]
+        calories, protein, carbs, fat = (round(value / count, 2) for value in self.sums[4 * entry_id:4 * entry_id + 4])
+        return {
+            "name": self.names[entry_id],
+            "calories": calories,
+            "protein": protein,
+            "carbs": carbs,
+            "fat": fat,
+            "count": count,
+        }
+
+    def search(self, query, limit=10):
+        key = normalize(query)
+        if not key:
+            return []
+        with self._lock:
+            # Prefix matches rank first; within a long range only the first
+            # PREFIX_SCAN keys are considered.
+            start = bisect_left(self._sorted, key)
+            end = min(bisect_left(self._sorted, key + "\uffff", start), start + PREFIX_SCAN)
+            found = list(map(self._ids.__getitem__, self._sorted[start:end]))
+            ranked = nlargest(limit, found, key=self.counts.__getitem__)
+
+            if len(ranked) < limit and len(key) >= 3:
+                postings = [self._trigrams.get(gram) for gram in trigrams(key)]
+                if all(postings):
+                    # Walk the rarest posting list, stopping once a few
+                    # times `limit` matches are in hand or TRIGRAM_SCAN
+                    # candidates have been checked.
+                    seen = set(found)
+                    wanted = TRIGRAM_MATCHES * limit
+                    keys = self._keys
+                    matches = []
+                    for entry_id in min(postings, key=len)[:TRIGRAM_SCAN]:
+                        if key in keys[entry_id] and entry_id not in seen:
+                            matches.append(entry_id)
+                            if len(matches) >= wanted:
+                                break
+                    ranked.extend(nlargest(limit - len(ranked), matches, key=self.counts.__getitem__))
+            return [self._entry(entry_id) for entry_id in ranked]
+
+
+# user_id -> the user's FoodCatalog, loaded on their first search and kept
+# until their version moves past what it reflects.
+_catalogs = TTLCache(maxsize=Config.CATALOG_CACHE_SIZE, ttl=Config.CATALOG_CACHE_TTL)
+
+
+def _load(user_id):
+    version = versions.current(user_id)
+    catalog = _catalogs.get(user_id)
+    if catalog is not None and catalog.version == version:
+        return catalog
+    catalog = FoodCatalog(version)
+    catalog.load(FoodModel.get_catalog(user_id))
+    # A write that landed during the read may or may not be in it, and its
+    # record() must not patch it in again; such a catalog is used once and
+    # not kept.
+    if versions.current(user_id) == version:
+        _catalogs.set(user_id, catalog)
+    return catalog
+
+
+def search(user_id, query, limit=10):
+    return _load(user_id).search(query, limit)
+
+
+def record(user_id, entries):
+    # After a write that bumped the version once: patch the cached catalog if
+    # that write is its only change since loading, else leave it to reload.
+    catalog = _catalogs.get(user_id)
+    if catalog is None:
+        return
+    version = versions.current(user_id)
+    with catalog._lock:
+        if catalog.version != version - 1:
+            return
+        for entry in entries:
+            catalog._add(entry["name"], (entry["calories"], entry["protein"], entry["carbs"], entry["fat"]), 1,
+                         keep_sorted=True)
+        catalog.version = version
+
+
+def init_catalog(app):
+    # Loads the catalogs of the CATALOG_WARM_USERS most recently active
+    # users off the startup path, so their first search doesn't pay for it.
+    limit = app.config["CATALOG_WARM_USERS"]
+    if not limit:
+        return
+
+    def warm():
+        try:
+            user_ids = FoodModel.get_recent_user_ids(limit)
+            for user_id in user_ids:
+                _load(user_id)
+            logger.info("food catalogs warmed", extra={"users": len(user_ids)})
+        except Exception:
+            logger.exception("failed to warm food catalogs")
+
+    threading.Thread(target=warm, name="food-catalog-warm", daemon=True).start()
@@ -1,41 +1,456 @@
-from models.food_model import FoodModel
+import base64
+import csv
+import io
+import zlib
+from datetime import date, datetime, timedelta
+from models.food_model import FoodModel, EXPORT_COLUMNS
+from models.nutrition_model import NutritionModel
+from services import food_catalog
+from services import write_behind
+import versions
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+MAX_STREAM_PAGE_SIZE = 10000
+MAX_SUMMARY_DAYS = 366
+MACROS = ("calories", "protein", "carbs", "fat")
+REQUIRED_ENTRY_FIELDS = ["name", "calories", "protein", "carbs", "fat", "mealType", "timestamp"]
+MAX_BATCH_SIZE = 500
+EXPORT_FORMATS = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+DEFAULT_SEARCH_LIMIT = 10
+MAX_SEARCH_LIMIT = 50
+MAX_SYNC_CHANGES = 1000
+MAX_SYNC_MUTATIONS = 500
+MAX_CLIENT_REF_LENGTH = 64
+MIN_TIMESTAMP_YEAR = 1000
 
 class FoodService:
 
     @staticmethod
     def log_food(user_id, data):
+        # With write-behind on, the entry is journaled and its client_ref
+        # returned; the row reaches food_intake shortly after.
+        error = FoodService.validate_entry(data)
+        if error:
+            raise ValueError(error)
+        if write_behind.queue is not None:
+            client_ref = write_behind.queue.enqueue(user_id, {
+                "name": data["name"],
+                "calories": data["calories"],
+                "protein": data["protein"],
+                "carbs": data["carbs"],
+                "fat": data["fat"],
+                "meal_type": data["mealType"],
+                "timestamp": data["timestamp"],
+                "servings": data.get("servings", 1),
+            })
+            # Moves the user's ETags on now; the read that follows flushes.
+            versions.bump(user_id)
+            food_catalog.record(user_id, [data])
+            return client_ref
         FoodModel.add_food_entry(
             user_id=user_id,
-            name=data.get("name"),
-            calories=data.get("calories"),
-            protein=data.get("protein"),
-            carbs=data.get("carbs"),
-            fat=data.get("fat"),
-            meal_type=data.get("mealType"),
-            timestamp=data.get("timestamp"),
+            name=data["name"],
+            calories=data["calories"],
+            protein=data["protein"],
+            carbs=data["carbs"],
+            fat=data["fat"],
+            meal_type=data["mealType"],
+            timestamp=data["timestamp"],
             servings=data.get("servings", 1)
         )
-        return True
+        food_catalog.record(user_id, [data])
+        return None
+
+    @staticmethod
+    def validate_entry(data):
+        if not isinstance(data, dict):
+            return "Entry must be an object"
+        missing = [field for field in REQUIRED_ENTRY_FIELDS if field not in data]
+        if missing:
+            return f"Missing fields: {', '.join(missing)}"
+        for field in MACROS + ("servings",):
+            try:
+                valid = float(data.get(field, 1)) >= 0
+            except (TypeError, ValueError):
+                valid = False
+            if not valid:
+                return f"{field} must be a non-negative number"
+        # Checked here so one bad timestamp fails its own item instead of the
+        # multi-row INSERT it would be part of. MySQL DATETIME starts at year
+        # 1000.
+        try:
+            timestamp = datetime.fromisoformat(str(data["timestamp"]))
+        except ValueError:
+            return f"Invalid timestamp: {data['timestamp']}"
+        if timestamp.year < MIN_TIMESTAMP_YEAR:
+            return f"timestamp must not be before year {MIN_TIMESTAMP_YEAR}"
+        return None
+
+    @staticmethod
+    def log_food_batch(user_id, items):
+        if not isinstance(items, list) or not items:
+            raise ValueError("entries must be a non-empty list")
+        if len(items) > MAX_BATCH_SIZE:
+            raise ValueError(f"At most {MAX_BATCH_SIZE} entries per batch")
+
+        results = []
+        valid = []
+        for index, data in enumerate(items):
+            error = FoodService.validate_entry(data)
+            if error:
+                results.append({"index": index, "success": False, "error": error})
+                continue
+            result = {"index": index, "success": True}
+            results.append(result)
+            valid.append((result, {
+                "name": data["name"],
+                "calories": data["calories"],
+                "protein": data["protein"],
+                "carbs": data["carbs"],
+                "fat": data["fat"],
+                "meal_type": data["mealType"],
+                "timestamp": data["timestamp"],
+                "servings": data.get("servings", 1),
+            }))
+
+        if valid:
+            ids = FoodModel.add_food_entries(user_id, [entry for _, entry in valid])
+            for (result, entry), entry_id in zip(valid, ids):
+                result["id"] = entry_id
+            food_catalog.record(user_id, [entry for _, entry in valid])
+        return results
+
+    @staticmethod
+    def search_foods(user_id, args):
+        # Suggestions come from the user's own food log only.
+        query = args.get("q", "").strip()
+        if not query:
+            raise ValueError("q is required")
+        try:
+            limit = int(args.get("limit", DEFAULT_SEARCH_LIMIT))
+        except ValueError:
+            raise ValueError("limit must be an integer")
+        limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+        write_behind.flush_user(user_id)
+        return {"results": food_catalog.search(user_id, query, limit)}
 
     @staticmethod
     def get_user_food_entries(user_id):
         return FoodModel.get_entries_by_user(user_id)
 
+    @staticmethod
+    def encode_cursor(entry):
+        raw = f"{entry['timestamp'].isoformat()}|{entry['id']}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            ts, entry_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+            return datetime.fromisoformat(ts), int(entry_id)
+        except Exception:
+            raise ValueError("Invalid cursor")
+
+    @staticmethod
+    def parse_date_bound(value, end=False):
+        if not value:
+            return None
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f"Invalid date: {value}")
+        # A bare date as the upper bound includes that whole day.
+        if end and len(value) == 10:
+            parsed += timedelta(days=1)
+        return parsed
+
+    @staticmethod
+    def _page_args(args, max_limit=MAX_PAGE_SIZE):
+        try:
+            limit = int(args.get("limit", DEFAULT_PAGE_SIZE))
+        except ValueError:
+            raise ValueError("limit must be an integer")
+        limit = max(1, min(limit, max_limit))
+        after = FoodService.decode_cursor(args["cursor"]) if args.get("cursor") else None
+        # ?date=YYYY-MM-DD is shorthand for that one day.
+        day = args.get("date")
+        if day and (args.get("from") or args.get("to")):
+            raise ValueError("date cannot be combined with from or to")
+        date_from = FoodService.parse_date_bound(day or args.get("from"))
+        date_to = FoodService.parse_date_bound(day or args.get("to"), end=True)
+        return limit, after, date_from, date_to
+
+    @staticmethod
+    def get_food_entries_page(user_id, args):
+        limit, after, date_from, date_to = FoodService._page_args(args)
+        write_behind.flush_user(user_id)
+        entries, has_more = FoodModel.get_entries_page(user_id, limit, after, date_from, date_to)
+        next_cursor = FoodService.encode_cursor(entries[-1]) if has_more else None
+        return {"entries": entries, "next_cursor": next_cursor}
+
+    @staticmethod
+    def stream_food_entries_page(user_id, args, dumps):
+        # Validates before the response starts; the generator writes the same
+        # document as get_food_entries_page one cursor batch at a time.
+        limit, after, date_from, date_to = FoodService._page_args(args, MAX_STREAM_PAGE_SIZE)
+        write_behind.flush_user(user_id)
+
+        def generate():
+            yield '{"entries":['
+            sent = 0
+            last = None
+            has_more = False
+            for rows in FoodModel.iter_entries_page(user_id, limit, after, date_from, date_to):
+                if sent + len(rows) > limit:
+                    rows = rows[:limit - sent]
+                    has_more = True
+                if rows:
+                    yield ("," if sent else "") + dumps(rows)[1:-1]
+                    sent += len(rows)
+                    last = rows[-1]
+            next_cursor = FoodService.encode_cursor(last) if has_more else None
+            yield '],"next_cursor":' + dumps(next_cursor) + "}\n"
+
+        return generate()
+
+    @staticmethod
+    def _csv_chunks(batches):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(EXPORT_COLUMNS)
+        for rows in batches:
+            writer.writerows(
+                (entry_id, ts.isoformat(), *rest) for entry_id, ts, *rest in rows
+            )
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    @staticmethod
+    def _ndjson_chunks(batches, dumps):
+        for rows in batches:
+            lines = []
+            for row in rows:
+                record = dict(zip(EXPORT_COLUMNS, row))
+                record["timestamp"] = record["timestamp"].isoformat()
+                lines.append(dumps(record))
+            lines.append("")
+            yield "\n".join(lines)
+
+    @staticmethod
+    def _gzip_chunks(chunks):
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for chunk in chunks:
+            data = compressor.compress(chunk.encode())
+            if data:
+                yield data
+        yield compressor.flush()
+
+    @staticmethod
+    def export_food_entries(user_id, args, dumps, gzip=False):
+        # Validates up front and returns (chunks, mimetype). Memory stays flat
+        # however long the history: one cursor batch is in flight at a time.
+        fmt = args.get("format", "csv").lower()
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+        date_from = FoodService.parse_date_bound(args.get("from"))
+        date_to = FoodService.parse_date_bound(args.get("to"), end=True)
+
+        write_behind.flush_user(user_id)
+        batches = FoodModel.iter_entries(user_id, date_from, date_to)
+        if fmt == "csv":
+            chunks = FoodService._csv_chunks(batches)
+        else:
+            chunks = FoodService._ndjson_chunks(batches, dumps)
+        if gzip:
+            chunks = FoodService._gzip_chunks(chunks)
+        return chunks, EXPORT_FORMATS[fmt]
+
+    @staticmethod
+    def _number(data, field):
+        value = data.get(field)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"{field} must be a number")
+        return value
+
+    @staticmethod
+    def parse_mutation(data):
+        # Turns one queued client write into an (op, args) pair for
+        # FoodModel.apply_mutations; raises ValueError if it is malformed.
+        if not isinstance(data, dict):
+            raise ValueError("Mutation must be an object")
+        op = data.get("op")
+        if op == "log":
+            error = FoodService.validate_entry(data)
+            if error:
+                raise ValueError(error)
+            client_ref = data.get("clientRef")
+            if client_ref is not None and (not isinstance(client_ref, str)
+                                           or not 0 < len(client_ref) <= MAX_CLIENT_REF_LENGTH):
+                raise ValueError(f"clientRef must be a string of at most {MAX_CLIENT_REF_LENGTH} characters")
+            return "log", ({
+                "name": data["name"],
+                "calories": data["calories"],
+                "protein": data["protein"],
+                "carbs": data["carbs"],
+                "fat": data["fat"],
+                "meal_type": data["mealType"],
+                "timestamp": data["timestamp"],
+                "servings": data.get("servings", 1),
+                "client_ref": client_ref,
+            },)
+        if op in ("delete", "servings"):
+            entry_id = data.get("id")
+            if isinstance(entry_id, bool) or not isinstance(entry_id, int):
+                raise ValueError("id must be an integer")
+            if op == "delete":
+                return "delete", (entry_id,)
+            servings = FoodService._number(data, "servings")
+            if servings < 0:
+                raise ValueError("servings must be a non-negative number")
+            return "servings", (entry_id, servings)
+        if op == "water":
+            if data.get("waterConsumed") is not None:
+                return "water", (FoodService._number(data, "waterConsumed") * 0.25,)
+            return "water_delta", (FoodService._number(data, "delta") * 0.25,)
+        raise ValueError(f"Unknown op: {op}")
+
+    @staticmethod
+    def sync(user_id, since, mutations=None):
+        # Applies queued client writes, then returns what changed after
+        # `since`. Clients pass the returned revision back next time.
+        try:
+            since = int(since or 0)
+        except (TypeError, ValueError):
+            raise ValueError("since must be an integer revision")
+        if since < 0:
+            raise ValueError("since must be an integer revision")
+        mutations = mutations or []
+        if not isinstance(mutations, list):
+            raise ValueError("mutations must be a list")
+        if len(mutations) > MAX_SYNC_MUTATIONS:
+            raise ValueError(f"At most {MAX_SYNC_MUTATIONS} mutations per sync")
+
+        applied = []
+        pending = []
+        for index, data in enumerate(mutations):
+            result = {"index": index}
+            applied.append(result)
+            try:
+                pending.append((result, FoodService.parse_mutation(data)))
+            except ValueError as e:
+                result.update(success=False, error=str(e))
+        write_behind.flush_user(user_id)
+        if pending:
+            outcomes = FoodModel.apply_mutations(user_id, [op for _, op in pending])
+            for (result, _), outcome in zip(pending, outcomes):
+                result.update(outcome)
+
+        current, changes = FoodModel.get_changes(user_id, since, MAX_SYNC_CHANGES)
+        response = {"revision": current, "reset": False, "has_more": False,
+                    "entries": [], "deleted": [], "water": []}
+        if mutations:
+            response["applied"] = applied
+        if since == 0 or since > current:
+            # Nothing to diff against (first sync, or a revision this server
+            # never issued): load /food/entries, then sync from `revision`.
+            response["reset"] = True
+            return response
+
+        if len(changes) > MAX_SYNC_CHANGES:
+            changes = changes[:MAX_SYNC_CHANGES]
+            response["has_more"] = True
+            response["revision"] = changes[-1]["revision"]
+
+        entry_ops = {}
+        water_days = set()
+        for change in changes:
+            if change["kind"] == "entry":
+                entry_ops[change["entry_id"]] = change["op"]
+            else:
+                water_days.add(change["day"])
+        upserted = [entry_id for entry_id, op in entry_ops.items() if op == "upsert"]
+        response["entries"] = FoodModel.get_entries_by_ids(user_id, upserted)
+        response["deleted"] = [entry_id for entry_id, op in entry_ops.items() if op == "delete"]
+        if water_days:
+            water = FoodModel.get_daily_water(user_id, min(water_days), max(water_days))
+            response["water"] = [{"date": day.isoformat(), "water_l": water.get(day, 0.0)}
+                                 for day in sorted(water_days)]
+        return response
+
+    @staticmethod
+    def _empty_totals():
+        totals = {key: 0.0 for key in MACROS}
+        totals["water_l"] = 0.0
+        totals["entries"] = 0
+        return totals
+
+    @staticmethod
+    def get_daily_summary(user_id, args):
+        try:
+            start = date.fromisoformat(args["from"]) if args.get("from") else date.today()
+            end = date.fromisoformat(args["to"]) if args.get("to") else start
+        except ValueError:
+            raise ValueError("from/to must be YYYY-MM-DD dates")
+        if end < start:
+            raise ValueError("to must not be before from")
+        if (end - start).days >= MAX_SUMMARY_DAYS:
+            raise ValueError(f"Range is limited to {MAX_SUMMARY_DAYS} days")
+
+        write_behind.flush_user(user_id)
+        days = {}
+        for offset in range((end - start).days + 1):
+            day = start + timedelta(days=offset)
+            days[day] = {"date": day.isoformat(), "totals": FoodService._empty_totals()}
+
+        # Totals come from the daily_totals rollup: a primary-key lookup for
+        # a single day, a short range scan otherwise.
+        for row in FoodModel.get_daily_totals(user_id, start, end):
+            totals = days[row["day"]]["totals"]
+            for key in MACROS:
+                totals[key] = float(row[key])
+            totals["entries"] = row["entries"]
+        for day, water_l in FoodModel.get_daily_water(user_id, start, end).items():
+            days[day]["totals"]["water_l"] = water_l
+
+        if args.get("by_meal", "").lower() in ("1", "true"):
+            for day in days.values():
+                day["meals"] = {}
+            for row in FoodModel.get_daily_meal_totals(user_id, start, end + timedelta(days=1)):
+                meal = {key: float(row[key]) for key in MACROS}
+                meal["entries"] = row["entries"]
+                days[row["day"]]["meals"][row["meal_type"] or "other"] = meal
+
+        return {
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "targets": NutritionModel.get_by_user_id(user_id),
+            "days": list(days.values()),
+        }
+
     @staticmethod
     def delete_food_entry(user_id, entry_id):
-        FoodModel.delete_entry(entry_id, user_id)
-        return True
+        # False if there is no such entry; raises EntryArchived if it has
+        # been archived.
+        return FoodModel.delete_entry(entry_id, user_id)
 
     @staticmethod
     def update_food_servings(user_id, entry_id, servings):
-        FoodModel.update_servings(entry_id, user_id, servings)
-        return True
+        return FoodModel.update_servings(entry_id, user_id, servings)
       
     @staticmethod
     def update_water_consumed(user_id, water):
         FoodModel.update_or_add_water(user_id, water)
         return True
 
+    @staticmethod
+    def add_water(user_id, delta):
+        FoodModel.add_water(user_id, delta)
+        return True
+
     @staticmethod
     def get_latest_water(user_id):
         return FoodModel.get_latest_water(user_id)
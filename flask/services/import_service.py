@@ -0,0 +1,100 @@
+import csv
+import uuid
+from datetime import datetime
+from models.food_model import FoodModel
+from services.food_service import FoodService, REQUIRED_ENTRY_FIELDS
+
+DEFAULT_CHUNK_SIZE = 2000
+MAX_REPORTED_ERRORS = 1000
+# food_imports.import_key is VARCHAR(64).
+MAX_IMPORT_KEY_LENGTH = 64
+# Lets a file from /food/export be imported as-is.
+HEADER_ALIASES = {"meal_type": "mealType"}
+
+class ImportService:
+
+    @staticmethod
+    def new_import_key():
+        return uuid.uuid4().hex
+
+    @staticmethod
+    def parse_row(raw):
+        data = {key: value.strip() for key, value in raw.items() if key is not None and value is not None}
+        if not data.get("servings"):
+            data.pop("servings", None)
+        error = FoodService.validate_entry(data)
+        if error:
+            return None, error
+        return {
+            "name": data["name"],
+            "calories": float(data["calories"]),
+            "protein": float(data["protein"]),
+            "carbs": float(data["carbs"]),
+            "fat": float(data["fat"]),
+            "meal_type": data["mealType"],
+            "timestamp": datetime.fromisoformat(data["timestamp"]),
+            "servings": float(data.get("servings", 1)),
+        }, None
+
+    @staticmethod
+    def import_csv(user_id, lines, import_key, chunk_size=DEFAULT_CHUNK_SIZE):
+        # `lines` is read once, front to back. Rows an earlier run under the
+        # same import_key already counted are skipped unparsed.
+        if len(import_key) > MAX_IMPORT_KEY_LENGTH:
+            raise ValueError(f"import_id must be at most {MAX_IMPORT_KEY_LENGTH} characters")
+        checkpoint = FoodModel.get_or_create_import(user_id, import_key)
+        summary = {
+            "import_id": import_key,
+            "resumed_from": checkpoint["rows_done"],
+            "rows": checkpoint["rows_done"],
+            "imported": checkpoint["rows_imported"],
+            "failed": checkpoint["rows_failed"],
+            "errors": [],
+        }
+        if checkpoint["completed_at"] is not None:
+            summary["completed"] = True
+            return summary
+
+        reader = csv.DictReader(lines)
+        if not reader.fieldnames:
+            raise ValueError("CSV file is empty")
+        reader.fieldnames = [HEADER_ALIASES.get(name.strip(), name.strip()) for name in reader.fieldnames]
+        missing = [field for field in REQUIRED_ENTRY_FIELDS if field not in reader.fieldnames]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+        chunk = []
+        pending = 0
+        pending_failed = 0
+
+        def flush(completed=False):
+            FoodModel.import_chunk(
+                user_id, checkpoint["id"], chunk,
+                summary["rows"],
+                summary["rows"] + pending,
+                summary["imported"] + len(chunk),
+                summary["failed"] + pending_failed,
+                completed,
+            )
+            summary["rows"] += pending
+            summary["imported"] += len(chunk)
+            summary["failed"] += pending_failed
+
+        for index, raw in enumerate(reader):
+            if index < checkpoint["rows_done"]:
+                continue
+            entry, error = ImportService.parse_row(raw)
+            pending += 1
+            if error:
+                pending_failed += 1
+                if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+                    summary["errors"].append({"line": reader.line_num, "error": error})
+            else:
+                chunk.append(entry)
+            if pending >= chunk_size:
+                flush()
+                chunk, pending, pending_failed = [], 0, 0
+
+        flush(completed=True)
+        summary["completed"] = True
+        return summary
@@ -0,0 +1,244 @@
+import math
+
+import numpy as np
+
+# Vectorized NutritionService.compute_plan. Steps mirror the scalar code in
+# order so results are bit-identical; exp and round(x, 2) use the builtins.
+
+ACTIVITY_LEVELS = ("sedentary", "lightly active", "moderately active", "very active")
+ACTIVITY_MULTIPLIERS = np.array([1.2, 1.375, 1.55, 1.725])
+WATER_ACTIVITY_MULTIPLIERS = np.array([1.0, 1.08, 1.16, 1.24])
+
+FLAG_DEFINITIONS = (
+    ("calorie_below_lower_bound", "warning", "Calorie target below safe lower bound"),
+    ("calorie_above_upper_bound", "warning", "Calorie target above safe upper bound"),
+    ("timeframe_extended_floor", "info", "Timeframe extended to respect calorie floor"),
+    ("timeframe_extended_ceiling", "info", "Timeframe extended to respect calorie ceiling"),
+    ("protein_increased_for_age", "info", "Protein increased for age >= 50"),
+    ("fat_raised_for_gender", "info", "Fat raised to minimum for female users"),
+    ("macro_fallback_applied", "warning", "Fallback macros applied"),
+    ("minor_user_warning", "warning", "User is a minor; parental/clinical oversight recommended"),
+    ("elderly_user_warning", "info", "Elderly user; consider clinical review for major changes"),
+    ("extreme_weight_range", "warning", "User weight in extreme range; consider clinical review"),
+)
+# Both timeframe flags are reported under one code by the scalar path.
+FLAG_CODES = {"timeframe_extended_floor": "timeframe_extended_for_safety",
+              "timeframe_extended_ceiling": "timeframe_extended_for_safety"}
+
+GENDER_OTHER, GENDER_MALE, GENDER_FEMALE = 0, 1, 2
+GOAL_OTHER, GOAL_MAINTENANCE, GOAL_LOSS = 0, 1, 2
+
+
+def columns_from_rows(rows):
+    # Applies the same defaults, string normalization and quantization as
+    # NutritionService.plan_key, producing numeric columns.
+    activity_index = {level: i for i, level in enumerate(ACTIVITY_LEVELS)}
+    gender_codes = {"male": GENDER_MALE, "female": GENDER_FEMALE}
+    goal_codes = {"maintenance": GOAL_MAINTENANCE, "weight loss": GOAL_LOSS}
+    columns = {key: [] for key in ("age", "gender", "weight", "height", "activity", "goal", "weight_goal", "hot")}
+    for data in rows:
+        weight = round(float(data.get("weight") or 0.0), 2)
+        columns["age"].append(int(data.get("age") or 0))
+        columns["gender"].append(gender_codes.get((data.get("gender") or "").strip().lower(), GENDER_OTHER))
+        columns["weight"].append(weight)
+        columns["height"].append(round(float(data.get("height") or 0.0), 2))
+        columns["activity"].append(activity_index.get((data.get("activityLevel") or "sedentary").strip().lower(), 0))
+        columns["goal"].append(goal_codes.get((data.get("primaryGoal") or "maintenance").lower(), GOAL_OTHER))
+        columns["weight_goal"].append(round(float(data.get("weightGoal") or weight), 2))
+        columns["hot"].append((data.get("climate") or "temperate").lower() == "hot")
+    return {
+        "age": np.array(columns["age"], dtype=np.int64),
+        "gender": np.array(columns["gender"], dtype=np.int8),
+        "weight": np.array(columns["weight"], dtype=np.float64),
+        "height": np.array(columns["height"], dtype=np.float64),
+        "activity": np.array(columns["activity"], dtype=np.int64),
+        "goal": np.array(columns["goal"], dtype=np.int8),
+        "weight_goal": np.array(columns["weight_goal"], dtype=np.float64),
+        "hot": np.array(columns["hot"], dtype=bool),
+    }
+
+
+def _exp(values):
+    return np.fromiter(map(math.exp, values.tolist()), dtype=np.float64, count=len(values))
+
+
+def _round2(values):
+    # rint(x * 100) / 100 equals round(x, 2) unless x * 100 sits on a
+    # rounding boundary; only those few go through the builtin.
+    rounded = np.round(values, 2)
+    scaled = values * 100.0
+    tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if tie.any():
+        rounded[tie] = [round(x, 2) for x in values[tie].tolist()]
+    return rounded
+
+
+def calculate_batch(columns):
+    age = np.asarray(columns["age"], dtype=np.int64)
+    weight = np.asarray(columns["weight"], dtype=np.float64)
+    height = np.asarray(columns["height"], dtype=np.float64)
+    weight_goal = np.asarray(columns["weight_goal"], dtype=np.float64)
+    gender = np.asarray(columns["gender"])
+    goal = np.asarray(columns["goal"])
+    activity = np.asarray(columns["activity"], dtype=np.int64)
+    hot = np.asarray(columns["hot"], dtype=bool)
+    is_male = gender == GENDER_MALE
+    is_female = gender == GENDER_FEMALE
+    n = len(age)
+
+    valid = (age >= 0) & (weight > 0) & (height > 0)
+    flags = {name: np.zeros(n, dtype=bool) for name, _, _ in FLAG_DEFINITIONS}
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        # BMR (_calculate_bmr / _calculate_minor_bmr)
+        minor_bmr = np.maximum(np.where(is_male, 17.5 * weight + 651, 12.2 * weight + 746), 1000.0)
+        adult_bmr = np.where(is_male,
+                             10 * weight + 6.25 * height - 5 * age + 5,
+                             10 * weight + 6.25 * height - 5 * age - 161)
+        bmr = np.where(age < 18, minor_bmr, adult_bmr)
+        tdee = bmr * ACTIVITY_MULTIPLIERS[activity]
+
+        maintenance = (goal == GOAL_MAINTENANCE) | (np.abs(weight_goal - weight) < 1e-6)
+        delta = weight_goal - weight
+        total_change = np.abs(delta)
+
+        # _safe_weekly_rate
+        is_loss = goal == GOAL_LOSS
+        base = np.where(is_loss, 0.75, 0.50)
+        age_factor = np.select([age < 30, age < 50, age < 65, age < 75], [1.0, 0.9, 0.8, 0.65], 0.55)
+        gender_factor = np.where(is_female, 0.95, 1.0)
+        exponent = -np.maximum(total_change, 0.0) / np.maximum(20.0, weight)
+        magnitude_factor = 0.6 + 0.4 * _exp(exponent)
+        weekly_rate = base * age_factor * gender_factor * magnitude_factor
+        min_rate = np.where(is_loss, 0.18, 0.15)
+        max_rate = np.where(is_loss, 1.0, 0.8)
+        light = weight < 45
+        min_rate = np.where(light, min_rate * 0.75, min_rate)
+        max_rate = np.where(light, max_rate * 0.6, max_rate)
+        max_rate = np.where(weight > 140, max_rate * 1.2, max_rate)
+        weekly_rate = np.maximum(np.minimum(weekly_rate, max_rate), min_rate)
+
+        est_weeks = np.minimum(np.maximum(6.0, np.ceil(total_change / weekly_rate)), 104.0)
+        calorie_target = tdee + (delta * 7700.0) / (est_weeks * 7.0)
+
+        # _dynamic_calorie_bounds
+        lower = np.select(
+            [age < 50, age < 65],
+            [np.maximum(bmr * 1.00, 9.5 * weight + 200), np.maximum(bmr * 1.05, 9.5 * weight + 250)],
+            np.maximum(bmr * 1.10, 9.5 * weight + 300),
+        )
+        lower = np.maximum(lower, np.where(is_female, 1200.0, 1400.0))
+        upper = np.minimum(np.minimum(tdee * 1.25, bmr * 1.9), 40.0 * weight)
+        clash = lower >= upper
+        lower = np.where(clash, np.minimum(lower, tdee * 0.95), lower)
+        upper = np.where(clash, np.maximum(upper, tdee * 1.05), upper)
+        clash = lower >= upper
+        lower = np.where(clash, bmr, lower)
+        upper = np.where(clash, np.maximum(bmr * 1.4, weight * 30.0), upper)
+
+        below = ~maintenance & (calorie_target < lower)
+        above = ~maintenance & ~below & (calorie_target > upper)
+
+        safe_weekly = np.where(below, np.maximum(weekly_rate, 0.35), np.maximum(weekly_rate * 0.7, 0.25))
+        safe_weeks = np.minimum(np.maximum(np.ceil(total_change / safe_weekly), 6.0), 104.0)
+        safe_target = tdee + (delta * 7700.0) / (safe_weeks * 7.0)
+        est_weeks = np.where(below | above, safe_weeks, est_weeks)
+        calorie_target = np.where(below, np.maximum(lower, safe_target), calorie_target)
+        calorie_target = np.where(above, np.minimum(upper, safe_target), calorie_target)
+
+        calorie_target = np.where(maintenance, np.rint(tdee), calorie_target)
+        time_frame = np.where(maintenance, 0, est_weeks).astype(np.int64)
+        flags["calorie_below_lower_bound"] = below
+        flags["calorie_above_upper_bound"] = above
+        flags["timeframe_extended_floor"] = below
+        flags["timeframe_extended_ceiling"] = above
+
+        cutting = ~maintenance & (delta < 0)
+        carb_p = np.where(cutting, 0.40, 0.50)
+        prot_p = np.where(cutting, 0.30, 0.25)
+        fat_p = np.where(cutting, 0.30, 0.25)
+
+        # _apply_macro_overrides
+        new_prot = np.minimum(prot_p + 0.05, 0.35)
+        raise_prot = (age >= 50) & (new_prot > prot_p)
+        shift = new_prot - prot_p
+        taken = np.minimum(carb_p, shift)
+        rem = shift - taken
+        fat_p = np.where(raise_prot & (rem > 0), np.maximum(0.2, fat_p - rem), fat_p)
+        carb_p = np.where(raise_prot, carb_p - taken, carb_p)
+        prot_p = np.where(raise_prot, new_prot, prot_p)
+        flags["protein_increased_for_age"] = raise_prot
+
+        raise_fat = is_female & (fat_p < 0.28)
+        needed = 0.28 - fat_p
+        taken = np.minimum(carb_p, needed)
+        rem = needed - taken
+        prot_p = np.where(raise_fat & (rem > 0), np.maximum(0.2, prot_p - rem), prot_p)
+        carb_p = np.where(raise_fat, carb_p - taken, carb_p)
+        fat_p = np.where(raise_fat, 0.28, fat_p)
+        flags["fat_raised_for_gender"] = raise_fat
+
+        total = carb_p + prot_p + fat_p
+        fallback = total <= 0
+        carb_p, prot_p, fat_p = carb_p / total, prot_p / total, fat_p / total
+        prot_p = np.maximum(prot_p, 0.18)
+        carb_p = np.maximum(carb_p, 0.35)
+        fat_p = np.maximum(fat_p, 0.20)
+        total = carb_p + prot_p + fat_p
+        carb_p, prot_p, fat_p = carb_p / total, prot_p / total, fat_p / total
+        carb_p = np.where(fallback, 0.45, carb_p)
+        prot_p = np.where(fallback, 0.30, prot_p)
+        fat_p = np.where(fallback, 0.25, fat_p)
+        flags["macro_fallback_applied"] = fallback
+
+        flags["minor_user_warning"] = age < 18
+        flags["elderly_user_warning"] = age >= 70
+        flags["extreme_weight_range"] = (weight < 40) | (weight > 180)
+
+        calorie_target = np.rint(calorie_target)
+        carbs_g = np.rint((calorie_target * carb_p) / 4.0)
+        protein_g = np.rint((calorie_target * prot_p) / 4.0)
+        fat_g = np.rint((calorie_target * fat_p) / 9.0)
+
+        # _water_intake_liters
+        water = 0.035 * weight
+        water = np.where(age >= 70, water * 0.9, water)
+        age_adj = np.where(age >= 60, np.maximum(0.85, 1.0 - (age - 60) * 0.01), 1.0)
+        climate_mult = np.where(hot, 1.2, 1.0)
+        sex_boost = np.where(is_male & (activity == 3) & (age < 50), 1.05, 1.0)
+        water = water * WATER_ACTIVITY_MULTIPLIERS[activity] * age_adj * climate_mult * sex_boost
+        water_l = _round2(water)
+
+    def as_int(values):
+        return np.where(valid, values, 0).astype(np.int64)
+
+    return {
+        "valid": valid,
+        "calorie_target": as_int(calorie_target),
+        "carbs_g": as_int(carbs_g),
+        "protein_g": as_int(protein_g),
+        "fat_g": as_int(fat_g),
+        "time_frame": np.where(valid, time_frame, 0),
+        "water_l": np.where(valid, water_l, 0.0),
+        "flags": {name: mask & valid for name, mask in flags.items()},
+    }
+
+
+def flags_for(result, i):
+    return [
+        {"code": FLAG_CODES.get(name, name), "level": level, "message": message}
+        for name, level, message in FLAG_DEFINITIONS
+        if result["flags"][name][i]
+    ]
+
+
+def plan_for(result, i):
+    return {
+        "calorie_target": int(result["calorie_target"][i]),
+        "carbs_g": int(result["carbs_g"][i]),
+        "protein_g": int(result["protein_g"][i]),
+        "fat_g": int(result["fat_g"][i]),
+        "time_frame": int(result["time_frame"][i]),
+        "water_l": float(result["water_l"][i]),
+        "flags": flags_for(result, i),
+    }
@@ -1,6 +1,32 @@
 from models.nutrition_model import NutritionModel
+from models.user_model import UserModel
+from config import Config
+from functools import lru_cache
 import math
 
+ACTIVITY_LEVELS = frozenset(["sedentary", "lightly active", "moderately active", "very active"])
+ACTIVITY_MULTIPLIERS = {
+    "sedentary": 1.2,
+    "lightly active": 1.375,
+    "moderately active": 1.55,
+    "very active": 1.725
+}
+# Request fields a user can change when recomputing, and their users columns.
+RECOMPUTE_FIELDS = {
+    "weight": "weight_kg",
+    "weightGoal": "weight_goal",
+    "activityLevel": "activity_level",
+    "primaryGoal": "goal"
+}
+DEFAULT_HISTORY_SIZE = 20
+MAX_HISTORY_SIZE = 200
+WATER_ACTIVITY_MULTIPLIERS = {
+    "sedentary": 1.0,
+    "lightly active": 1.08,
+    "moderately active": 1.16,
+    "very active": 1.24
+}
+
 class NutritionService:
     @staticmethod
     def get_by_user_id(user_id: int):
@@ -8,23 +34,12 @@ class NutritionService:
 
     @staticmethod
     def _normalize_activity(level: str) -> str:
-        mapping = {
-            "sedentary": "sedentary",
-            "lightly active": "lightly active",
-            "moderately active": "moderately active",
-            "very active": "very active"
-        }
-        return mapping.get((level or "").strip().lower(), "sedentary")
+        level = (level or "").strip().lower()
+        return level if level in ACTIVITY_LEVELS else "sedentary"
 
     @staticmethod
     def _activity_multiplier(level: str) -> float:
-        multipliers = {
-            "sedentary": 1.2,
-            "lightly active": 1.375,
-            "moderately active": 1.55,
-            "very active": 1.725
-        }
-        return multipliers[NutritionService._normalize_activity(level)]
+        return ACTIVITY_MULTIPLIERS[NutritionService._normalize_activity(level)]
 
     @staticmethod
     def _add_flag(flags: list, code: str, level: str, message: str):
@@ -140,12 +155,7 @@ class NutritionService:
         base = 0.035 * weight
         if age >= 70:
             base *= 0.9
-        activity_mult = {
-            "sedentary": 1.0,
-            "lightly active": 1.08,
-            "moderately active": 1.16,
-            "very active": 1.24
-        }[NutritionService._normalize_activity(activity_level)]
+        activity_mult = WATER_ACTIVITY_MULTIPLIERS[NutritionService._normalize_activity(activity_level)]
         age_adj = 1.0
         if age >= 60:
             age_adj = max(0.85, 1.0 - (age - 60) * 0.01)
@@ -168,18 +178,84 @@ class NutritionService:
 
     @staticmethod
     def calculate_nutrition(data, user_id):
+        plan = NutritionService.compute_plan(data)
+        NutritionModel.create_profile(user_id, plan["calorie_target"], plan["carbs_g"], plan["protein_g"],
+                                      plan["fat_g"], plan["time_frame"], plan["water_l"], data.get("weight"))
+        return plan
+
+    @staticmethod
+    def recompute_for_user(user_id, data):
+        # Applies the changed body/goal fields to the stored ones, computes a
+        # new plan and makes it the active profile; earlier profiles stay in
+        # the history. Returns None if the user doesn't exist.
+        changes = {field: data[field] for field in RECOMPUTE_FIELDS if data.get(field) is not None}
+        if not changes:
+            raise ValueError(f"Send at least one of: {', '.join(RECOMPUTE_FIELDS)}")
+        inputs = UserModel.get_plan_inputs(user_id)
+        if inputs is None:
+            return None
+        payload = {
+            "age": inputs["age"],
+            "gender": inputs["gender"],
+            "weight": inputs["weight_kg"],
+            "height": inputs["height_cm"],
+            "activityLevel": inputs["activity_level"],
+            "primaryGoal": inputs["goal"],
+            "weightGoal": inputs["weight_goal"],
+        }
+        payload.update(changes)
+        plan = NutritionService.compute_plan(payload)
+        columns = {RECOMPUTE_FIELDS[field]: value for field, value in changes.items()}
+        plan["profile_id"] = UserModel.update_with_profile(user_id, columns, plan, payload["weight"])
+        return plan
+
+    @staticmethod
+    def get_history(user_id, args):
+        try:
+            limit = int(args.get("limit", DEFAULT_HISTORY_SIZE))
+        except ValueError:
+            raise ValueError("limit must be an integer")
+        return NutritionModel.get_history(user_id, max(1, min(limit, MAX_HISTORY_SIZE)))
+
+    @staticmethod
+    def plan_key(data):
+        # compute_plan's inputs in canonical form (options the formulas
+        # distinguish, measurements to 0.01), so equivalent inputs share an entry.
+        age = int(data.get("age") or 0)
+        gender = (data.get("gender") or "").strip().lower()
+        weight = round(float(data.get("weight") or 0.0), 2)
+        height = round(float(data.get("height") or 0.0), 2)
+        activity_level = NutritionService._normalize_activity(data.get("activityLevel") or "sedentary")
+        goal = (data.get("primaryGoal") or "maintenance").lower()
+        weight_goal = round(float(data.get("weightGoal") or weight), 2)
+        climate = (data.get("climate") or "temperate").lower()
+        if age < 0 or weight <= 0 or height <= 0:
+            raise ValueError("Invalid age/weight/height provided")
+        return (
+            age,
+            gender if gender in ("male", "female") else "",
+            weight,
+            height,
+            activity_level,
+            goal if goal in ("maintenance", "weight loss") else "weight gain",
+            weight_goal,
+            "hot" if climate == "hot" else "temperate",
+        )
+
+    @staticmethod
+    def compute_plan(data):
+        plan = _cached_plan(NutritionService.plan_key(data))
+        return dict(plan, flags=[dict(flag) for flag in plan["flags"]])
+
+    @staticmethod
+    def plan_cache_info():
+        info = _cached_plan.cache_info()
+        return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize}
+
+    @staticmethod
+    def _compute_plan(age, gender, weight, height, activity_level, goal, weight_goal, climate):
         try:
             flags = []
-            age = int(data.get("age") or 0)
-            gender = (data.get("gender") or "").strip()
-            weight = float(data.get("weight") or 0.0)
-            height = float(data.get("height") or 0.0)
-            activity_level = data.get("activityLevel") or "sedentary"
-            goal = (data.get("primaryGoal") or "maintenance").lower()
-            weight_goal = float(data.get("weightGoal") or weight)
-            climate = (data.get("climate") or "temperate").lower()
-            if age < 0 or weight <= 0 or height <= 0:
-                raise ValueError("Invalid age/weight/height provided")
             bmr = NutritionService._calculate_bmr(weight, height, age, gender)
             am = NutritionService._activity_multiplier(activity_level)
             tdee = bmr * am
@@ -233,7 +309,6 @@ class NutritionService:
             protein_g = round((calorie_target * prot_p) / 4.0)
             fat_g = round((calorie_target * fat_p) / 9.0)
             water_l = NutritionService._water_intake_liters(weight, activity_level, age, gender, climate)
-            NutritionModel.create_profile(user_id, calorie_target, carbs_g, protein_g, fat_g, time_frame, water_l)
             return {
                 "calorie_target": calorie_target,
                 "carbs_g": carbs_g,
@@ -245,3 +320,8 @@ class NutritionService:
             }
         except Exception as e:
             raise
+
+
+@lru_cache(maxsize=Config.NUTRITION_PLAN_CACHE_SIZE)
+def _cached_plan(key):
+    return NutritionService._compute_plan(*key)
@@ -0,0 +1,65 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, generate_password_hash, check_password_hash
+from config import Config
+
+class HashingBusy(Exception):
+    pass
+
+class HashingTimeout(HashingBusy):
+    # A hash that outlived PASSWORD_HASH_TIMEOUT; callers answer it like a
+    # full pool, with 503 and Retry-After.
+    pass
+
+# KDF work runs on a small dedicated pool (hashlib releases the GIL), so a
+# login burst occupies at most PASSWORD_HASH_WORKERS cores. Callers beyond
+# workers + MAX_PENDING are turned away instead of queueing without bound.
+_executor = None
+if Config.PASSWORD_HASH_WORKERS > 0:
+    _executor = ThreadPoolExecutor(max_workers=Config.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_slots = threading.BoundedSemaphore(max(1, Config.PASSWORD_HASH_WORKERS + Config.PASSWORD_HASH_MAX_PENDING))
+
+def _method_prefix(method):
+    # The "method$" part werkzeug writes for `method`, with the defaults it
+    # fills in spelled out, so needs_rehash compares without hashing.
+    name, *args = method.split(":")
+    if name == "scrypt":
+        return "scrypt:" + ":".join(args[:3] if args else ("32768", "8", "1"))
+    if name == "pbkdf2":
+        hash_name = args[0] if args else "sha256"
+        iterations = args[1] if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS
+        return f"pbkdf2:{hash_name}:{iterations}"
+    return method
+
+_METHOD_PREFIX = _method_prefix(Config.PASSWORD_HASH_METHOD)
+
+def _run(fn, *args):
+    if _executor is None:
+        return fn(*args)
+    if not _slots.acquire(blocking=False):
+        raise HashingBusy("Too many password operations in progress")
+    try:
+        future = _executor.submit(fn, *args)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    try:
+        return future.result(timeout=Config.PASSWORD_HASH_TIMEOUT)
+    except FutureTimeout:
+        # The hash finishes in the background and frees its slot then.
+        raise HashingTimeout(f"Password operation took longer than {Config.PASSWORD_HASH_TIMEOUT}s")
+
+class PasswordService:
+
+    @staticmethod
+    def hash_password(password):
+        return _run(generate_password_hash, password, Config.PASSWORD_HASH_METHOD)
+
+    @staticmethod
+    def verify_password(password_hash, password):
+        return _run(check_password_hash, password_hash, password)
+
+    @staticmethod
+    def needs_rehash(password_hash):
+        return password_hash.split("$", 1)[0] != _METHOD_PREFIX
@@ -0,0 +1,205 @@
+import math
+import threading
+from datetime import date, timedelta
+import numpy as np
+from cache import TTLCache
+from config import Config
+from models.food_model import FoodModel
+from models.nutrition_model import NutritionModel
+from services import write_behind
+import versions
+
+MACROS = ("calories", "protein", "carbs", "fat")
+TARGET_COLUMNS = ("calorie_target", "protein_g", "carbs_g", "fat_g")
+WINDOWS = (7, 30)
+DEFAULT_SERIES_DAYS = 30
+MAX_SERIES_DAYS = 365
+KCAL_PER_KG = 7700
+TDEE_MAX_SPAN_DAYS = 90
+TDEE_MIN_SPAN_DAYS = 14
+TDEE_MIN_LOGGED = 0.5
+WEIGHT_HISTORY_SIZE = 200
+MAX_CACHED_RESULTS = 4
+# Everything the longest series and its windows can look at; the weight
+# span for TDEE is shorter.
+HISTORY_DAYS = MAX_SERIES_DAYS + max(WINDOWS)
+
+# user_id -> HISTORY_DAYS of daily totals as a dense array, patched from
+# changed daily_totals rows. States are copied before patching, never mutated.
+_series = TTLCache(maxsize=Config.TRENDS_CACHE_SIZE, ttl=Config.TRENDS_CACHE_TTL)
+
+
+def _new_state(as_of):
+    return {
+        "as_of": as_of,
+        "start": as_of.toordinal() - HISTORY_DAYS,
+        "values": np.full((HISTORY_DAYS + 1, 4), np.nan),
+        "synced_at": None,
+    }
+
+
+def _patch(state, rows):
+    # Patches a copy of the array and swaps it in. Days with no entries are
+    # NaN so they don't drag the averages down.
+    if not rows:
+        return
+    days = np.fromiter((row[0].toordinal() for row in rows), dtype=np.int64, count=len(rows)) - state["start"]
+    data = np.array([row[1:] for row in rows], dtype=np.float64)
+    values = np.where(data[:, 4:5] > 0, data[:, :4], np.nan)
+    patched = state["values"].copy()
+    inside = (days >= 0) & (days < len(patched))
+    patched[days[inside]] = values[inside]
+    state["values"] = patched
+
+
+def _load(user_id, as_of):
+    # Reloads per version change, only rows updated since the last load. The
+    # cut-off overlaps since updated_at is set before a write commits.
+    version = versions.current(user_id)
+    state = _series.get(user_id)
+    if state is not None and state["as_of"] == as_of and state["version"] == version:
+        return state
+    if state is None or state["as_of"] != as_of:
+        state = _new_state(as_of)
+    else:
+        state = dict(state)
+    since = state["synced_at"]
+    if since is not None:
+        since -= timedelta(seconds=Config.TRENDS_REFRESH_OVERLAP)
+    rows, synced_at = FoodModel.get_daily_series(user_id, date.fromordinal(state["start"]), as_of, since)
+    _patch(state, rows)
+    weights = [
+        (row["created_at"].date(), float(row["weight_kg"]))
+        for row in NutritionModel.get_history(user_id, WEIGHT_HISTORY_SIZE)
+        if row["weight_kg"] is not None
+    ]
+    state.update(
+        version=version,
+        synced_at=synced_at,
+        profile=NutritionModel.get_by_user_id(user_id),
+        weights=sorted(weights),
+        results={},
+        lock=threading.Lock(),
+    )
+    _series.set(user_id, state)
+    return state
+
+
+def _round(array, digits=1):
+    return [None if math.isnan(value) else value for value in np.round(array, digits).tolist()]
+
+
+class TrendsService:
+
+    @staticmethod
+    def rolling(values, window):
+        # Trailing `window`-day mean over logged days at every position, via
+        # prefix sums of values and of logged-day counts.
+        logged = ~np.isnan(values)
+        sums = np.concatenate([np.zeros((1, values.shape[1])), np.cumsum(np.where(logged, values, 0), axis=0)])
+        counts = np.concatenate([np.zeros((1, values.shape[1])), np.cumsum(logged, axis=0)])
+        upper = np.arange(1, len(values) + 1)
+        lower = np.maximum(upper - window, 0)
+        total = counts[upper] - counts[lower]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(total > 0, (sums[upper] - sums[lower]) / total, np.nan)
+
+    @staticmethod
+    def observed_tdee(values, start, as_of, weights):
+        # Energy balance between the first and last weigh-in of the recent
+        # span: mean logged intake minus the energy of the weight change.
+        recent = [(day, kg) for day, kg in weights if (as_of - day).days <= TDEE_MAX_SPAN_DAYS]
+        if len(recent) < 2:
+            return None
+        (first_day, first_kg), (last_day, last_kg) = recent[0], recent[-1]
+        span = (last_day - first_day).days
+        if span < TDEE_MIN_SPAN_DAYS:
+            return None
+        lo = max(first_day.toordinal() - start, 0)
+        hi = max(last_day.toordinal() - start, 0)
+        calories = values[lo:hi, 0]
+        logged = int(np.count_nonzero(~np.isnan(calories)))
+        if logged < TDEE_MIN_LOGGED * span:
+            return None
+        change = last_kg - first_kg
+        return {
+            "kcal": round(float(np.nanmean(calories)) - change * KCAL_PER_KG / span),
+            "from": first_day.isoformat(),
+            "to": last_day.isoformat(),
+            "weight_change_kg": round(change, 2),
+            "days_logged": logged,
+        }
+
+    @staticmethod
+    def compute(values, start, as_of, days, targets=None, weights=()):
+        # values: (n x 4) daily calories/protein/carbs/fat from date
+        # ordinal `start`, NaN where nothing was logged. Pure array math, so
+        # benchmarks can run it without a database.
+        end = as_of.toordinal() + 1
+        if start is None or start >= end:
+            start, values = end - 1, np.empty((0, 4))
+        if start + len(values) < end:
+            values = np.concatenate([values, np.full((end - start - len(values), 4), np.nan)])
+        values = values[:end - start]
+        # Only the returned days and the windows behind them are averaged,
+        # so the cost doesn't grow with the length of the history.
+        tail = values[max(len(values) - days - max(WINDOWS), 0):]
+        averages = {window: TrendsService.rolling(tail, window) for window in WINDOWS}
+        target = None if targets is None else np.array([float(targets[c]) for c in TARGET_COLUMNS])
+
+        windows = {}
+        for window in WINDOWS:
+            recent = values[-window:]
+            logged = ~np.isnan(recent[:, 0])
+            summary = dict(zip(MACROS, _round(averages[window][-1])))
+            summary["days_logged"] = int(logged.sum())
+            if target is not None:
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    ratio = averages[window][-1] / target
+                    near = np.abs(recent[logged, 0] - target[0]) <= Config.TRENDS_ADHERENCE_TOLERANCE * target[0]
+                summary["vs_target"] = dict(zip(MACROS, _round(ratio, 3)))
+                summary["adherence"] = round(float(near.mean()), 3) if logged.any() else None
+            windows[str(window)] = summary
+
+        shown = min(days, len(values))
+        first_day = start + len(values) - shown
+        columns = {}
+        for i, macro in enumerate(MACROS):
+            columns[macro] = _round(tail[-shown:, i])
+            for window in WINDOWS:
+                columns[f"{macro}_{window}d"] = _round(averages[window][-shown:, i])
+        series = [
+            {"date": date.fromordinal(first_day + offset).isoformat(),
+             **{key: column[offset] for key, column in columns.items()}}
+            for offset in range(shown)
+        ]
+        return {
+            "as_of": as_of.isoformat(),
+            "targets": None if target is None else dict(zip(MACROS, target.tolist())),
+            "windows": windows,
+            "tdee": TrendsService.observed_tdee(values, start, as_of, weights),
+            "series": series,
+        }
+
+    @staticmethod
+    def get_trends(user_id, args):
+        try:
+            days = int(args.get("days", DEFAULT_SERIES_DAYS))
+        except ValueError:
+            raise ValueError("days must be an integer")
+        days = max(1, min(days, MAX_SERIES_DAYS))
+        as_of = date.today()
+
+        write_behind.flush_user(user_id)
+        state = _load(user_id, as_of)
+        results = state["results"]
+        with state["lock"]:
+            result = results.get(days)
+        if result is None:
+            result = TrendsService.compute(
+                state["values"], state["start"], as_of, days, state["profile"], state["weights"])
+            with state["lock"]:
+                if len(results) >= MAX_CACHED_RESULTS:
+                    results.clear()
+                results[days] = result
+        return result
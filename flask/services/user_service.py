@@ -1,6 +1,11 @@
-from werkzeug.security import generate_password_hash, check_password_hash
-from flask_jwt_extended import create_access_token
+from flask_jwt_extended import create_access_token, get_jwt, get_jwt_identity
 from models.user_model import UserModel
+from services.password_service import PasswordService
+from services.nutrition_service import NutritionService
+from cache import TTLCache
+from config import Config
+
+_user_cache = TTLCache(maxsize=Config.USER_CACHE_SIZE, ttl=Config.USER_CACHE_TTL)
 
 class UserService:
 
@@ -11,18 +16,53 @@ class UserService:
 
     @staticmethod
     def register_user(data):
-        hashed_password = generate_password_hash(data["password"])
-        data["password_hash"] = hashed_password
-        return UserModel.create_user(data)
+        # One hash, one transaction, and the token is built from what was
+        # just written; raises EmailTaken if the address is in use.
+        plan = NutritionService.compute_plan(data)
+        data["password_hash"] = PasswordService.hash_password(data["password"])
+        user_id = UserModel.create_user_with_profile(data, plan)
+        UserService.invalidate_user(data["email"])
+        token = UserService.create_token({"id": user_id, "email": data["email"], "name": data.get("name")})
+        return {"token": token, "user_id": user_id, "nutrition": plan}
 
     @staticmethod
     def authenticate_user(email, password):
         user = UserModel.get_by_email(email)
-        if not user or not check_password_hash(user["password_hash"], password):
+        if not user or not PasswordService.verify_password(user["password_hash"], password):
             return None
-        token = create_access_token(identity=email)
+        if PasswordService.needs_rehash(user["password_hash"]):
+            # KDF parameters changed since this hash was made; upgrade it
+            # now that we have the plaintext.
+            UserModel.update_password_hash(user["id"], PasswordService.hash_password(password))
+            UserService.invalidate_user(email)
+        token = UserService.create_token(user)
         return {"token": token, "user_id": user["id"]}
-    
+
+    @staticmethod
+    def create_token(user):
+        # The id and name ride along in the token so protected routes don't
+        # have to hit the users table to find out who is calling.
+        claims = {"uid": user["id"], "name": user.get("name")}
+        return create_access_token(identity=user["email"], additional_claims=claims)
+
     @staticmethod
     def get_user_by_email(email: str):
-        return UserModel.get_by_email(email)
+        user = _user_cache.get(email)
+        if user is None:
+            user = UserModel.get_by_email(email)
+            if user:
+                _user_cache.set(email, user)
+        return user
+
+    @staticmethod
+    def get_current_user():
+        claims = get_jwt()
+        email = get_jwt_identity()
+        if "uid" in claims:
+            return {"id": claims["uid"], "email": email, "name": claims.get("name")}
+        # Tokens issued before the uid claim existed.
+        return UserService.get_user_by_email(email)
+
+    @staticmethod
+    def invalidate_user(email: str):
+        _user_cache.delete(email)
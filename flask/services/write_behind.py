@@ -0,0 +1,249 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from models.food_model import FoodModel
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS food_log_queue (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    entry TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_until REAL NOT NULL DEFAULT 0,
+    writing INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS ix_food_log_queue_user ON food_log_queue (user_id, id);
+CREATE TABLE IF NOT EXISTS food_log_dead (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    entry TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    error TEXT,
+    failed_at REAL NOT NULL
+);
+"""
+CLIENT_REF_PREFIX = "wb:"
+
+
+class WriteBehindQueue:
+    # SQLite journal in front of food_intake, drained in leased batches. The
+    # client_ref on every entry makes replays idempotent; entries failing
+    # max_attempts times move to food_log_dead. Workers can share the file.
+
+    def __init__(self, path, synchronous="NORMAL", batch_size=500, linger=0.005, poll_interval=0.05,
+                 lease=30.0, max_attempts=5, flush_wait=1.0):
+        self.path = path
+        self.synchronous = synchronous
+        self.batch_size = batch_size
+        self.linger = linger
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.flush_wait = flush_wait
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        return conn
+
+    @property
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def enqueue(self, user_id, entry):
+        client_ref = CLIENT_REF_PREFIX + uuid.uuid4().hex
+        entry = dict(entry, client_ref=client_ref)
+        row = (user_id, json.dumps(entry, default=str))
+        # SQLite has one writer; queueing on a lock here is far cheaper than
+        # its busy handler's sleep-and-retry.
+        with self._write_lock:
+            self._conn.execute("INSERT INTO food_log_queue (user_id, entry) VALUES (?, ?)", row)
+        self._wake.set()
+        return client_ref
+
+    def pending(self, user_id=None, dead=False):
+        table = "food_log_dead" if dead else "food_log_queue"
+        if user_id is None:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        return self._conn.execute(f"SELECT COUNT(*) FROM {table} WHERE user_id = ?", (user_id,)).fetchone()[0]
+
+    def _claim(self, user_id=None):
+        # Leases up to batch_size unleased rows, the user's only if given,
+        # and counts the attempt. Returns (id, user_id, entry, attempts).
+        conn = self._conn
+        now = time.time()
+        sql = "SELECT id, user_id, entry, attempts + 1 FROM food_log_queue WHERE lease_until < ?"
+        params = [now]
+        if user_id is not None:
+            sql += " AND user_id = ?"
+            params.append(user_id)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(sql + " ORDER BY id LIMIT ?", (*params, self.batch_size)).fetchall()
+            if rows:
+                conn.execute(
+                    f"""
+                    UPDATE food_log_queue SET lease_until = ?, attempts = attempts + 1, writing = 1
+                    WHERE id IN ({', '.join('?' * len(rows))})
+                    """,
+                    (now + self.lease, *(row[0] for row in rows))
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return rows
+
+    def _delete(self, ids):
+        self._conn.execute(f"DELETE FROM food_log_queue WHERE id IN ({', '.join('?' * len(ids))})", ids)
+
+    def _write_group(self, rows):
+        groups = {}
+        for _, user_id, entry, _ in rows:
+            groups.setdefault(user_id, []).append(json.loads(entry))
+        FoodModel.add_queued_entries(groups)
+        self._delete([row[0] for row in rows])
+
+    def _failed(self, row, error):
+        # The lease stays as the retry delay; past max_attempts the row is
+        # dead-lettered instead. The client already has its 202, so the
+        # loss is logged at error level.
+        entry_id, user_id, entry, attempts = row
+        conn = self._conn
+        if attempts < self.max_attempts:
+            conn.execute("UPDATE food_log_queue SET writing = 0 WHERE id = ?", (entry_id,))
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO food_log_dead (id, user_id, entry, attempts, error, failed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (entry_id, user_id, entry, attempts, repr(error), time.time())
+            )
+            conn.execute("DELETE FROM food_log_queue WHERE id = ?", (entry_id,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        logger.error("queued food entry dead-lettered", extra={
+            "user_id": user_id, "client_ref": json.loads(entry).get("client_ref"), "attempts": attempts})
+
+    def _write(self, rows):
+        # One commit for the batch; failing that one per user, then one per
+        # entry, so a bad entry fails on its own and the rest still land.
+        try:
+            self._write_group(rows)
+            return
+        except Exception as e:
+            error = e
+        by_user = {}
+        for row in rows:
+            by_user.setdefault(row[1], []).append(row)
+        for user_id, user_rows in by_user.items():
+            if 1 < len(user_rows) < len(rows):
+                try:
+                    self._write_group(user_rows)
+                    continue
+                except Exception:
+                    pass
+            for row in user_rows:
+                if len(rows) > 1:
+                    try:
+                        self._write_group([row])
+                        continue
+                    except Exception as e:
+                        error = e
+                logger.warning("failed to drain queued food entry",
+                               extra={"user_id": user_id, "id": row[0], "attempts": row[3], "error": repr(error)})
+                self._failed(row, error)
+
+    def drain_once(self):
+        rows = self._claim()
+        if rows:
+            self._write(rows)
+        return len(rows)
+
+    def flush_user(self, user_id):
+        # Read-your-writes: writes the user's journaled entries before a read,
+        # waiting up to flush_wait on the drainer. Never raises.
+        try:
+            while True:
+                rows = self._claim(user_id)
+                if not rows:
+                    break
+                self._write(rows)
+                if len(rows) < self.batch_size:
+                    break
+            deadline = time.monotonic() + self.flush_wait
+            while self._conn.execute(
+                "SELECT 1 FROM food_log_queue WHERE user_id = ? AND writing = 1 AND lease_until >= ? LIMIT 1",
+                (user_id, time.time())
+            ).fetchone() and time.monotonic() < deadline:
+                time.sleep(0.005)
+        except Exception:
+            logger.exception("failed to flush queued food entries", extra={"user_id": user_id})
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                if self.drain_once() >= self.batch_size:
+                    continue
+            except Exception:
+                logger.exception("write-behind drainer failed")
+            # Woken by the first enqueue, then lingers briefly so a burst
+            # shares one commit.
+            if self._wake.wait(self.poll_interval):
+                self._wake.clear()
+                time.sleep(self.linger)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="food-log-drainer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+queue = None
+
+
+def init_write_behind(app):
+    global queue
+    if not app.config["WRITE_BEHIND_ENABLED"] or queue is not None:
+        return
+    queue = WriteBehindQueue(
+        app.config["WRITE_BEHIND_JOURNAL"],
+        synchronous=app.config["WRITE_BEHIND_SYNCHRONOUS"],
+        batch_size=app.config["WRITE_BEHIND_BATCH_SIZE"],
+        linger=app.config["WRITE_BEHIND_LINGER_MS"] / 1000,
+        poll_interval=app.config["WRITE_BEHIND_POLL_MS"] / 1000,
+        lease=app.config["WRITE_BEHIND_LEASE"],
+        max_attempts=app.config["WRITE_BEHIND_MAX_ATTEMPTS"],
+        flush_wait=app.config["WRITE_BEHIND_FLUSH_WAIT_MS"] / 1000,
+    )
+    queue.start()
+
+
+def flush_user(user_id):
+    if queue is not None:
+        queue.flush_user(user_id)
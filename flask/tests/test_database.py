@@ -0,0 +1,115 @@
+import threading
+import time
+
+import pytest
+
+from database import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+
+    def __init__(self):
+        self.in_transaction = False
+        self.rollbacks = 0
+        self.closed = False
+        self.broken = False
+
+    def ping(self, reconnect=False):
+        if self.broken:
+            raise OSError("gone")
+
+    def rollback(self):
+        if self.broken:
+            raise OSError("gone")
+        self.rollbacks += 1
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(**kwargs):
+    created = []
+
+    def creator():
+        created.append(FakeConnection())
+        return created[-1]
+
+    kwargs.setdefault("size", 2)
+    kwargs.setdefault("max_overflow", 0)
+    return ConnectionPool(creator, **kwargs), created
+
+
+def test_checkout_reuses_released_connections():
+    pool, created = make_pool()
+    first = pool.checkout()
+    pool.release(first)
+    assert pool.checkout() is first
+    assert len(created) == 1
+    assert first._conn.rollbacks == 1
+
+    stats = pool.stats()
+    assert stats["checkouts"] == 2
+    assert stats["created"] == 1
+    assert stats["in_use"] == 1
+
+
+def test_checkout_times_out_when_exhausted():
+    pool, _ = make_pool(size=1, timeout=0.05)
+    pool.checkout()
+    with pytest.raises(PoolTimeout):
+        pool.checkout()
+    stats = pool.stats()
+    assert stats["waits"] == 1
+    assert stats["timeouts"] == 1
+
+
+def test_waiter_gets_a_connection_when_another_is_released():
+    pool, _ = make_pool(size=1, timeout=5)
+    held = pool.checkout()
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.checkout()))
+    waiter.start()
+    time.sleep(0.05)
+    pool.release(held)
+    waiter.join(1)
+    assert got == [held]
+
+
+def test_discarding_a_broken_connection_wakes_a_waiter():
+    pool, created = make_pool(size=1, timeout=5)
+    held = pool.checkout()
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.checkout()))
+    waiter.start()
+    time.sleep(0.05)
+    started = time.monotonic()
+    held._conn.broken = True
+    pool.release(held)
+    waiter.join(1)
+    assert time.monotonic() - started < 1
+    assert len(got) == 1 and got[0] is not held
+    assert held._conn.closed
+    assert len(created) == 2
+    assert pool.stats()["open"] == 1
+
+
+def test_dead_idle_connection_is_replaced_on_checkout():
+    pool, created = make_pool()
+    conn = pool.checkout()
+    pool.release(conn)
+    conn._conn.broken = True
+    replacement = pool.checkout()
+    assert replacement is not conn
+    assert pool.stats()["invalidated"] == 1
+    assert len(created) == 2
+
+
+def test_request_scoped_close_ends_the_read_snapshot():
+    pool, _ = make_pool()
+    conn = pool.checkout()
+    conn._request_scoped = True
+    conn._conn.in_transaction = True
+    conn.close()
+    assert conn._conn.rollbacks == 1
+    assert pool.stats()["idle"] == 0
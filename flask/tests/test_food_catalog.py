@@ -0,0 +1,40 @@
+from models.food_model import FoodModel
+from services import food_catalog
+from services.food_catalog import FoodCatalog
+import versions
+
+
+def test_live_adds_keep_the_loaded_average():
+    catalog = FoodCatalog()
+    catalog.load([("Greek Yogurt", 300.0, 30.0, 12.0, 6.0, 2)])
+    catalog.add("greek  yogurt", 180, 18, 9, 3)
+    [result] = catalog.search("greek")
+    assert result == {"name": "Greek Yogurt", "calories": 160.0, "protein": 16.0, "carbs": 7.0, "fat": 3.0,
+                      "count": 3}
+
+
+def test_substring_matches_follow_prefix_matches():
+    catalog = FoodCatalog()
+    catalog.load([("Chicken Breast", 165, 31, 0, 4, 5), ("Grilled Chicken", 190, 29, 0, 7, 9),
+                  ("Chickpeas", 160, 9, 27, 3, 1)])
+    assert [r["name"] for r in catalog.search("chick")] == ["Chicken Breast", "Chickpeas", "Grilled Chicken"]
+    assert [r["name"] for r in catalog.search("icken")] == ["Grilled Chicken", "Chicken Breast"]
+    assert catalog.search("tofu") == []
+
+
+def test_record_patches_only_the_next_version(monkeypatch):
+    rows = [("Banana", 105, 1, 27, 0, 1)]
+    monkeypatch.setattr(FoodModel, "get_catalog", lambda user_id: list(rows))
+    monkeypatch.setattr(food_catalog, "_catalogs", food_catalog.TTLCache())
+    banana = {"name": "Banana", "calories": 95, "protein": 1, "carbs": 25, "fat": 0}
+
+    assert food_catalog.search(3, "ban")[0]["count"] == 1
+    versions.bump(3)
+    food_catalog.record(3, [banana])
+    assert food_catalog.search(3, "ban")[0]["count"] == 2
+
+    # Two writes since the load: the catalog reloads instead.
+    versions.bump(3)
+    versions.bump(3)
+    food_catalog.record(3, [banana])
+    assert food_catalog.search(3, "ban")[0]["count"] == 1
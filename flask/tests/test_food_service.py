@@ -0,0 +1,72 @@
+from datetime import datetime
+
+import pytest
+
+from models.food_model import FoodModel
+from services import food_catalog, write_behind
+from services.food_service import FoodService
+
+ENTRY = {
+    "name": "Oatmeal",
+    "calories": 150,
+    "protein": 5,
+    "carbs": 27,
+    "fat": 3,
+    "mealType": "breakfast",
+    "timestamp": "2024-05-01 08:00:00",
+}
+
+
+def entry(**changes):
+    return dict(ENTRY, **changes)
+
+
+def test_validate_entry_accepts_a_complete_entry():
+    assert FoodService.validate_entry(entry()) is None
+    assert FoodService.validate_entry(entry(servings="1.5", timestamp="2024-05-01T08:00:00")) is None
+
+
+@pytest.mark.parametrize("data, error", [
+    ([], "Entry must be an object"),
+    ({key: value for key, value in ENTRY.items() if key not in ("name", "fat")}, "Missing fields: name, fat"),
+    (entry(calories="lots"), "calories must be a non-negative number"),
+    (entry(protein=-1), "protein must be a non-negative number"),
+    (entry(servings=None), "servings must be a non-negative number"),
+    (entry(timestamp="yesterday"), "Invalid timestamp: yesterday"),
+    (entry(timestamp="0999-12-31 23:59:59"), "timestamp must not be before year 1000"),
+])
+def test_validate_entry_rejects(data, error):
+    assert FoodService.validate_entry(data) == error
+
+
+@pytest.mark.parametrize("queued", [False, True])
+def test_log_food_rejects_before_writing(monkeypatch, queued):
+    writes = []
+    monkeypatch.setattr(FoodModel, "add_food_entry", lambda **kwargs: writes.append(kwargs))
+    monkeypatch.setattr(write_behind, "queue", FakeQueue(writes) if queued else None)
+    monkeypatch.setattr(food_catalog, "record", lambda user_id, entries: None)
+
+    with pytest.raises(ValueError, match="Invalid timestamp"):
+        FoodService.log_food(1, entry(timestamp="not a date"))
+    assert writes == []
+
+    FoodService.log_food(1, entry())
+    assert len(writes) == 1
+
+
+class FakeQueue:
+
+    def __init__(self, writes):
+        self.writes = writes
+
+    def enqueue(self, user_id, data):
+        self.writes.append(data)
+        return "ref"
+
+
+def test_page_args_date_is_one_day():
+    _, _, date_from, date_to = FoodService._page_args({"date": "2024-05-01"})
+    assert (date_from, date_to) == (datetime(2024, 5, 1), datetime(2024, 5, 2))
+    assert FoodService._page_args({"from": "2024-05-01", "to": "2024-05-01"})[2:] == (date_from, date_to)
+    with pytest.raises(ValueError):
+        FoodService._page_args({"date": "2024-05-01", "from": "2024-04-01"})
@@ -0,0 +1,103 @@
+import pytest
+
+from models.food_model import FoodModel, ImportConflict
+from services.import_service import ImportService, MAX_IMPORT_KEY_LENGTH
+
+HEADER = "name,calories,protein,carbs,fat,mealType,timestamp"
+
+
+def csv_lines(count, bad=()):
+    lines = [HEADER]
+    for i in range(count):
+        calories = "lots" if i in bad else "100"
+        lines.append(f"food {i},{calories},5,10,2,lunch,2024-05-01 12:{i % 60:02d}:00")
+    return [line + "\n" for line in lines]
+
+
+class FakeImports:
+    # food_imports checkpoints and the rows committed with them.
+
+    def __init__(self, monkeypatch):
+        self.checkpoints = {}
+        self.rows = []
+        self.fail_after = None
+        monkeypatch.setattr(FoodModel, "get_or_create_import", self.get_or_create_import)
+        monkeypatch.setattr(FoodModel, "import_chunk", self.import_chunk)
+
+    def get_or_create_import(self, user_id, import_key):
+        checkpoint = self.checkpoints.setdefault((user_id, import_key), {
+            "id": len(self.checkpoints) + 1, "rows_done": 0, "rows_imported": 0, "rows_failed": 0,
+            "completed_at": None,
+        })
+        return dict(checkpoint)
+
+    def import_chunk(self, user_id, import_id, entries, start, rows_done, imported, failed, completed=False):
+        if self.fail_after is not None and len(self.rows) >= self.fail_after:
+            raise ConnectionError("lost the database")
+        checkpoint = next(c for c in self.checkpoints.values() if c["id"] == import_id)
+        if checkpoint["rows_done"] != start:
+            raise ImportConflict()
+        self.rows += [entry["name"] for entry in entries]
+        checkpoint.update(rows_done=rows_done, rows_imported=imported, rows_failed=failed)
+        if completed:
+            checkpoint["completed_at"] = "now"
+
+
+@pytest.fixture
+def imports(monkeypatch):
+    return FakeImports(monkeypatch)
+
+
+def test_import_counts_rows_and_reports_bad_ones(imports):
+    summary = ImportService.import_csv(1, csv_lines(5, bad={2}), "key", chunk_size=2)
+    assert (summary["rows"], summary["imported"], summary["failed"]) == (5, 4, 1)
+    assert summary["errors"] == [{"line": 4, "error": "calories must be a non-negative number"}]
+    assert imports.rows == ["food 0", "food 1", "food 3", "food 4"]
+
+
+def test_reimporting_a_completed_key_writes_nothing(imports):
+    ImportService.import_csv(1, csv_lines(5), "key", chunk_size=2)
+    summary = ImportService.import_csv(1, csv_lines(5), "key", chunk_size=2)
+    assert summary["completed"] is True
+    assert summary["imported"] == 5
+    assert len(imports.rows) == 5
+
+
+def test_an_interrupted_import_resumes_without_duplicates(imports):
+    imports.fail_after = 4
+    with pytest.raises(ConnectionError):
+        ImportService.import_csv(1, csv_lines(7), "key", chunk_size=2)
+    assert len(imports.rows) == 4
+
+    imports.fail_after = None
+    summary = ImportService.import_csv(1, csv_lines(7), "key", chunk_size=2)
+    assert summary["resumed_from"] == 4
+    assert (summary["rows"], summary["imported"]) == (7, 7)
+    assert imports.rows == [f"food {i}" for i in range(7)]
+
+
+def test_a_concurrent_run_of_the_same_key_conflicts(imports):
+    def racing_lines():
+        # Another run of the same key completes after this one has read
+        # its checkpoint.
+        lines = csv_lines(3)
+        yield lines[0]
+        ImportService.import_csv(1, csv_lines(3), "key", chunk_size=2)
+        yield from lines[1:]
+
+    with pytest.raises(ImportConflict):
+        ImportService.import_csv(1, racing_lines(), "key", chunk_size=2)
+    assert len(imports.rows) == 3
+
+
+def test_import_keys_are_per_user(imports):
+    ImportService.import_csv(1, csv_lines(2), "key")
+    summary = ImportService.import_csv(2, csv_lines(2), "key")
+    assert summary["resumed_from"] == 0
+    assert len(imports.rows) == 4
+
+
+def test_import_rejects_an_oversized_key_before_writing(imports):
+    with pytest.raises(ValueError, match=f"at most {MAX_IMPORT_KEY_LENGTH} characters"):
+        ImportService.import_csv(1, csv_lines(1), "k" * (MAX_IMPORT_KEY_LENGTH + 1))
+    assert imports.checkpoints == {}
@@ -0,0 +1,116 @@
+from datetime import date
+
+import pytest
+
+from models.food_model import FoodModel
+from services import food_service, write_behind
+from services.food_service import FoodService
+
+
+class FakeFeed:
+    # food_changes and the rows they point at, for one user.
+
+    def __init__(self, monkeypatch):
+        self.changes = []
+        self.entries = {}
+        self.water = {}
+        self.mutations = []
+        monkeypatch.setattr(write_behind, "queue", None)
+        monkeypatch.setattr(FoodModel, "get_changes", self.get_changes)
+        monkeypatch.setattr(FoodModel, "get_entries_by_ids", self.get_entries_by_ids)
+        monkeypatch.setattr(FoodModel, "get_daily_water", self.get_daily_water)
+        monkeypatch.setattr(FoodModel, "apply_mutations", self.apply_mutations)
+
+    def entry(self, entry_id, op="upsert"):
+        if op == "upsert":
+            self.entries[entry_id] = {"id": entry_id, "name": f"food {entry_id}"}
+        else:
+            self.entries.pop(entry_id, None)
+        self.changes.append({"revision": len(self.changes) + 1, "kind": "entry", "op": op,
+                             "entry_id": entry_id, "day": None})
+
+    def drink(self, day, water_l):
+        self.water[day] = water_l
+        self.changes.append({"revision": len(self.changes) + 1, "kind": "water", "op": "upsert",
+                             "entry_id": None, "day": day})
+
+    def get_changes(self, user_id, since, limit):
+        return len(self.changes), [c for c in self.changes if c["revision"] > since][:limit + 1]
+
+    def get_entries_by_ids(self, user_id, ids):
+        return [self.entries[entry_id] for entry_id in ids if entry_id in self.entries]
+
+    def get_daily_water(self, user_id, start, end):
+        return {day: water for day, water in self.water.items() if start <= day <= end}
+
+    def apply_mutations(self, user_id, mutations):
+        # Deletes only.
+        for op, (entry_id,) in mutations:
+            self.mutations.append(op)
+            self.entry(entry_id, "delete")
+        return [{"success": True} for _ in mutations]
+
+
+@pytest.fixture
+def feed(monkeypatch):
+    return FakeFeed(monkeypatch)
+
+
+@pytest.mark.parametrize("since", [0, 5])
+def test_sync_resets_without_a_known_revision(feed, since):
+    feed.entry(1)
+    response = FoodService.sync(1, since)
+    assert response["reset"] is True
+    assert response["revision"] == 1
+    assert response["entries"] == []
+
+
+@pytest.mark.parametrize("since", ["abc", -1])
+def test_sync_rejects_a_bad_revision(feed, since):
+    with pytest.raises(ValueError, match="since must be an integer revision"):
+        FoodService.sync(1, since)
+
+
+def test_sync_returns_the_latest_state_after_a_revision(feed):
+    feed.entry(1)
+    feed.entry(2)
+    feed.entry(3)
+    feed.entry(2, "delete")
+    feed.entry(3)
+    feed.drink(date(2024, 5, 1), 1.5)
+
+    response = FoodService.sync(1, 1)
+    assert response["revision"] == 6
+    assert response["reset"] is False and response["has_more"] is False
+    assert [e["id"] for e in response["entries"]] == [3]
+    assert response["deleted"] == [2]
+    assert response["water"] == [{"date": "2024-05-01", "water_l": 1.5}]
+
+    assert FoodService.sync(1, 6)["entries"] == []
+
+
+def test_sync_pages_through_a_long_feed(feed, monkeypatch):
+    monkeypatch.setattr(food_service, "MAX_SYNC_CHANGES", 2)
+    for entry_id in range(1, 6):
+        feed.entry(entry_id)
+
+    seen = []
+    revision = 1
+    while True:
+        response = FoodService.sync(1, revision)
+        seen += [e["id"] for e in response["entries"]]
+        revision = response["revision"]
+        if not response["has_more"]:
+            break
+    assert seen == [2, 3, 4, 5]
+    assert revision == 5
+
+
+def test_sync_applies_mutations_before_reading_the_feed(feed):
+    feed.entry(1)
+    response = FoodService.sync(1, 1, [{"op": "delete", "id": 1}, {"op": "bogus"}])
+    assert feed.mutations == ["delete"]
+    assert response["applied"][0] == {"index": 0, "success": True}
+    assert response["applied"][1]["success"] is False
+    assert response["deleted"] == [1]
+    assert response["revision"] == 2
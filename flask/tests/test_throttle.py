@@ -0,0 +1,28 @@
+import throttle
+from throttle import Throttle
+
+
+def test_limit_applies_per_key_within_the_window(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(throttle.time, "monotonic", lambda: now[0])
+    limiter = Throttle(limit=2, window=60)
+
+    assert limiter.allow("a") == 0
+    assert limiter.allow("a") == 0
+    now[0] += 15
+    assert limiter.allow("a") == 45
+    assert limiter.allow("b") == 0
+
+    now[0] += 45
+    assert limiter.allow("a") == 0
+
+
+def test_expired_windows_are_dropped(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(throttle.time, "monotonic", lambda: now[0])
+    limiter = Throttle(limit=5, window=10)
+    for i in range(1000):
+        limiter.allow(f"user{i}@example.com")
+    now[0] += 10
+    limiter.allow("late@example.com")
+    assert list(limiter._windows) == ["late@example.com"]
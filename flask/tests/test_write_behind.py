@@ -0,0 +1,92 @@
+import pytest
+
+from models.food_model import FoodModel
+from services import food_catalog, write_behind
+from services.food_service import FoodService
+from services.write_behind import WriteBehindQueue
+
+ENTRY = {
+    "name": "Oatmeal",
+    "calories": 150,
+    "protein": 5,
+    "carbs": 27,
+    "fat": 3,
+    "mealType": "breakfast",
+    "timestamp": "2024-05-01 08:00:00",
+}
+
+
+class FakeFoodLog:
+    # Stands in for food_intake: the model calls log_food and
+    # get_food_entries_page make, backed by a list.
+
+    def __init__(self, monkeypatch):
+        self.rows = []
+        self.fail_names = set()
+        monkeypatch.setattr(FoodModel, "add_food_entry", self.add_food_entry)
+        monkeypatch.setattr(FoodModel, "add_queued_entries", self.add_queued_entries)
+        monkeypatch.setattr(FoodModel, "get_entries_page", self.get_entries_page)
+        monkeypatch.setattr(food_catalog, "record", lambda user_id, entries: None)
+
+    def add_food_entry(self, user_id, **entry):
+        self.rows.append(dict(entry, user_id=user_id))
+
+    def add_queued_entries(self, groups):
+        for user_id, entries in groups.items():
+            if any(entry["name"] in self.fail_names for entry in entries):
+                raise RuntimeError("rejected")
+        for user_id, entries in groups.items():
+            self.rows.extend(dict(entry, user_id=user_id) for entry in entries)
+
+    def get_entries_page(self, user_id, limit, after, date_from, date_to):
+        return [row for row in self.rows if row["user_id"] == user_id][:limit], False
+
+
+@pytest.fixture
+def journal(tmp_path, monkeypatch):
+    # A queue whose drainer never runs, so only flush_user can move rows.
+    queue = WriteBehindQueue(str(tmp_path / "queue.sqlite3"), max_attempts=2, flush_wait=0.1)
+    monkeypatch.setattr(write_behind, "queue", queue)
+    return queue
+
+
+@pytest.mark.parametrize("queued", [False, True])
+def test_logged_entry_is_in_the_next_read(request, monkeypatch, queued):
+    FakeFoodLog(monkeypatch)
+    if queued:
+        request.getfixturevalue("journal")
+    else:
+        monkeypatch.setattr(write_behind, "queue", None)
+
+    client_ref = FoodService.log_food(7, ENTRY)
+    assert (client_ref is not None) == queued
+
+    page = FoodService.get_food_entries_page(7, {})
+    assert [entry["name"] for entry in page["entries"]] == ["Oatmeal"]
+
+
+def test_flush_writes_only_that_users_entries(monkeypatch, journal):
+    log = FakeFoodLog(monkeypatch)
+    FoodService.log_food(7, ENTRY)
+    FoodService.log_food(8, dict(ENTRY, name="Toast"))
+
+    write_behind.flush_user(7)
+    assert [row["name"] for row in log.rows] == ["Oatmeal"]
+    assert journal.pending(8) == 1
+
+
+def test_failing_entry_is_isolated_and_dead_lettered(monkeypatch, journal):
+    log = FakeFoodLog(monkeypatch)
+    log.fail_names.add("Bad")
+    FoodService.log_food(7, ENTRY)
+    FoodService.log_food(7, dict(ENTRY, name="Bad"))
+
+    write_behind.flush_user(7)
+    assert [row["name"] for row in log.rows] == ["Oatmeal"]
+    assert journal.pending(7) == 1
+
+    # The lease is the retry delay; expire it to retry now.
+    journal._conn.execute("UPDATE food_log_queue SET lease_until = 0")
+    write_behind.flush_user(7)
+    assert journal.pending(7) == 0
+    assert journal.pending(7, dead=True) == 1
@@ -0,0 +1,34 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class Throttle:
+    # Fixed-window counter per key; allow() returns seconds to wait, or 0.
+    # Windows are kept in opening order so expired ones pop off the front.
+
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self._windows = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, key):
+        now = time.monotonic()
+        with self._lock:
+            self._prune(now)
+            start, count = self._windows.get(key, (now, 0))
+            if count >= self.limit:
+                return self.window - (now - start)
+            if count == 0:
+                self._windows[key] = (now, 1)
+            else:
+                self._windows[key] = (start, count + 1)
+            return 0
+
+    def _prune(self, now):
+        while self._windows:
+            key, (start, _) = next(iter(self._windows.items()))
+            if now - start < self.window:
+                break
+            del self._windows[key]
@@ -0,0 +1,73 @@
+import hashlib
+import time
+from flask import Response, request
+from cache import TTLCache, make_backend
+from config import Config
+
+# Per-user counter bumped after every committed food log or profile write;
+# ETags derive from it, so revalidations skip the database.
+_backend = make_backend(Config.CACHE_BACKEND, Config.CACHE_REDIS_URL, Config.VERSION_EPOCH_FILE)
+_bodies = TTLCache(maxsize=Config.RESPONSE_CACHE_SIZE, ttl=Config.RESPONSE_CACHE_TTL)
+
+
+def _key(user_id):
+    return f"user-version:{user_id}"
+
+
+def _seed():
+    # Counters start from the clock, so a restarted or flushed backend never
+    # hands out a version a client may still hold.
+    return time.time_ns() // 1000
+
+
+def current(user_id):
+    key = _key(user_id)
+    version = _backend.get(key)
+    if version is None:
+        _backend.set_if_absent(key, _seed())
+        version = _backend.get(key)
+    return version
+
+
+def bump(user_id):
+    key = _key(user_id)
+    _backend.set_if_absent(key, _seed())
+    return _backend.incr(key)
+
+
+def publish(user_ids):
+    # For writers outside the serving process (scripts). The local backend
+    # can't be reached from here, so the server drops all of its counters.
+    for user_id in user_ids:
+        bump(user_id)
+    if not _backend.shared:
+        _backend.touch_epoch()
+
+
+def etag(user_id, resource, variant=""):
+    # Read before the data is queried: a write landing in between only makes
+    # the tag older than the body, which costs one extra full response.
+    digest = hashlib.sha1(f"{user_id}|{resource}|{variant}".encode()).hexdigest()[:12]
+    return f"{current(user_id):x}-{digest}"
+
+
+def not_modified(tag):
+    if request.if_none_match.contains(tag):
+        return tagged(Response(status=304), tag)
+    return None
+
+
+def cached(user_id, tag):
+    body = _bodies.get((user_id, tag))
+    if body is None:
+        return None
+    return tagged(Response(body, mimetype="application/json"), tag)
+
+
+def tagged(response, tag, user_id=None):
+    # Passing user_id keeps the body for cached(); streamed ones aren't.
+    if user_id is not None and not response.is_streamed:
+        _bodies.set((user_id, tag), response.get_data())
+    response.set_etag(tag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response